@@ -1,4 +1,9 @@
+import asyncio
+from typing import Dict, Tuple, Union
+
 from flight.utils.latlon import LatLon, Latitude, Longitude
+from flight.utils.local_frame import LocalFrame
+from flight.utils.params import upload_params
 
 from mavsdk import System
 
@@ -12,7 +17,12 @@ ALT_PERCENT_ACCURACY: float = 0.15
 ALT_RANGE_MAX: float = TAKEOFF_ALT + (TAKEOFF_ALT * ALT_PERCENT_ACCURACY)  # m
 ALT_RANGE_MIN: float = TAKEOFF_ALT - (TAKEOFF_ALT * ALT_PERCENT_ACCURACY)  # m
 
-POINT_PERCENT_ACCURACY: float = 0.2
+# Lap trajectory
+MAX_ACCEL: float = 2.0  # m/s^2 along the path
+MAX_LATERAL_ACCEL: float = 3.0  # m/s^2 in turns
+PATH_SPACING: float = 0.25  # m between path points
+POSITION_GAIN: float = 0.5  # m/s per m of tracking error
+ARRIVAL_RADIUS: float = 1.0  # m from the end of the path to finish
 
 # Position for pylon 1
 lat1: Latitude = Latitude(degree=37, minute=56, second=55.6)
@@ -28,32 +38,52 @@ lat2: Latitude = Latitude(degree=37, minute=56, second=53.3)
 lon2: Longitude = Longitude(degree=-91, minute=-47, second=0)
 pylon2: LatLon = LatLon(lat2, lon2)
 
+# Local frame for navigation, positions in m east & north of the midpoint of the pylons
+local_frame: LocalFrame = LocalFrame.around(pylon1, pylon2)
+pylon1_local: Tuple[float, float] = local_frame.from_latlon(pylon1)
+pylon2_local: Tuple[float, float] = local_frame.from_latlon(pylon2)
+
 OFFSET: float = 0.005  # km
-DEG_OFFSET: int = 90  # deg
 
 NUM_LAPS: int = 2
 
+CONTROL_RATE_HZ: float = 20.0  # Offboard setpoints per second
+
 THINK_FOR_S: float = 2.0
 FAST_THINK_S: float = 1.0
 
 
-async def config_params(drone: System):
-    await drone.param.set_param_float("MIS_TAKEOFF_ALT", TAKEOFF_ALT)
-    await drone.param.set_param_float("MPC_XY_VEL_MAX", MAX_SPEED)
-    await drone.param.set_param_float("MPC_XY_CRUISE", MAX_SPEED)
-    await drone.action.set_maximum_speed(MAX_SPEED)
+# Obstacle avoidance
+CAMERA_HFOV_DEG: float = 86.0
+AVOID_MAX_AGE: float = 0.5  # s, older detections are ignored
+AVOID_HORIZON: float = 8.0  # m, obstacles further are ignored
+AVOID_SAFE_DISTANCE: float = 3.0  # m, fully sidestep at & back away within
+AVOID_PUSH_GAIN: float = 0.5  # m/s per m inside the safe distance
+
+# Drone params, ints are set w/ set_param_int & floats w/ set_param_float
+PARAMS: Dict[str, Union[int, float]] = {
+    "MIS_TAKEOFF_ALT": TAKEOFF_ALT,
+    "MPC_XY_VEL_MAX": MAX_SPEED,
+    "MPC_XY_CRUISE": MAX_SPEED,
     # Set data link loss failsafe mode HOLD
-    await drone.param.set_param_int("NAV_DLL_ACT", 1)
+    "NAV_DLL_ACT": 1,
     # Set offboard loss failsafe mode HOLD
-    await drone.param.set_param_int("COM_OBL_ACT", 1)
+    "COM_OBL_ACT": 1,
     # Set offboard loss failsafe mode when RC is available HOLD
-    await drone.param.set_param_int("COM_OBL_RC_ACT", 5)
-
+    "COM_OBL_RC_ACT": 5,
     # Set RC loss failsafe mode HOLD
-    await drone.param.set_param_int("NAV_RCL_ACT", 1)
+    "NAV_RCL_ACT": 1,
+    "LNDMC_XY_VEL_MAX": 0.5,
+    "LNDMC_FFALL_THR": 3.0,
+    "LNDMC_FFALL_TTRI": 0.15,
+    "LNDMC_ALT_MAX": MAX_ALT,
+    "LNDMC_LOW_T_THR": 0.2,
+}
+PARAM_CONCURRENCY: int = 4  # Param requests in flight at once
 
-    await drone.param.set_param_float("LNDMC_XY_VEL_MAX", 0.5)
-    await drone.param.set_param_float("LNDMC_FFALL_THR", 3)
-    await drone.param.set_param_float("LNDMC_FFALL_TTRI", 0.15)
-    await drone.param.set_param_float("LNDMC_ALT_MAX", MAX_ALT)
-    await drone.param.set_param_float("LNDMC_LOW_T_THR", 0.2)
+
+async def config_params(drone: System):
+    await asyncio.gather(
+        upload_params(drone, PARAMS, PARAM_CONCURRENCY),
+        drone.action.set_maximum_speed(MAX_SPEED),
+    )
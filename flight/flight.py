@@ -7,6 +7,9 @@ import mavsdk as sdk
 
 from .states import STATES, State
 from . import config
+from .utils.avoidance import Avoidance, attach_avoidance
+from .utils.telemetry_hub import get_hub
+from .utils.telemetry_log import TELEMETRY_LOG_FILE, TelemetryLog, attach_telemetry_log
 
 
 SIM_ADDR: str = "udp://:14540"  # Address to connect to the simulator
@@ -53,7 +56,7 @@ async def log_flight_mode(drone: System) -> None:
 
     previous_flight_mode: str = None
 
-    async for flight_mode in drone.telemetry.flight_mode():
+    async for flight_mode in get_hub(drone).samples("flight_mode"):
         if flight_mode is not previous_flight_mode:
             previous_flight_mode: str = flight_mode
             logging.debug("Flight mode: %s", flight_mode)
@@ -65,7 +68,7 @@ async def observe_is_in_air(drone: System, comm) -> None:
 
     was_in_air: bool = False
 
-    async for is_in_air in drone.telemetry.in_air():
+    async for is_in_air in get_hub(drone).samples("in_air"):
         if is_in_air:
             was_in_air: bool = is_in_air
 
@@ -82,18 +85,36 @@ async def wait_for_drone(drone: System) -> None:
             return
 
 
-def flight(comm, sim: bool, log_queue, worker_configurer) -> None:
-    """Starts the asyncronous event loop for the flight code"""
+def flight(
+    comm, sim: bool, log_queue, worker_configurer, vision_queue=None, offline=False
+) -> None:
+    """
+    Starts the asyncronous event loop for the flight code, avoiding the
+    obstacles vision puts on vision_queue if given. Offline flies a FakeSystem
+    in virtual time.
+    """
     worker_configurer(log_queue)
     logging.debug("Flight process started")
-    asyncio.get_event_loop().run_until_complete(init_and_begin(comm, sim))
+    if offline:
+        from .utils.fake_system import VirtualTimeLoop
+
+        asyncio.set_event_loop(VirtualTimeLoop())
+    asyncio.get_event_loop().run_until_complete(
+        init_and_begin(comm, sim, vision_queue, offline)
+    )
 
 
-async def init_and_begin(comm, sim: bool) -> None:
+async def init_and_begin(comm, sim: bool, vision_queue=None, offline=False) -> None:
     """Creates drone object and passes it to start_flight"""
     try:
-        drone: System = await init_drone(sim)
-        await start_flight(comm, drone)
+        drone: System = await init_drone(sim, offline)
+        if vision_queue is not None:
+            attach_avoidance(
+                drone, Avoidance(vision_queue, clock=asyncio.get_event_loop().time)
+            )
+        with TelemetryLog(TELEMETRY_LOG_FILE) as telemetry_log:
+            attach_telemetry_log(drone, telemetry_log)
+            await start_flight(comm, drone)
     except DroneNotFoundError:
         logging.exception("Drone was not found")
         return
@@ -102,10 +123,15 @@ async def init_and_begin(comm, sim: bool) -> None:
         return
 
 
-async def init_drone(sim: bool) -> System:
-    """Connects to the pixhawk or simulator and returns the drone"""
+async def init_drone(sim: bool, offline: bool = False) -> System:
+    """Connects to the pixhawk, simulator or fake drone and returns the drone"""
     sys_addr: str = SIM_ADDR if sim else CONTROLLER_ADDR
-    drone: System = System()
+    if offline:
+        from .utils.fake_system import FakeSystem
+
+        drone: System = FakeSystem()
+    else:
+        drone = System()
     await drone.connect(system_address=sys_addr)
     logging.debug("Waiting for drone to connect...")
     try:
@@ -164,3 +190,4 @@ async def start_flight(comm, drone: System):
 
     await termination_task
     flight_mode_task.cancel()
+    await get_hub(drone).stop()
@@ -5,117 +5,111 @@ import math
 import mavsdk as sdk
 
 from flight import config
-from flight.utils.latlon import LatLon
+from logger import RateLimited
+from flight.utils.avoidance import get_avoidance
+from flight.utils.control_loop import ControlLoop
+from flight.utils.local_frame import heading
+from flight.utils.trajectory import Trajectory, laps
 
 
 from .land import Land
 
 
-async def arange(count):
-    """Needed to allows us to do a range asynchronously"""
-    for i in range(count):
-        yield i
+def altitude_correction(altitude: float) -> float:
+    """Down velocity that keeps the drone within the altitude range"""
+    altitude = round(altitude, 2)
+
+    if altitude >= config.ALT_RANGE_MAX:
+        return config.ALT_CORRECTION_SPEED  # go down m/s
+    if altitude <= config.ALT_RANGE_MIN:
+        return -config.ALT_CORRECTION_SPEED  # go up m/s
+    return -0.15  # don't move
 
 
 class EarlyLaps:
     """Handles getting the drone around the two pylons 8 times"""
 
     async def run(self, drone):
-        """Moves the drone to the first pylon, then begins the 8 laps"""
-        # Go to pylon 1
-        logging.info("Moving to pylon 1")
-        await self.wait_pos(drone, config.pylon1)
-        logging.info("Arrived at pylon 1")
-        async for i in arange(config.NUM_LAPS):
-            logging.info("Starting lap: %d", i)
-            logging.debug("Lap %d: Straight one", i)
-            await self.wait_pos(drone, config.pylon2)  # move to pylon 2
-
-            logging.debug("Lap %d: Turn one", i)
-            await self.wait_turn(drone)  # turn around pylon 2
-
-            logging.debug("Lap %d: Straight two", i)
-            await self.wait_pos(drone, config.pylon1)  # move to pylon 1
-
-            logging.debug("Lap %d: Turn two", i)
-            await self.wait_turn(drone)  # turn around pylon 1
+        """Flies onto the oval around the pylons, then around it NUM_LAPS times"""
+        loop = ControlLoop(drone, state="early_laps")
+        await loop.start()
+
+        start = config.local_frame.to_local(
+            loop.position.latitude_deg, loop.position.longitude_deg
+        )
+        trajectory = Trajectory(
+            laps(
+                start,
+                config.pylon1_local,
+                config.pylon2_local,
+                config.OFFSET * 1000,  # km to m
+                config.NUM_LAPS,
+                config.PATH_SPACING,
+            ),
+            config.MAX_SPEED,
+            config.MAX_ACCEL,
+            config.MAX_LATERAL_ACCEL,
+        )
+        logging.info(
+            "Starting %d laps, planned for %.1fs", config.NUM_LAPS, trajectory.duration
+        )
+
+        clock = asyncio.get_event_loop()
+        started = clock.time()
+        try:
+            await self.follow(loop, trajectory)
+        finally:
+            await loop.stop()
+        logging.info("Laps finished in %.1fs", clock.time() - started)
+
         return Land()
 
-    async def wait_pos(self, drone, pylon):
-        """Goes to a position"""
-        count = 0
-        async for gps in drone.telemetry.position():
-            altitude = round(gps.relative_altitude_m, 2)
-
-            if altitude >= config.ALT_RANGE_MAX:
-                alt = config.ALT_CORRECTION_SPEED  # go down m/s
-            elif altitude <= config.ALT_RANGE_MIN:
-                alt = -config.ALT_CORRECTION_SPEED  # go up m/s
-            else:
-                alt = -0.15  # don't move
-
-            lat = round(gps.latitude_deg, 8)
-            lon = round(gps.longitude_deg, 8)
-            current = LatLon(lat, lon)  # you are here
-
-            if count == 0:
-                # offset pylon
-                deg_to_pylon = current.heading_initial(pylon)
-                offset_point = pylon.offset(
-                    deg_to_pylon + config.DEG_OFFSET, config.OFFSET
-                )
-                logging.debug(offset_point.to_string("d% %m% %S% %H"))  # you are here
-
-            dist = current.distance(offset_point)
-            deg = current.heading_initial(offset_point)
-
-            x = dist * math.sin(math.radians(deg)) * 1000  # from km to m
-            y = dist * math.cos(math.radians(deg)) * 1000  # from km to m
-            if count == 0:
-                reference_x: float = abs(x)
-                reference_y: float = abs(y)
-            try:  # determine what velocity should go at
-                dx = math.copysign(config.MAX_SPEED * math.cos(math.atan(y / x)), x)
-                dy = math.copysign(config.MAX_SPEED * math.sin(math.atan(y / x)), y)
-
-            except ZeroDivisionError:
-                dx = math.copysign(
-                    config.MAX_SPEED
-                    * math.cos(math.asin(y / (math.sqrt((x ** 2) + (y ** 2))))),
-                    x,
-                )
-                dy = math.copysign(
-                    config.MAX_SPEED
-                    * math.sin(math.asin(y / (math.sqrt((x ** 2) + (y ** 2))))),
-                    y,
+    async def follow(self, loop: ControlLoop, trajectory: Trajectory):
+        """Tracks a trajectory w/ feedback on position error, avoiding obstacles"""
+        clock = asyncio.get_event_loop()
+        started = clock.time()
+        yaw = loop.attitude.yaw_deg % 360
+        avoidance = get_avoidance(loop.drone)
+        log = RateLimited(logging.DEBUG)
+
+        def step(loop: ControlLoop):
+            nonlocal yaw
+            t = clock.time() - started
+            reference = trajectory.setpoint(t)
+
+            gps = loop.position
+            east, north = config.local_frame.to_local(
+                gps.latitude_deg, gps.longitude_deg
+            )
+            error_east = reference.east - east
+            error_north = reference.north - north
+            error = math.hypot(error_east, error_north)
+
+            if t >= trajectory.duration and error <= config.ARRIVAL_RADIUS:
+                return None
+
+            # Formatted only when logged
+            log("Tracking error %.2fm at %.1fs of %.1fs", error, t, trajectory.duration)
+
+            v_east = reference.v_east + config.POSITION_GAIN * error_east
+            v_north = reference.v_north + config.POSITION_GAIN * error_north
+            speed = math.hypot(v_east, v_north)
+            if speed > config.MAX_SPEED:
+                v_east *= config.MAX_SPEED / speed
+                v_north *= config.MAX_SPEED / speed
+
+            if avoidance is not None:
+                avoidance.poll()
+                v_north, v_east = avoidance.adjust(
+                    v_north, v_east, loop.attitude.yaw_deg
                 )
 
-            await drone.offboard.set_velocity_ned(
-                sdk.offboard.VelocityNedYaw(dy, dx, alt, deg)
-            )
+            if math.hypot(reference.v_east, reference.v_north) > 0.1:
+                yaw = heading(reference.v_east, reference.v_north)
 
-            if (
-                abs(x) <= reference_x * config.POINT_PERCENT_ACCURACY
-                and abs(y) <= reference_y * config.POINT_PERCENT_ACCURACY
-            ):
-                return True
-            count += 1
-
-    async def wait_turn(self, drone):
-        """Completes a full turn"""
-        count = 0
-        async for tel in drone.telemetry.attitude_euler():
-            current = (360 + round(tel.yaw_deg)) % 360
-            if count == 0:
-                temp = (current + 180) % 360
-
-            await drone.offboard.set_velocity_body(
-                sdk.offboard.VelocityBodyYawspeed(5, -3, -0.1, -60)
+            return sdk.offboard.VelocityNedYaw(
+                v_north, v_east, altitude_correction(gps.relative_altitude_m), yaw
             )
-            # await asyncio.sleep(config.FAST_THINK_S)
-            val = abs(current - temp)
-            # TODO: Add case so that it can overshoot the point and still complete
-            if val < 10:
-                logging.debug("Finished Turn")
-                return True
-            count += 1
+
+        await loop.run(step)
+        return True
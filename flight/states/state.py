@@ -2,6 +2,10 @@
 import logging
 from mavsdk import System
 
+from logger import RateLimited
+
+from flight.utils.telemetry_hub import get_hub
+
 
 class State:
     """
@@ -44,9 +48,10 @@ class State:
         drone : System
             The drone system; used for flight operations.
         """
-        async for is_armed in drone.telemetry.armed():
+        log = RateLimited(logging.DEBUG)  # Checked at the telemetry rate
+        async for is_armed in get_hub(drone).samples("armed"):
             if not is_armed:
-                logging.debug("Not armed. Attempting to arm")
+                log("Not armed. Attempting to arm")
                 await drone.action.arm()
             else:
                 logging.warning("Drone armed")
@@ -8,6 +8,7 @@ from .state import State
 from .early_laps import EarlyLaps
 
 from flight import config
+from flight.utils.telemetry_hub import get_hub
 
 
 class Takeoff(State):
@@ -49,7 +50,9 @@ class Takeoff(State):
 
     async def wait_alt(self, drone: System):
         """Checks to see if the drone is near the target altitude"""
-        async for position in drone.telemetry.position():
-            altitude: float = round(position.relative_altitude_m, 2)
-            if altitude >= config.ALT_RANGE_MIN:
-                return True
+        await get_hub(drone).wait_for(
+            "position",
+            lambda position: round(position.relative_altitude_m, 2)
+            >= config.ALT_RANGE_MIN,
+        )
+        return True
@@ -0,0 +1,169 @@
+"""
+Testing the asynchronous linear actuator driver against a fake USB device.
+"""
+import os, sys
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import asyncio
+import struct
+import time
+import unittest
+
+from flight.utils.async_lac import AsyncLAC, LACStallError
+from flight.utils.lac import LAC
+from flight.utils.Wrapped_LAC import SETUP_COMMANDS, eLimit, rLimit
+
+
+class FakeLACDevice:
+    """
+    USB device answering like the actuator board, moving step units per feedback read.
+
+    Attributes
+    ----------
+    commands: list[(int, int)]
+        Function & value of every command written.
+    """
+
+    def __init__(self, position=rLimit, step=100, stuck_at=None):
+        self.position = position
+        self.target = position
+        self.step = step
+        self.stuck_at = stuck_at
+        self.commands = []
+        self._reply = None
+
+    def set_configuration(self):
+        pass
+
+    def write(self, endpoint, data, timeout):
+        function, low, high = struct.unpack("BBB", data)
+        value = low + (high << 8)
+        self.commands.append((function, value))
+
+        if function == LAC.SET_POSITION:
+            self.target = value
+        elif function == LAC.GET_FEEDBACK:
+            self._move()
+            value = self.position
+
+        self._reply = [function, value & 0xFF, value >> 8]
+        return len(data)
+
+    def read(self, endpoint, size, timeout):
+        reply, self._reply = self._reply, None
+        if reply is None:
+            raise IOError("Read without a command")
+        return reply
+
+    def _move(self):
+        target = self.target if self.stuck_at is None else min(self.target, self.stuck_at)
+        self.position += max(-self.step, min(self.step, target - self.position))
+
+
+class TestAsyncLAC(unittest.TestCase):
+    """
+    Testing AsyncLAC functionality.
+    """
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _lac(self, device, **kwargs):
+        return AsyncLAC(LAC(device=device), poll_interval=0.001, settle=0, **kwargs)
+
+    def test_setup(self):
+        """
+        Verify the configuration is sent in one batch, settling only by default.
+
+        Returns
+        -------
+        Every setup command written in order, faster than one sleep per command
+        when settle is 0.
+        """
+        device = FakeLACDevice()
+        lac = self._lac(device)
+
+        start = time.perf_counter()
+        self.loop.run_until_complete(lac.setup())
+        elapsed = time.perf_counter() - start
+        lac.close()
+
+        self.assertEqual(device.commands, SETUP_COMMANDS)
+        self.assertLess(elapsed, 0.05 * len(SETUP_COMMANDS))
+
+        ## Settling between write & read by default, like send_data
+        start = time.perf_counter()
+        LAC(device=device).send_batch([(LAC.GET_FEEDBACK, 0)] * 2)
+        self.assertGreaterEqual(time.perf_counter() - start, 2 * LAC.SETTLE)
+
+    def test_move(self):
+        """
+        Verify moves return once feedback reaches the target, w/o blocking the loop.
+
+        Returns
+        -------
+        Positions at the limits, events processed while moving.
+        """
+        device = FakeLACDevice()
+        lac = self._lac(device)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        async def moves():
+            tick_task = asyncio.ensure_future(ticker())
+            extended = await lac.extend()
+            retracted = await lac.retract()
+            tick_task.cancel()
+            return extended, retracted
+
+        extended, retracted = self.loop.run_until_complete(moves())
+        lac.close()
+
+        self.assertLessEqual(abs(extended - eLimit), lac.accuracy)
+        self.assertLessEqual(abs(retracted - rLimit), lac.accuracy)
+        self.assertGreater(ticks, 10)
+        self.assertIn((LAC.SET_POSITION, eLimit), device.commands)
+
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(lac.move_to(eLimit + 1))
+
+    def test_stall(self):
+        """
+        Verify moves fail when the actuator stops short or takes too long.
+
+        Returns
+        -------
+        LACStallError when stuck or only creeping within the tolerance,
+        asyncio.TimeoutError when too slow.
+        """
+        lac = self._lac(FakeLACDevice(stuck_at=500), stall_time=0.05)
+        with self.assertRaises(LACStallError):
+            self.loop.run_until_complete(lac.extend())
+        lac.close()
+
+        lac = self._lac(FakeLACDevice(step=1), stall_time=0.05, stall_tolerance=1000)
+        with self.assertRaises(LACStallError):
+            self.loop.run_until_complete(lac.extend())
+        lac.close()
+
+        lac = self._lac(FakeLACDevice(step=1), stall_time=1)
+        with self.assertRaises(asyncio.TimeoutError):
+            self.loop.run_until_complete(lac.move_to(eLimit, timeout=0.05))
+        lac.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Testing obstacle avoidance by replaying recorded detections.
+"""
+import os, sys
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import datetime
+import json
+import math
+import queue
+import time
+import types
+import unittest
+
+from flight.utils.avoidance import Avoidance, attach_avoidance, box_to_obstacle, get_avoidance
+
+
+DETECTIONS_FILENAME = os.path.join(parent_dir, "detections.json")
+
+
+def read_detections(filename):
+    """
+    Recorded vision output, [{"time": s, "boxes": [{"vertices", "object_type", "depth"}]}].
+
+    Returns
+    -------
+    list[(float, list[box])] Seconds from the start of the recording & boxes.
+    """
+    with open(filename, "r") as file:
+        frames = json.load(file)
+
+    return [
+        (frame["time"], [types.SimpleNamespace(**box) for box in frame["boxes"]])
+        for frame in frames
+    ]
+
+
+def replay(avoidance, frames, v_north, v_east, yaw_deg, duration, rate_hz=20.0):
+    """
+    Feeds recorded frames to avoidance as they were captured & adjusts a constant setpoint.
+
+    Returns
+    -------
+    list[(float, float, float)] Time, north & east velocity of each control tick.
+    """
+    start = 1000.0  # Any epoch time, detections are stamped relative to it
+    setpoints, i = [], 0
+
+    for tick in range(int(duration * rate_hz)):
+        t = tick / rate_hz
+        while i < len(frames) and frames[i][0] <= t:
+            avoidance.update(start + frames[i][0], frames[i][1])
+            i += 1
+
+        setpoints.append((t, *avoidance.adjust(v_north, v_east, yaw_deg, now=start + t)))
+
+    return setpoints
+
+
+class TestAvoidance(unittest.TestCase):
+    """
+    Testing Avoidance functionality.
+    """
+
+    def test_box_to_obstacle(self):
+        """
+        Verify boxes are converted to bearing & range.
+
+        Returns
+        -------
+        Obstacle right of center w/ range in m, None for other types or w/o depth.
+        """
+        box = types.SimpleNamespace(
+            vertices=[(420, 0), (460, 0), (460, 40), (420, 40)],
+            object_type="avoid",
+            depth=4000,
+        )
+        obstacle = box_to_obstacle(box, 640, 86)
+
+        self.assertGreater(obstacle.bearing_deg, 0)
+        self.assertLess(obstacle.bearing_deg, 43)
+        self.assertAlmostEqual(obstacle.range_m, 4.0)
+
+        box.depth = float("nan")
+        self.assertIsNone(box_to_obstacle(box, 640, 86))
+
+        box.depth, box.object_type = 4000, "module"
+        self.assertIsNone(box_to_obstacle(box, 640, 86))
+
+        ## Width of the image the box was found in, over the default
+        box.object_type, box.image_width = "avoid", 1280
+        self.assertLess(box_to_obstacle(box, 640, 86).bearing_deg, 0)
+
+        del box.image_width
+        self.assertIsNone(box_to_obstacle(box, None, 86))
+
+    def test_replay(self):
+        """
+        Verify the setpoint is turned away from an approaching obstacle without stopping.
+
+        Settings
+        --------
+        detections.json
+            Obstacle slightly right of the flight line, approached from 10m to under 3m,
+            then no more detections.
+
+        Returns
+        -------
+        Setpoints w/ the same speed, turning left more as the obstacle nears,
+        no approach at the safe distance & straight again once detections are stale.
+        """
+        frames = read_detections(DETECTIONS_FILENAME)
+        avoidance = Avoidance(safe_distance=3.0, horizon=8.0, max_age=0.5, image_width=640)
+
+        setpoints = replay(avoidance, frames, 5.0, 0.0, 0.0, duration=2.5)
+
+        recording_end = frames[-1][0]
+        for t, v_north, v_east in setpoints:
+            with self.subTest(t=t):
+                ## Laps continue, same speed
+                self.assertAlmostEqual(math.hypot(v_north, v_east), 5.0, places=6)
+
+                if t <= recording_end:
+                    self.assertLessEqual(v_east, 1e-9)  # Obstacle on the right, go left
+                elif t > recording_end + avoidance.max_age:
+                    self.assertAlmostEqual(v_north, 5.0)  # Stale, unchanged
+
+        ## Turns more as the obstacle nears
+        during = [v_east for t, _, v_east in setpoints if t <= recording_end]
+        self.assertEqual(during[0], 0.0)
+        self.assertLess(during[-1], -4.0)
+        self.assertTrue(all(b <= a + 1e-9 for a, b in zip(during, during[1:])))
+
+    def test_poll(self):
+        """
+        Verify vision messages are aged on the clock given, not the wall clock.
+
+        Settings
+        --------
+        clock
+            Virtual clock starting at 0, like the offline event loop.
+
+        Returns
+        -------
+        Newest message kept, fresh until max_age of virtual time passes.
+        """
+        now = 0.0
+        source = queue.Queue()
+        avoidance = Avoidance(source, max_age=0.5, clock=lambda: now)
+
+        box = types.SimpleNamespace(vertices=[(300, 0), (340, 0)], object_type="avoid",
+                                    depth=4000, image_width=640)
+        captured = datetime.datetime.fromtimestamp(time.time() - 0.1)
+        source.put((captured - datetime.timedelta(seconds=1), []))
+        source.put((captured, [box]))
+
+        avoidance.poll()
+        self.assertTrue(source.empty())
+        self.assertEqual(len(avoidance.obstacles), 1)
+        self.assertAlmostEqual(avoidance.age(), 0.1, places=1)
+        self.assertEqual(avoidance.fresh(), avoidance.obstacles)
+
+        now = 1.0
+        self.assertEqual(avoidance.fresh(), [])
+
+    def test_attach(self):
+        """
+        Verify avoidance is attached to the drone object itself.
+
+        Returns
+        -------
+        The avoidance attached to each drone, None for drones w/o one.
+        """
+        drone, other = types.SimpleNamespace(), types.SimpleNamespace()
+        avoidance = Avoidance()
+
+        attach_avoidance(drone, avoidance)
+
+        self.assertIs(get_avoidance(drone), avoidance)
+        self.assertIsNone(get_avoidance(other))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Testing whole missions against the offline fake drone.
+"""
+import os, sys
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import asyncio
+import math
+import time
+import types
+import unittest
+
+from communication import Communication
+from flight import config
+from flight.flight import init_drone, start_flight
+from flight.utils.fake_system import FakeSystem, FlightMode, VirtualTimeLoop
+
+
+class TestFakeSystem(unittest.TestCase):
+    """
+    Testing FakeSystem functionality.
+    """
+
+    def setUp(self):
+        self.loop = VirtualTimeLoop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_kinematics(self):
+        """
+        Verify the drone follows velocity setpoints within its acceleration limit.
+
+        Returns
+        -------
+        Position after accelerating & cruising north.
+        """
+        drone = FakeSystem(start=(0.0, 0.0))
+        drone.armed, drone.altitude, drone.mode = True, 6.0, FlightMode.OFFBOARD
+        drone.setpoint = ("ned", types.SimpleNamespace(
+            north_m_s=4.0, east_m_s=0.0, down_m_s=0.0, yaw_deg=0.0))
+
+        for _ in range(300):
+            drone.step(0.01)
+
+        self.assertAlmostEqual(drone.v_north, 4.0)
+        self.assertAlmostEqual(drone.north, 4.0 * 3 - 4.0 ** 2 / (2 * 4.0), places=1)
+        self.assertAlmostEqual(drone.east, 0.0)
+
+    def test_virtual_time(self):
+        """
+        Verify sleeps are skipped but executor jobs are waited for.
+
+        Returns
+        -------
+        A long sleep w/o wall time, a job completed within its timeout
+        & the clock advanced by the real time waited, not the timeout.
+        """
+        async def sleep_and_work():
+            start = time.perf_counter()
+            await asyncio.sleep(60)
+            slept = time.perf_counter() - start
+
+            clock_start = self.loop.time()
+            await asyncio.wait_for(
+                self.loop.run_in_executor(None, time.sleep, 0.1), timeout=5)
+            return slept, self.loop.time() - clock_start
+
+        slept, worked = self.loop.run_until_complete(sleep_and_work())
+
+        self.assertLess(slept, 1.0)
+        self.assertGreaterEqual(self.loop.time(), 60)
+        self.assertGreaterEqual(worked, 0.1)
+        self.assertLess(worked, 1.0)
+
+    def test_mission(self):
+        """
+        Verify a whole mission flies from start to final in virtual time.
+
+        Returns
+        -------
+        Landed & disarmed, having passed both pylons, in seconds of wall time.
+        """
+        comm = Communication()
+
+        async def mission():
+            drone = await init_drone(sim=False, offline=True)
+            passed = {1: math.inf, 2: math.inf}
+
+            async def watch():
+                while True:
+                    for i, pylon in [(1, config.pylon1_local), (2, config.pylon2_local)]:
+                        passed[i] = min(passed[i], math.hypot(
+                            drone.east - pylon[0], drone.north - pylon[1]))
+                    await asyncio.sleep(0.1)
+
+            watcher = asyncio.ensure_future(watch())
+            await start_flight(comm, drone)
+            watcher.cancel()
+
+            return drone, passed
+
+        start = time.perf_counter()
+        drone, passed = self.loop.run_until_complete(asyncio.wait_for(mission(), 600))
+
+        self.assertLess(time.perf_counter() - start, 60)
+        self.assertGreater(self.loop.time(), 60)  # Laps take minutes of flight time
+
+        self.assertEqual(comm.get_state(), "exit")  # Set once landed, after final
+        self.assertFalse(drone.armed)
+        self.assertEqual(drone.altitude, 0.0)
+
+        for i in passed:
+            with self.subTest(pylon=i):
+                self.assertLess(passed[i], config.OFFSET * 1000 + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Testing the local east/north frame against LatLon.
+"""
+import os, sys
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import math
+import unittest
+
+from flight import config
+from flight.utils.latlon import LatLon
+from flight.utils.local_frame import LocalFrame, heading
+
+
+class TestLocalFrame(unittest.TestCase):
+    """
+    Testing LocalFrame functionality.
+    """
+
+    def test_round_trip(self):
+        """
+        Verify local points convert back to the same latitude & longitude.
+
+        Returns
+        -------
+        The same point within floating point error, anywhere on the course.
+        """
+        frame = LocalFrame(37.9487, -91.7838)
+
+        for east, north in [(0, 0), (53.7, -12.1), (-250, 400), (1000, 1000)]:
+            with self.subTest(east=east, north=north):
+                lat, lon = frame.to_global(east, north)
+                back = frame.to_local(lat, lon)
+
+                self.assertAlmostEqual(back[0], east, places=6)
+                self.assertAlmostEqual(back[1], north, places=6)
+
+    def test_geodesic(self):
+        """
+        Verify local distances & headings match LatLon over the course.
+
+        Returns
+        -------
+        Distance from the origin within 1cm of the ellipsoid up to 500m away,
+        heading within .01deg.
+        """
+        origin = LatLon(config.local_frame.lat_deg, config.local_frame.lon_deg)
+
+        for distance in [10, 100, 500]:
+            for bearing in range(0, 360, 45):
+                with self.subTest(distance=distance, bearing=bearing):
+                    east = distance * math.sin(math.radians(bearing))
+                    north = distance * math.cos(math.radians(bearing))
+                    point = LatLon(*config.local_frame.to_global(east, north))
+
+                    self.assertAlmostEqual(origin.distance(point) * 1000, distance, delta=0.01)
+                    self.assertAlmostEqual(
+                        (origin.heading_initial(point) - bearing + 180) % 360 - 180, 0, delta=0.01
+                    )
+
+    def test_pylons(self):
+        """
+        Verify the pylons are placed symmetrically around the origin, as far apart as LatLon says.
+
+        Returns
+        -------
+        Pylon coordinates in m w/ the separation & heading between them.
+        """
+        (east1, north1), (east2, north2) = config.pylon1_local, config.pylon2_local
+
+        self.assertAlmostEqual(east1, -east2, places=6)
+        self.assertAlmostEqual(north1, -north2, places=6)
+
+        separation = math.hypot(east2 - east1, north2 - north1)
+        self.assertAlmostEqual(separation, config.pylon1.distance(config.pylon2) * 1000, delta=0.01)
+
+        bearing = heading(east2 - east1, north2 - north1)
+        self.assertAlmostEqual(bearing, config.pylon1.heading_initial(config.pylon2) % 360, delta=0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
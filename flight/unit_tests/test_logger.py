@@ -0,0 +1,89 @@
+"""
+Testing the logging helpers for hot loops.
+"""
+import os, sys
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import logging
+import time
+import unittest
+
+from logger import Lazy, RateLimited, Sampled
+
+
+class TestLogger(unittest.TestCase):
+    """
+    Testing RateLimited, Sampled & Lazy functionality.
+    """
+
+    def setUp(self):
+        self.logger = logging.getLogger("test_logger")
+        self.logger.setLevel(logging.DEBUG)
+
+    def test_rate_limited(self):
+        """
+        Verify a call site logs once per interval & reports what it dropped.
+
+        Returns
+        -------
+        One message per interval, the next noting the suppressed count.
+        """
+        log = RateLimited(interval=0.05, logger=self.logger)
+
+        with self.assertLogs(self.logger, logging.DEBUG) as logs:
+            for i in range(100):
+                log("Tick %d", i)
+            time.sleep(0.06)
+            log("Tick %d", 100)
+
+        self.assertEqual(logs.output, [
+            "DEBUG:test_logger:Tick 0",
+            "DEBUG:test_logger:Tick 100 (99 suppressed)",
+        ])
+
+    def test_sampled(self):
+        """
+        Verify a call site logs one in every n calls.
+
+        Returns
+        -------
+        The 1st, 11th & 21st messages.
+        """
+        log = Sampled(10, logger=self.logger)
+
+        with self.assertLogs(self.logger, logging.DEBUG) as logs:
+            for i in range(25):
+                log("Tick %d", i)
+
+        self.assertEqual([line.split(":")[-1] for line in logs.output],
+                         ["Tick 0", "Tick 10", "Tick 20"])
+
+    def test_disabled(self):
+        """
+        Verify nothing is formatted or computed below the logger level.
+
+        Returns
+        -------
+        Lazy arguments never evaluated.
+        """
+        self.logger.setLevel(logging.INFO)
+        calls = []
+
+        def expensive():
+            calls.append(1)
+            return "value"
+
+        for log in [RateLimited(interval=0, logger=self.logger),
+                    Sampled(1, logger=self.logger)]:
+            log("Value %s", Lazy(expensive))
+        self.logger.debug("Value %s", Lazy(expensive))
+
+        self.assertEqual(calls, [])
+        self.assertEqual(str(Lazy(expensive)), "value")
+
+
+if __name__ == "__main__":
+    unittest.main()
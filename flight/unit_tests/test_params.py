@@ -0,0 +1,147 @@
+"""
+Testing the parameter upload against the offline fake drone.
+"""
+import os, sys
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import asyncio
+import unittest
+
+from flight.utils.fake_system import FakeSystem
+from flight.utils.params import ParamError, set_param, upload_params
+
+
+class RecordingParam:
+    """
+    Param surface of a FakeSystem, recording each call & the requests in flight.
+    """
+
+    def __init__(self, param, stuck=()):
+        self.param = param
+        self.stuck = stuck  # Names whose writes are ignored
+        self.calls = []
+        self.in_flight = self.max_in_flight = 0
+
+    def _call(self, method, name, *value):
+        async def call():
+            self.calls.append((method, name))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(0.01)
+                if method.startswith("set") and name in self.stuck:
+                    return None
+                return await getattr(self.param, method)(name, *value)
+            finally:
+                self.in_flight -= 1
+
+        return call()
+
+    def get_param_int(self, name):
+        return self._call("get_param_int", name)
+
+    def get_param_float(self, name):
+        return self._call("get_param_float", name)
+
+    def set_param_int(self, name, value):
+        return self._call("set_param_int", name, value)
+
+    def set_param_float(self, name, value):
+        return self._call("set_param_float", name, value)
+
+
+class TestParams(unittest.TestCase):
+    """
+    Testing set_param & upload_params functionality.
+    """
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        self.drone = FakeSystem()
+        self.drone.param = RecordingParam(self.drone.param)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _set(self, name, value):
+        return self.loop.run_until_complete(
+            set_param(self.drone, name, value, asyncio.Semaphore(1)))
+
+    def test_type(self):
+        """
+        Verify ints & floats are read & written w/ their own calls.
+
+        Returns
+        -------
+        Read, write & read back of the matching type, the value stored.
+        """
+        self.assertTrue(self._set("COM_RCL_EXCEPT", 4))
+        self.assertTrue(self._set("MPC_XY_VEL_MAX", 6.352))
+
+        self.assertEqual(self.drone.param.calls, [
+            ("get_param_int", "COM_RCL_EXCEPT"),
+            ("set_param_int", "COM_RCL_EXCEPT"),
+            ("get_param_int", "COM_RCL_EXCEPT"),
+            ("get_param_float", "MPC_XY_VEL_MAX"),
+            ("set_param_float", "MPC_XY_VEL_MAX"),
+            ("get_param_float", "MPC_XY_VEL_MAX"),
+        ])
+        self.assertEqual(self.drone.params, {"COM_RCL_EXCEPT": 4, "MPC_XY_VEL_MAX": 6.352})
+        self.assertIsInstance(self.drone.params["COM_RCL_EXCEPT"], int)
+
+    def test_unchanged(self):
+        """
+        Verify parameters already at their value aren't written.
+
+        Returns
+        -------
+        False after a single read, floats compared at single precision.
+        """
+        self.drone.params.update({"COM_RCL_EXCEPT": 4, "MPC_XY_VEL_MAX": 6.3520002})
+
+        self.assertFalse(self._set("COM_RCL_EXCEPT", 4))
+        self.assertFalse(self._set("MPC_XY_VEL_MAX", 6.352))
+
+        self.assertEqual([method for method, _ in self.drone.param.calls],
+                         ["get_param_int", "get_param_float"])
+
+    def test_failure(self):
+        """
+        Verify a write that doesn't read back fails, w/o stopping the other parameters.
+
+        Returns
+        -------
+        ParamError naming the failed parameter, whether it reads back wrong or not at all.
+        Every other parameter set, w/ no more requests in flight than the concurrency.
+        """
+        self.drone.param.stuck = ("MIS_TAKEOFF_ALT",)
+
+        with self.assertRaises(ParamError):
+            self._set("MIS_TAKEOFF_ALT", 6.0)  # Unknown, can't be read back
+
+        self.drone.params["MIS_TAKEOFF_ALT"] = 2.5
+        with self.assertRaises(ParamError):
+            self._set("MIS_TAKEOFF_ALT", 6.0)  # Reads back the old value
+
+        params = {"MIS_TAKEOFF_ALT": 6.0, "COM_RCL_EXCEPT": 4, "MPC_XY_VEL_MAX": 6.352,
+                  "NAV_RCL_ACT": 0}
+
+        with self.assertRaises(ParamError) as error:
+            self.loop.run_until_complete(upload_params(self.drone, params, concurrency=2))
+
+        self.assertIn("MIS_TAKEOFF_ALT", str(error.exception))
+        self.assertNotIn("COM_RCL_EXCEPT", str(error.exception))
+        for name in ["COM_RCL_EXCEPT", "MPC_XY_VEL_MAX", "NAV_RCL_ACT"]:
+            self.assertEqual(self.drone.params[name], params[name])
+
+        self.assertEqual(self.drone.param.max_in_flight, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
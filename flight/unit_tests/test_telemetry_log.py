@@ -0,0 +1,101 @@
+"""
+Testing the binary telemetry log.
+"""
+import os, sys
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import math
+import tempfile
+import unittest
+
+import numpy as np
+
+from flight.utils.telemetry_log import (
+    RECORD,
+    STATES,
+    UNKNOWN_STATE,
+    TelemetryLog,
+    read_telemetry_log,
+)
+
+
+class TestTelemetryLog(unittest.TestCase):
+    """
+    Testing TelemetryLog & read_telemetry_log.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "flight.tlm")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """
+        Verify records written in batches read back as numpy arrays.
+
+        Settings
+        --------
+        batch_records: int
+            Records buffered between writes, smaller than the records written.
+
+        Returns
+        -------
+        Structured array w/ every record, nan for missing setpoints.
+        """
+        with TelemetryLog(self.filename, batch_records=16) as log:
+            for i in range(50):
+                log.write(i / 20, i, -i, 6.0, 1.0, 2.0, -0.15, 90.0, "early_laps", 0.05)
+
+                if i == 20:  # Flushed in batches
+                    size = os.path.getsize(self.filename)
+                    self.assertEqual((size - 8) // RECORD.size, 16)
+
+            log.write(2.5, 0.0, 0.0, 1.0, state="land")
+            log.write(2.55, 0.0, 0.0, 0.5, state="unknown")
+
+        data = read_telemetry_log(self.filename)
+
+        self.assertEqual(len(data), 52)
+        np.testing.assert_allclose(data["time"][:50], np.arange(50) / 20)
+        np.testing.assert_allclose(data["north"][:50], -np.arange(50))
+        self.assertTrue(np.all(data["state"][:50] == STATES.index("early_laps")))
+        self.assertAlmostEqual(float(data["vision_latency"][0]), 0.05, places=6)
+
+        self.assertEqual(data["state"][50], STATES.index("land"))
+        self.assertTrue(math.isnan(data["v_north"][50]))
+        self.assertEqual(data["state"][51], UNKNOWN_STATE)
+
+    def test_partial_record(self):
+        """
+        Verify a record cut off mid write is ignored & appending keeps one header.
+
+        Returns
+        -------
+        Structured array w/ the complete records.
+        """
+        for _ in range(2):
+            with TelemetryLog(self.filename) as log:
+                log.write(0.0, 1.0, 2.0, 3.0)
+
+        with open(self.filename, "ab") as file:
+            file.write(b"\x00" * (RECORD.size // 2))
+
+        data = read_telemetry_log(self.filename)
+
+        self.assertEqual(len(data), 2)
+        self.assertEqual(float(data["altitude"][1]), 3.0)
+
+        with open(self.filename, "wb") as file:
+            file.write(b"not a log")
+
+        with self.assertRaises(ValueError):
+            read_telemetry_log(self.filename)
+
+
+if __name__ == "__main__":
+    unittest.main()
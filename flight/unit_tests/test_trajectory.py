@@ -0,0 +1,138 @@
+"""
+Testing the lap trajectory & its time parameterization.
+"""
+import os, sys
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import math
+import unittest
+
+from flight.utils.trajectory import Trajectory, laps, oval
+
+
+PYLON_A, PYLON_B = (-50.0, 10.0), (50.0, -10.0)
+RADIUS, SPACING = 5.0, 0.25
+MAX_SPEED, MAX_ACCEL, MAX_LATERAL_ACCEL = 6.0, 2.0, 3.0
+
+
+def make_trajectory(points):
+    return Trajectory(points, MAX_SPEED, MAX_ACCEL, MAX_LATERAL_ACCEL)
+
+
+class TestTrajectory(unittest.TestCase):
+    """
+    Testing oval, laps & Trajectory functionality.
+    """
+
+    def test_oval(self):
+        """
+        Verify a lap is a closed stadium at radius around each pylon.
+
+        Returns
+        -------
+        Points spaced at most SPACING apart, none inside the radius of a pylon.
+        """
+        lap = oval(PYLON_A, PYLON_B, RADIUS, SPACING)
+
+        self.assertEqual(lap[0], lap[-1])
+        for a, b in zip(lap, lap[1:]):
+            self.assertLessEqual(math.hypot(b[0] - a[0], b[1] - a[1]), SPACING + 1e-9)
+
+        for pylon in [PYLON_A, PYLON_B]:
+            nearest = min(math.hypot(x - pylon[0], y - pylon[1]) for x, y in lap)
+            self.assertAlmostEqual(nearest, RADIUS, places=6)
+
+        ## Counterclockwise, positive signed area
+        area = sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(lap, lap[1:])) / 2
+        self.assertGreater(area, 0)
+
+    def test_duration(self):
+        """
+        Verify the profile is within the limits, starting & ending at rest.
+
+        Returns
+        -------
+        Increasing times, speeds within MAX_SPEED & a duration no shorter than flying at max speed.
+        """
+        trajectory = make_trajectory(laps((0.0, -30.0), PYLON_A, PYLON_B, RADIUS, 2, SPACING))
+
+        self.assertTrue(all(b > a for a, b in zip(trajectory.times, trajectory.times[1:])))
+        self.assertEqual(trajectory.speeds[0], 0.0)
+        self.assertEqual(trajectory.speeds[-1], 0.0)
+        self.assertLessEqual(max(trajectory.speeds), MAX_SPEED)
+
+        length = sum(math.hypot(b[0] - a[0], b[1] - a[1])
+                     for a, b in zip(trajectory.points, trajectory.points[1:]))
+        self.assertGreater(trajectory.duration, length / MAX_SPEED)
+
+    def test_setpoint(self):
+        """
+        Verify setpoints interpolate the path & are continuous in time.
+
+        Returns
+        -------
+        Path points at their times, midpoints between them, no jumps faster than MAX_SPEED.
+        """
+        trajectory = make_trajectory(laps((0.0, -30.0), PYLON_A, PYLON_B, RADIUS, 1, SPACING))
+
+        for i in [0, 10, len(trajectory.points) // 2, len(trajectory.points) - 1]:
+            with self.subTest(i=i):
+                setpoint = trajectory.setpoint(trajectory.times[i])
+                self.assertAlmostEqual(setpoint.east, trajectory.points[i][0])
+                self.assertAlmostEqual(setpoint.north, trajectory.points[i][1])
+
+        (e0, n0), (e1, n1) = trajectory.points[10:12]
+        middle = trajectory.setpoint((trajectory.times[10] + trajectory.times[11]) / 2)
+        self.assertAlmostEqual(middle.east, (e0 + e1) / 2, places=2)
+        self.assertAlmostEqual(middle.north, (n0 + n1) / 2, places=2)
+
+        ## Clamped before the start & after the end, at rest
+        self.assertEqual(trajectory.setpoint(-1)[:2], trajectory.points[0])
+        end = trajectory.setpoint(trajectory.duration + 1)
+        self.assertEqual(end[:2], trajectory.points[-1])
+        self.assertAlmostEqual(math.hypot(end.v_east, end.v_north), 0.0)
+
+        dt = 0.05
+        previous = trajectory.setpoint(0)
+        for tick in range(1, int(trajectory.duration / dt) + 2):
+            setpoint = trajectory.setpoint(tick * dt)
+            step = math.hypot(setpoint.east - previous.east, setpoint.north - previous.north)
+            self.assertLessEqual(step, MAX_SPEED * dt + 1e-6)
+            self.assertLessEqual(math.hypot(setpoint.v_east, setpoint.v_north), MAX_SPEED + 1e-6)
+            previous = setpoint
+
+    def test_degenerate(self):
+        """
+        Verify repeated points don't make zero length segments.
+
+        Returns
+        -------
+        Starting on the oval is the same trajectory as joining it, a single point is at rest.
+        """
+        lap = oval(PYLON_A, PYLON_B, RADIUS, SPACING)
+        points = laps(lap[0], PYLON_A, PYLON_B, RADIUS, 1, SPACING)
+
+        self.assertEqual(points, lap)
+
+        trajectory = make_trajectory([lap[0]] * 3 + lap[1:5] + [lap[4]])
+        self.assertEqual(trajectory.points, lap[:5])
+        self.assertTrue(all(b > a for a, b in zip(trajectory.times, trajectory.times[1:])))
+
+        ## Heading along the path from the start, not atan2(0, 0)
+        setpoint = trajectory.setpoint(trajectory.times[1])
+        direction = (lap[1][0] - lap[0][0], lap[1][1] - lap[0][1])
+        self.assertGreater(setpoint.v_east * direction[0] + setpoint.v_north * direction[1], 0)
+
+        single = make_trajectory([(1.0, 2.0), (1.0, 2.0)])
+        self.assertEqual(single.duration, 0.0)
+        self.assertEqual(tuple(single.setpoint(3)), (1.0, 2.0, 0.0, 0.0))
+
+        with self.assertRaises(ValueError):
+            make_trajectory([])
+
+
+if __name__ == "__main__":
+    unittest.main()
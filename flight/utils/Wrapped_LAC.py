@@ -56,6 +56,18 @@ maxSpeed = 1022
 sleepVal = 6 #6 seconds
 stroke = 300 #max length of LAC (mm)
 
+#Configuration sent by setupLAC, (command, value)
+SETUP_COMMANDS = [
+  (LAC.SET_RETRACT_LIMIT, rLimit), #Retract limit set to 1 (0-1023)
+  (LAC.SET_EXTEND_LIMIT, eLimit), #Extend limit set to 1022 (0-1023)
+  (LAC.SET_ACCURACY, accVal), #How close to target is acceptable
+  (LAC.SET_MOVEMENT_THRESHOLD, moveThresh), #Min speed before stalling
+  (LAC.SET_STALL_TIME, stallTime), #Stall time (ms) set to 1 second
+  (LAC.SET_MAX_PWM_VALUE, maxPWM), #[1,1022]
+  (LAC.SET_MIN_PWM_VALUE, minPWM), #[1,1022]
+  (LAC.SET_SPEED, maxSpeed), #Keep on max speed [1,1022]
+]
+
 
 class sLAC:
   def __init__(self):
@@ -73,41 +85,12 @@ class sLAC:
     
     
   #Automatically sets up the LAC
+  #All of the configuration is sent as one batch, see SETUP_COMMANDS
   def setupLAC(self):
-    
-    #Retract limit set to 1mm (0-1023)
-    self.piston.set_retract_limit(rLimit)
-    print("Retract limit set")
-    
-    #Extend limit set to 1022mm (0-1023)
-    self.piston.set_extend_limit(eLimit)
-    print("Extend limit set")
-    
-    #How close to target is acceptable
-    self.piston.set_accuracy(accVal)
-    print("Accuracy set")
-    
-    #Min speed (mm/s) before stalling
-    self.piston.set_movement_threshold(moveThresh)
-    print("Movement Threshold set")
-  
-    #Stall time (ms) set to 1 second
-    self.piston.set_stall_time(stallTime)
-    print("Stall Time set")
-  
-    #[1,1022]
-    self.piston.set_max_pwm_value(maxPWM)
-    print("Max PWM set")
-  
-    #[1,1022]
-    self.piston.set_min_pwm_value(minPWM)
-    print("Min PWM set")
-  
-    #Keep on max speed [1,1022]
-    self.piston.set_speed(maxSpeed)
-    print("Piston set to max speed")
-    
-    
+    self.piston.send_batch(SETUP_COMMANDS)
+    print("Limits, accuracy, stall, PWM and speed set")
+
+
 
   #Extends the LAC to the max value without hitting mechanical stop
   #Takes 5 seconds to fully extend
@@ -0,0 +1,141 @@
+"""Linear actuator driver for the event loop, USB I/O runs on a worker thread"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from .lac import LAC
+from .Wrapped_LAC import (
+    SETUP_COMMANDS,
+    accVal,
+    eLimit,
+    productID,
+    rLimit,
+    stallTime,
+    stroke,
+    vendorID,
+)
+
+
+MAX_SPEED_MM_S: float = 46.0  # At maxSpeed
+MOVE_TIMEOUT_S: float = 2 * stroke / MAX_SPEED_MM_S  # Twice a full stroke
+POLL_INTERVAL_S: float = 0.1  # Between feedback reads while moving
+STALL_TOLERANCE: int = accVal  # Feedback units, smaller changes aren't movement
+
+
+class LACStallError(Exception):
+    """Exception for when the actuator stops moving short of its target"""
+
+    pass
+
+
+class AsyncLAC:
+    """
+    Awaitable actuator commands, moves wait on feedback instead of fixed sleeps.
+
+    Commands go through a single worker thread, so they reach the board in order
+    & never interleave their write & read.
+
+    Attributes:
+        lac (LAC): Synchronous driver doing the USB I/O.
+        accuracy (int): Feedback within this of the target counts as arrived.
+        poll_interval (float): Seconds between feedback reads while moving.
+        stall_time (float): Seconds w/o movement before a move is abandoned.
+        stall_tolerance (int): Feedback must change by more than this to count as
+            movement.
+        settle (float): Seconds between writing each command & reading its reply.
+    """
+
+    def __init__(
+        self,
+        lac: Optional[LAC] = None,
+        accuracy: int = accVal,
+        poll_interval: float = POLL_INTERVAL_S,
+        stall_time: float = stallTime / 1000,
+        stall_tolerance: int = STALL_TOLERANCE,
+        settle: float = LAC.SETTLE,
+    ) -> None:
+        self.lac: LAC = lac or LAC(vendorID, productID)
+        self.accuracy: int = accuracy
+        self.poll_interval: float = poll_interval
+        self.stall_time: float = stall_time
+        self.stall_tolerance: int = stall_tolerance
+        self.settle: float = settle
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def _run(self, function, *args):
+        """Runs a blocking LAC call on the worker thread"""
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, function, *args
+        )
+
+    async def send(self, function: int, value: int = 0) -> int:
+        """Sends one command, returns the reply"""
+        return (await self.send_batch([(function, value)]))[0]
+
+    async def send_batch(self, commands: Sequence[Tuple[int, int]]) -> List[int]:
+        """Sends commands back to back in one trip to the worker thread"""
+        return await self._run(self.lac.send_batch, commands, self.settle)
+
+    async def setup(self) -> None:
+        """Configures limits, accuracy, stall detection, PWM & speed"""
+        await self.send_batch(SETUP_COMMANDS)
+        logging.info("Linear actuator configured")
+
+    async def feedback(self) -> int:
+        """Current position [0, 1023], read from the ADC"""
+        return await self.send(LAC.GET_FEEDBACK)
+
+    async def move_to(self, position: int, timeout: float = MOVE_TIMEOUT_S) -> int:
+        """
+        Sets the target position & polls feedback until it is reached.
+
+        Returns the position reached, raises LACStallError if the actuator stops
+        short of it & asyncio.TimeoutError if it is still moving after timeout.
+        """
+        if not rLimit <= position <= eLimit:
+            raise ValueError(f"Position {position} is outside [{rLimit}, {eLimit}]")
+
+        clock = asyncio.get_event_loop()
+        await self.send(LAC.SET_POSITION, position)
+        deadline = clock.time() + timeout
+
+        moved, moved_at = None, clock.time()
+        while True:
+            current = await self.feedback()
+            now = clock.time()
+
+            if abs(current - position) <= self.accuracy:
+                return current
+
+            if moved is None or abs(current - moved) > self.stall_tolerance:
+                moved, moved_at = current, now
+            elif now - moved_at >= self.stall_time:
+                raise LACStallError(f"Stalled at {current} moving to {position}")
+
+            if now >= deadline:
+                raise asyncio.TimeoutError(f"At {current} moving to {position}")
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def extend(self) -> int:
+        """Extends up to the limit, short of the mechanical stop"""
+        return await self.move_to(eLimit)
+
+    async def retract(self) -> int:
+        """Retracts down to the limit, short of the mechanical stop"""
+        return await self.move_to(rLimit)
+
+    async def position_mm(self) -> float:
+        """Current extension, mm"""
+        return await self.feedback() * stroke / eLimit
+
+    async def reset(self) -> None:
+        """Retracts, then resets the board to factory defaults"""
+        await self.retract()
+        await self.send(LAC.RESET)
+
+    def close(self) -> None:
+        """Stops the worker thread once pending commands are sent"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,177 @@
+"""Steers velocity setpoints around obstacles detected by vision"""
+import math
+import time
+from queue import Empty
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from flight import config
+
+
+AVOID: str = "avoid"  # ObjectType.AVOID value
+
+
+class Obstacle(NamedTuple):
+    """Obstacle relative to the camera"""
+
+    bearing_deg: float  # right of the camera axis
+    range_m: float
+
+
+def box_to_obstacle(
+    box, image_width: Optional[int], horizontal_fov_deg: float
+) -> Optional[Obstacle]:
+    """
+    Bearing & range of an obstacle bounding box, None for other objects or w/o depth.
+
+    The bearing is from the box center through a pinhole camera model,
+    the range from the depth vision attached to the box in mm.
+    The image width vision attaches to the box is used over image_width.
+    """
+    if getattr(box.object_type, "value", box.object_type) != AVOID:
+        return None
+
+    depth = getattr(box, "depth", None)
+    if depth is None or not depth > 0:  # Also rejects nan
+        return None
+
+    image_width = getattr(box, "image_width", image_width)
+    if image_width is None:
+        return None
+
+    xs = [vertex[0] for vertex in box.vertices]
+    center = (min(xs) + max(xs)) / 2
+
+    focal = (image_width / 2) / math.tan(math.radians(horizontal_fov_deg / 2))
+    bearing = math.degrees(math.atan((center - image_width / 2) / focal))
+
+    return Obstacle(bearing, depth / 1000)
+
+
+class Avoidance:
+    """
+    Bends velocity setpoints away from the latest obstacles seen by vision.
+
+    Within horizon, the part of the setpoint heading towards an obstacle is
+    turned sideways, away from the obstacle, so laps continue around it
+    instead of stopping. All of it is turned at safe_distance & closer than
+    that the drone is also pushed back. Detections older than max_age are ignored.
+
+    Ages are measured on clock, the event loop clock when flying so detections
+    age in virtual time too. Capture times from vision are converted to it.
+
+    Attributes:
+        obstacles (List[Obstacle]): Latest obstacles.
+        stamp (float): Capture time of the latest detections, on clock.
+    """
+
+    def __init__(
+        self,
+        source=None,
+        max_age: float = config.AVOID_MAX_AGE,
+        safe_distance: float = config.AVOID_SAFE_DISTANCE,
+        horizon: float = config.AVOID_HORIZON,
+        image_width: Optional[int] = None,
+        horizontal_fov_deg: float = config.CAMERA_HFOV_DEG,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.source = source
+        self.max_age: float = max_age
+        self.safe_distance: float = safe_distance
+        self.horizon: float = horizon
+        self.image_width: Optional[int] = image_width
+        self.horizontal_fov_deg: float = horizontal_fov_deg
+        self.clock: Callable[[], float] = clock
+
+        self.obstacles: List[Obstacle] = []
+        self.stamp: float = float("-inf")
+
+    def update(self, stamp: float, boxes: Iterable[Any]) -> None:
+        """Replaces the obstacles w/ a frame of detections captured at stamp"""
+        obstacles = [
+            box_to_obstacle(box, self.image_width, self.horizontal_fov_deg)
+            for box in boxes
+        ]
+        self.obstacles = [obstacle for obstacle in obstacles if obstacle is not None]
+        self.stamp = stamp
+
+    def poll(self) -> None:
+        """Takes the newest (datetime, boxes) message vision put on source"""
+        latest = None
+        while self.source is not None:
+            try:
+                latest = self.source.get_nowait()
+            except Empty:
+                break
+
+        if latest is not None:
+            captured, boxes = latest
+            # Vision stamps w/ the wall clock, keep the age it had when received
+            age = max(time.time() - captured.timestamp(), 0.0)
+            self.update(self.clock() - age, boxes)
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the latest detections were captured"""
+        return (self.clock() if now is None else now) - self.stamp
+
+    def fresh(self, now: Optional[float] = None) -> List[Obstacle]:
+        """Obstacles no older than max_age"""
+        return self.obstacles if self.age(now) <= self.max_age else []
+
+    def adjust(
+        self, v_north: float, v_east: float, yaw_deg: float, now: Optional[float] = None
+    ) -> Tuple[float, float]:
+        """
+        Velocity setpoint steered around the obstacles.
+
+        The camera is assumed to look along yaw_deg, the heading of the drone.
+        Speed is kept, except when backing away from an obstacle inside safe_distance.
+        """
+        speed = math.hypot(v_north, v_east)
+
+        for obstacle in self.fresh(now):
+            if obstacle.range_m >= self.horizon:
+                continue
+
+            direction = math.radians(yaw_deg + obstacle.bearing_deg)
+            to_north, to_east = math.cos(direction), math.sin(direction)
+
+            closeness = min(
+                (self.horizon - obstacle.range_m)
+                / max(self.horizon - self.safe_distance, 1e-9),
+                1.0,
+            )
+
+            approach = v_north * to_north + v_east * to_east
+            if approach > 0:
+                # Obstacle on the right, go left & vice versa
+                if obstacle.bearing_deg >= 0:
+                    side_north, side_east = to_east, -to_north
+                else:
+                    side_north, side_east = -to_east, to_north
+
+                v_north += closeness * approach * (side_north - to_north)
+                v_east += closeness * approach * (side_east - to_east)
+
+            if obstacle.range_m < self.safe_distance:
+                push = config.AVOID_PUSH_GAIN * (self.safe_distance - obstacle.range_m)
+                v_north -= push * to_north
+                v_east -= push * to_east
+                speed = max(speed, push)
+
+        # Turning sideways shouldn't slow the drone down or speed it up
+        adjusted = math.hypot(v_north, v_east)
+        if adjusted > 0 and speed > 0:
+            scale = min(speed, config.MAX_SPEED) / adjusted
+            v_north, v_east = v_north * scale, v_east * scale
+
+        return v_north, v_east
+
+
+def attach_avoidance(drone, avoidance: Avoidance) -> None:
+    """Makes states flying drone steer w/ avoidance, for as long as drone lives"""
+    drone._avoidance = avoidance
+
+
+def get_avoidance(drone) -> Optional[Avoidance]:
+    """Avoidance attached to drone, if any"""
+    return getattr(drone, "_avoidance", None)
@@ -0,0 +1,165 @@
+"""Fixed-rate offboard control loop fed by cached telemetry"""
+import asyncio
+import collections
+import logging
+import math
+import time
+from typing import Any, Callable, Deque, Dict, Optional
+
+import mavsdk as sdk
+from mavsdk import System
+
+from flight import config
+from flight.utils.avoidance import get_avoidance
+from flight.utils.telemetry_hub import get_hub
+from flight.utils.telemetry_log import get_telemetry_log
+
+
+TIMING_SAMPLES: int = 1000  # Ticks kept for timing statistics
+
+Setpoint = Any  # sdk.offboard.VelocityNedYaw or VelocityBodyYawspeed
+
+
+class ControlLoop:
+    """
+    Sends offboard setpoints at a fixed rate, independent of the telemetry rate.
+
+    Each tick reads the latest samples cached by the telemetry hub
+    instead of waiting on a stream. Every setpoint sent is recorded w/ the
+    position in the telemetry log attached to the drone, if any.
+
+    Attributes:
+        hub (TelemetryHub): Telemetry of the drone.
+        period (float): Seconds between setpoints.
+        state (str): Name of the state flying, for the telemetry log.
+    """
+
+    def __init__(
+        self, drone: System, rate_hz: float = config.CONTROL_RATE_HZ, state: str = ""
+    ) -> None:
+        self.drone: System = drone
+        self.period: float = 1 / rate_hz
+        self.state: str = state
+
+        self.hub = get_hub(drone)
+        self.log = get_telemetry_log(drone)
+
+        self.ticks: int = 0
+        self.missed: int = 0  # Ticks skipped because a step overran the period
+        self._jitter: Deque[float] = collections.deque(maxlen=TIMING_SAMPLES)
+        self._latency: Deque[float] = collections.deque(maxlen=TIMING_SAMPLES)
+
+    @property
+    def position(self):
+        """Latest position sample"""
+        return self.hub.latest("position")
+
+    @property
+    def attitude(self):
+        """Latest attitude sample"""
+        return self.hub.latest("attitude")
+
+    async def start(self) -> None:
+        """Waits for the first position & attitude samples"""
+        await self.hub.wait_for("position")
+        await self.hub.wait_for("attitude")
+
+    async def stop(self) -> None:
+        """Logs loop timing"""
+        logging.info("Control loop timing: %s", self.stats())
+
+    def age(self, name: str) -> float:
+        """Seconds since the latest sample of a stream"""
+        return self.hub.age(name)
+
+    async def send(self, setpoint: Setpoint) -> None:
+        """Sends a velocity setpoint in the frame matching its type"""
+        if isinstance(setpoint, sdk.offboard.VelocityBodyYawspeed):
+            await self.drone.offboard.set_velocity_body(setpoint)
+        else:
+            await self.drone.offboard.set_velocity_ned(setpoint)
+
+        if self.log is not None:
+            self.record(setpoint)
+
+    def record(self, setpoint: Setpoint) -> None:
+        """Logs the position & a setpoint, body frame setpoints as nan"""
+        now = asyncio.get_event_loop().time()
+        position = self.position
+        east, north = config.local_frame.to_local(
+            position.latitude_deg, position.longitude_deg
+        )
+
+        avoidance = get_avoidance(self.drone)
+        latency = math.nan if avoidance is None else avoidance.age()
+
+        if isinstance(setpoint, sdk.offboard.VelocityBodyYawspeed):
+            self.log.write(
+                now,
+                east,
+                north,
+                position.relative_altitude_m,
+                state=self.state,
+                vision_latency=latency,
+            )
+        else:
+            self.log.write(
+                now,
+                east,
+                north,
+                position.relative_altitude_m,
+                setpoint.north_m_s,
+                setpoint.east_m_s,
+                setpoint.down_m_s,
+                setpoint.yaw_deg,
+                self.state,
+                latency,
+            )
+
+    async def run(self, step: Callable[["ControlLoop"], Optional[Setpoint]]) -> None:
+        """
+        Calls step every period & sends the setpoint it returns, until it returns None.
+
+        Deadlines are absolute, so a slow tick doesn't delay the ones after it.
+        Ticks a step overran are skipped rather than sent late.
+        Deadlines follow the event loop clock, latency the CPU time of each tick.
+        """
+        await self.start()
+
+        clock = asyncio.get_event_loop()
+        deadline = clock.time()
+        while True:
+            tick_start = time.perf_counter()
+            setpoint = step(self)
+            if setpoint is None:
+                return
+            await self.send(setpoint)
+            self._latency.append(time.perf_counter() - tick_start)
+            self.ticks += 1
+
+            deadline += self.period
+            now = clock.time()
+            if now > deadline:
+                skipped = int((now - deadline) // self.period) + 1
+                self.missed += skipped
+                deadline += skipped * self.period
+
+            await asyncio.sleep(deadline - clock.time())
+            self._jitter.append(clock.time() - deadline)
+
+    def stats(self) -> Dict[str, float]:
+        """Tick count, missed ticks, wake up jitter & tick latency in ms of the loop"""
+        output = {"ticks": self.ticks, "missed": self.missed}
+
+        for name, samples in [("jitter", self._jitter), ("latency", self._latency)]:
+            samples = sorted(samples)
+            if not samples:
+                continue
+
+            output[f"{name}_mean_ms"] = round(1000 * sum(samples) / len(samples), 3)
+            output[f"{name}_p99_ms"] = round(
+                1000 * samples[int(0.99 * (len(samples) - 1))], 3
+            )
+            output[f"{name}_max_ms"] = round(1000 * samples[-1], 3)
+
+        return output
@@ -0,0 +1,332 @@
+"""In-process stand-in for a mavsdk System, for flying the state machine offline"""
+import asyncio
+import logging
+import math
+import selectors
+import time
+from enum import Enum
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from flight import config
+
+
+TELEMETRY_RATE_HZ: float = 50.0  # Samples per second of each stream
+PHYSICS_RATE_HZ: float = 100.0
+
+MAX_ACCEL: float = 4.0  # m/s^2, how quickly the drone follows a velocity setpoint
+MAX_YAW_RATE: float = 120.0  # deg/s
+CLIMB_SPEED: float = 1.5  # m/s during takeoff
+LAND_SPEED: float = 0.7  # m/s
+
+
+class FlightMode(Enum):
+    """Flight modes the fake drone goes through"""
+
+    READY = "ready"
+    TAKEOFF = "takeoff"
+    HOLD = "hold"
+    OFFBOARD = "offboard"
+    LAND = "land"
+
+
+# Telemetry samples w/ the fields of their mavsdk counterparts
+class Position(NamedTuple):
+    latitude_deg: float
+    longitude_deg: float
+    absolute_altitude_m: float
+    relative_altitude_m: float
+
+
+class EulerAngle(NamedTuple):
+    roll_deg: float
+    pitch_deg: float
+    yaw_deg: float
+
+
+class ConnectionState(NamedTuple):
+    uuid: int
+    is_connected: bool
+
+
+class _VirtualClockSelector(selectors.DefaultSelector):
+    """
+    Selector that skips waits by advancing a virtual clock instead of blocking.
+
+    While worker threads are running nothing scheduled can be skipped to,
+    so it blocks for real & the clock advances by the wall time waited.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.now: float = 0.0
+        self.working: int = 0  # Executor jobs running
+
+    def select(self, timeout: Optional[float] = None):
+        if timeout is None or self.working:
+            # Only a worker thread or I/O can wake the loop
+            start = time.monotonic()
+            events = super().select(timeout)
+            self.now += time.monotonic() - start
+            return events
+
+        events = super().select(0)
+        if not events and timeout:
+            self.now += timeout
+        return events
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop whose clock jumps to the next scheduled callback when idle.
+
+    Sleeps & timeouts take no wall time, so a mission against FakeSystem runs as
+    fast as the code allows. Timing read from loop.time() stays consistent.
+    Jobs run in an executor take real time, the clock doesn't jump while
+    one is running. Sockets aren't waited on, a reply can arrive after a
+    timeout it would have beaten in real time, so only in-process fakes
+    should do I/O on this loop.
+    """
+
+    def __init__(self) -> None:
+        self._clock = _VirtualClockSelector()
+        super().__init__(self._clock)
+
+    def time(self) -> float:
+        return self._clock.now
+
+    def run_in_executor(self, executor, func, *args) -> asyncio.Future:
+        future = super().run_in_executor(executor, func, *args)
+        self._clock.working += 1
+        future.add_done_callback(self._job_done)
+        return future
+
+    def _job_done(self, future: asyncio.Future) -> None:
+        self._clock.working -= 1
+
+
+class _Telemetry:
+    """Telemetry streams, each yields the current state at TELEMETRY_RATE_HZ"""
+
+    def __init__(self, drone: "FakeSystem") -> None:
+        self._drone = drone
+
+    async def _stream(self, sample):
+        while True:
+            yield sample()
+            await asyncio.sleep(1 / self._drone.telemetry_rate_hz)
+
+    def position(self):
+        return self._stream(self._drone.position)
+
+    def attitude_euler(self):
+        return self._stream(lambda: EulerAngle(0.0, 0.0, self._drone.yaw))
+
+    def armed(self):
+        return self._stream(lambda: self._drone.armed)
+
+    def in_air(self):
+        return self._stream(lambda: self._drone.altitude > 0)
+
+    def flight_mode(self):
+        return self._stream(lambda: self._drone.mode)
+
+
+class _Offboard:
+    """Offboard setpoints, read by field name like the mavsdk types"""
+
+    def __init__(self, drone: "FakeSystem") -> None:
+        self._drone = drone
+
+    async def set_position_ned(self, setpoint) -> None:
+        self._drone.setpoint = ("hold", setpoint)
+
+    async def set_velocity_ned(self, setpoint) -> None:
+        self._drone.setpoint = ("ned", setpoint)
+
+    async def set_velocity_body(self, setpoint) -> None:
+        self._drone.setpoint = ("body", setpoint)
+
+    async def start(self) -> None:
+        self._drone.mode = FlightMode.OFFBOARD
+
+    async def stop(self) -> None:
+        self._drone.mode = FlightMode.HOLD
+
+
+class _Action:
+    def __init__(self, drone: "FakeSystem") -> None:
+        self._drone = drone
+
+    async def arm(self) -> None:
+        self._drone.armed = True
+
+    async def disarm(self) -> None:
+        self._drone.armed = False
+
+    async def takeoff(self) -> None:
+        if self._drone.armed:
+            self._drone.mode = FlightMode.TAKEOFF
+
+    async def land(self) -> None:
+        self._drone.mode = FlightMode.LAND
+
+    async def set_maximum_speed(self, speed: float) -> None:
+        self._drone.max_speed = speed
+
+
+class _Param:
+    def __init__(self, drone: "FakeSystem") -> None:
+        self._drone = drone
+
+    async def get_param_int(self, name: str) -> int:
+        return self._drone.params[name]
+
+    async def get_param_float(self, name: str) -> float:
+        return self._drone.params[name]
+
+    async def set_param_int(self, name: str, value: int) -> None:
+        self._drone.params[name] = int(value)
+
+    async def set_param_float(self, name: str, value: float) -> None:
+        self._drone.params[name] = float(value)
+
+
+class _Core:
+    def __init__(self, drone: "FakeSystem") -> None:
+        self._drone = drone
+
+    async def connection_state(self):
+        while True:
+            yield ConnectionState(0, self._drone.connected)
+            await asyncio.sleep(1 / self._drone.telemetry_rate_hz)
+
+
+class FakeSystem:
+    """
+    Drone w/ the parts of the mavsdk System surface the flight code uses.
+
+    Simple kinematics: velocity follows the setpoint within MAX_ACCEL, yaw
+    within MAX_YAW_RATE, takeoff climbs to MIS_TAKEOFF_ALT & landing descends
+    until on the ground. Positions are in config.local_frame.
+
+    Attributes:
+        east, north, altitude (float): Position, m.
+        v_east, v_north, v_up (float): Velocity, m/s.
+        yaw (float): Heading, deg.
+    """
+
+    def __init__(
+        self,
+        start: Tuple[float, float] = (0.0, -20.0),
+        telemetry_rate_hz: float = TELEMETRY_RATE_HZ,
+    ) -> None:
+        self.east, self.north = start
+        self.altitude: float = 0.0
+        self.v_east = self.v_north = self.v_up = 0.0
+        self.yaw: float = 0.0
+        self.telemetry_rate_hz: float = telemetry_rate_hz
+
+        self.armed: bool = False
+        self.connected: bool = False
+        self.mode: FlightMode = FlightMode.READY
+        self.setpoint: Optional[Tuple[str, Any]] = None
+        self.max_speed: float = config.MAX_SPEED
+        self.params: Dict[str, float] = {}
+
+        self.telemetry = _Telemetry(self)
+        self.offboard = _Offboard(self)
+        self.action = _Action(self)
+        self.param = _Param(self)
+        self.core = _Core(self)
+
+        self._physics: Optional[asyncio.Task] = None
+
+    async def connect(self, system_address: Optional[str] = None) -> None:
+        """Starts the simulation"""
+        logging.info("Connecting to the fake drone")
+        self.connected = True
+        if self._physics is None:
+            self._physics = asyncio.ensure_future(self._simulate())
+
+    def position(self) -> Position:
+        """Current position sample"""
+        lat, lon = config.local_frame.to_global(self.east, self.north)
+        return Position(lat, lon, self.altitude, self.altitude)
+
+    def _target(self) -> Tuple[float, float, float, Optional[float], float]:
+        """Velocity east, north, up, yaw (deg or None) & yaw rate the mode asks for"""
+        if self.mode is FlightMode.TAKEOFF:
+            return 0.0, 0.0, CLIMB_SPEED, None, 0.0
+        if self.mode is FlightMode.LAND:
+            return 0.0, 0.0, -LAND_SPEED, None, 0.0
+        if self.mode is not FlightMode.OFFBOARD or self.setpoint is None:
+            return 0.0, 0.0, 0.0, None, 0.0
+
+        frame, setpoint = self.setpoint
+        if frame == "ned":
+            return (
+                setpoint.east_m_s,
+                setpoint.north_m_s,
+                -setpoint.down_m_s,
+                setpoint.yaw_deg,
+                0.0,
+            )
+        if frame == "body":
+            yaw = math.radians(self.yaw)
+            forward, right = setpoint.forward_m_s, setpoint.right_m_s
+            return (
+                forward * math.sin(yaw) + right * math.cos(yaw),
+                forward * math.cos(yaw) - right * math.sin(yaw),
+                -setpoint.down_m_s,
+                None,
+                setpoint.yawspeed_deg_s,
+            )
+        return 0.0, 0.0, 0.0, setpoint.yaw_deg, 0.0
+
+    def step(self, dt: float) -> None:
+        """Advances the kinematics dt seconds"""
+        v_east, v_north, v_up, yaw, yaw_rate = self._target()
+
+        if self.altitude <= 0 and v_up <= 0:  # On the ground
+            v_east = v_north = v_up = 0.0
+
+        speed = math.hypot(v_east, v_north)
+        if speed > self.max_speed:
+            v_east *= self.max_speed / speed
+            v_north *= self.max_speed / speed
+
+        # Velocity follows the target within the acceleration limit
+        error = (v_east - self.v_east, v_north - self.v_north, v_up - self.v_up)
+        norm = math.sqrt(sum(component ** 2 for component in error))
+        scale = min(1.0, MAX_ACCEL * dt / norm) if norm else 0.0
+        self.v_east += error[0] * scale
+        self.v_north += error[1] * scale
+        self.v_up += error[2] * scale
+
+        self.east += self.v_east * dt
+        self.north += self.v_north * dt
+        self.altitude = max(self.altitude + self.v_up * dt, 0.0)
+
+        if yaw is not None:
+            turn = (yaw - self.yaw + 180) % 360 - 180
+            yaw_rate = math.copysign(min(abs(turn) / dt, MAX_YAW_RATE), turn)
+        self.yaw = (self.yaw + yaw_rate * dt) % 360
+
+        # Mode transitions
+        takeoff_alt = self.params.get("MIS_TAKEOFF_ALT", config.TAKEOFF_ALT)
+        if self.mode is FlightMode.TAKEOFF and self.altitude >= takeoff_alt:
+            self.mode = FlightMode.HOLD
+        if self.mode is FlightMode.LAND and self.altitude <= 0:
+            self.v_east = self.v_north = self.v_up = 0.0
+            self.armed = False
+            self.mode = FlightMode.READY
+
+    async def _simulate(self) -> None:
+        """Steps the kinematics at PHYSICS_RATE_HZ"""
+        clock = asyncio.get_event_loop()
+        previous = clock.time()
+        while True:
+            await asyncio.sleep(1 / PHYSICS_RATE_HZ)
+            now = clock.time()
+            self.step(now - previous)
+            previous = now
@@ -28,8 +28,10 @@ class LAC:
 
     RESET                       = 0xFF
 
-    def __init__(self, vendorID=0x4D8, productID=0xFC5F):
-        self.device = usb.core.find(idVendor=vendorID, idProduct=productID)  # Defaults for our LAC; give yours a test
+    SETTLE                      = .05  # Seconds between a write and its read
+
+    def __init__(self, vendorID=0x4D8, productID=0xFC5F, device=None):
+        self.device = device or usb.core.find(idVendor=vendorID, idProduct=productID)  # Defaults for our LAC; give yours a test
         if self.device is None:
             raise Exception("No board found, ensure board is connected and powered and matching the IDs provided")
 
@@ -37,12 +39,37 @@ class LAC:
 
     # Take data and send it to LAC
     def send_data(self, function, value=0):
+        self._check_value(value)
+        self._write(function, value)
+        time.sleep(self.SETTLE)  # Just to be sure it's all well and sent
+        return self._read()
+
+    # Send several (function, value) commands in one go. Values
+    # are all checked before anything is sent. Each write is
+    # followed by the same settle sleep as send_data, settle=0
+    # reads each reply as soon as it arrives instead
+    def send_batch(self, commands, settle=SETTLE):
+        for function, value in commands:
+            self._check_value(value)
+
+        responses = []
+        for function, value in commands:
+            self._write(function, value)
+            if settle:
+                time.sleep(settle)
+            responses.append(self._read())
+        return responses
+
+    @staticmethod
+    def _check_value(value):
         if value < 0 or value > 1023:
             raise ValueError("Value is OOB. Must be 2-byte integer in rage [0, 1023]")
 
+    def _write(self, function, value):
         data = struct.pack(b'BBB', function, value & 0xFF, (value & 0xFF00) >> 8)  # Low byte masked in, high byte masked and moved down
         self.device.write(1, data, 100)  # Magic numbers from the PyUSB tutorial
-        time.sleep(.05)  # Just to be sure it's all well and sent
+
+    def _read(self):
         response = self.device.read(0x81, 3, 100)  # 3 because there's three bytes to a packet
         return (response[2] << 8) + response[1]  # High byte moved left, then tack on the low byte
   
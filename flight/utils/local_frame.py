@@ -0,0 +1,66 @@
+"""Local tangent plane projection, converts latitude & longitude to metres"""
+import math
+from typing import Tuple
+
+from flight.utils.latlon import LatLon
+
+
+# WGS84 ellipsoid
+SEMI_MAJOR_AXIS: float = 6378137.0  # m
+FLATTENING: float = 1 / 298.257223563
+ECCENTRICITY_SQ: float = FLATTENING * (2 - FLATTENING)
+
+
+class LocalFrame:
+    """
+    East/north plane tangent to the ellipsoid at an origin.
+
+    Scale factors are computed once, so each conversion is a subtraction & a multiply.
+    Distances from the origin are within 6mm of the ellipsoid at 500m, the error
+    grows w/ the square of the distance.
+    """
+
+    def __init__(self, lat_deg: float, lon_deg: float) -> None:
+        self.lat_deg: float = lat_deg
+        self.lon_deg: float = lon_deg
+
+        lat = math.radians(lat_deg)
+        w_sq = 1 - ECCENTRICITY_SQ * math.sin(lat) ** 2
+
+        # Radii of curvature along the meridian & prime vertical
+        meridian = SEMI_MAJOR_AXIS * (1 - ECCENTRICITY_SQ) / w_sq ** 1.5
+        prime_vertical = SEMI_MAJOR_AXIS / math.sqrt(w_sq)
+
+        # m / deg latitude & longitude
+        self.north_per_deg: float = math.radians(meridian)
+        self.east_per_deg: float = math.radians(prime_vertical * math.cos(lat))
+
+    @classmethod
+    def around(cls, *points: LatLon) -> "LocalFrame":
+        """Frame centered between points"""
+        lat = sum(point.lat.decimal_degree for point in points) / len(points)
+        lon = sum(point.lon.decimal_degree for point in points) / len(points)
+        return cls(lat, lon)
+
+    def to_local(self, lat_deg: float, lon_deg: float) -> Tuple[float, float]:
+        """Metres east & north of the origin"""
+        return (
+            (lon_deg - self.lon_deg) * self.east_per_deg,
+            (lat_deg - self.lat_deg) * self.north_per_deg,
+        )
+
+    def from_latlon(self, point: LatLon) -> Tuple[float, float]:
+        """Metres east & north of the origin of a LatLon"""
+        return self.to_local(point.lat.decimal_degree, point.lon.decimal_degree)
+
+    def to_global(self, east: float, north: float) -> Tuple[float, float]:
+        """Latitude & longitude in degrees of a local point"""
+        return (
+            self.lat_deg + north / self.north_per_deg,
+            self.lon_deg + east / self.east_per_deg,
+        )
+
+
+def heading(east: float, north: float) -> float:
+    """Compass heading in degrees of a vector"""
+    return math.degrees(math.atan2(east, north)) % 360
@@ -0,0 +1,97 @@
+"""Concurrent, verified upload of drone parameters"""
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, Optional, Union
+
+from mavsdk import System
+
+
+ParamValue = Union[int, float]
+
+
+class ParamError(Exception):
+    """Exception for when a parameter doesn't read back as set"""
+
+    pass
+
+
+def _matches(current: Optional[ParamValue], value: ParamValue) -> bool:
+    """Whether a parameter is at a value, floats are stored w/ single precision"""
+    if current is None:
+        return False
+    if isinstance(value, int):
+        return current == value
+    return math.isclose(current, value, rel_tol=1e-6, abs_tol=1e-6)
+
+
+async def set_param(
+    drone: System, name: str, value: ParamValue, semaphore: asyncio.Semaphore
+) -> bool:
+    """
+    Sets a parameter unless it is already at value, then reads it back.
+
+    Ints are set w/ set_param_int & floats w/ set_param_float.
+    Returns whether the parameter was written.
+    """
+    if isinstance(value, int):
+        get, put = drone.param.get_param_int, drone.param.set_param_int
+    else:
+        get, put = drone.param.get_param_float, drone.param.set_param_float
+
+    async with semaphore:
+        try:
+            current = await get(name)
+        except Exception:  # Unknown or unreadable, set it anyway
+            current = None
+
+        if _matches(current, value):
+            return False
+
+        await put(name, value)
+
+        try:
+            current = await get(name)
+        except Exception as error:
+            raise ParamError(f"{name} could not be read back: {error}") from error
+        if not _matches(current, value):
+            raise ParamError(f"{name} read back as {current}, expected {value}")
+
+    return True
+
+
+async def upload_params(
+    drone: System, params: Dict[str, ParamValue], concurrency: int
+) -> None:
+    """
+    Uploads a parameter table, at most concurrency requests in flight at once.
+
+    Raises ParamError after every parameter has been tried if any failed.
+    """
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    results = await asyncio.gather(
+        *[set_param(drone, name, value, semaphore) for name, value in params.items()],
+        return_exceptions=True,
+    )
+
+    failed = {
+        name: result
+        for name, result in zip(params, results)
+        if isinstance(result, Exception)
+    }
+    for name, error in failed.items():
+        logging.error("Setting param %s failed: %s", name, error)
+
+    logging.info(
+        "Params uploaded in %.2fs: %d set, %d already set, %d failed",
+        time.perf_counter() - start,
+        sum(result is True for result in results),
+        sum(result is False for result in results),
+        len(failed),
+    )
+
+    if failed:
+        raise ParamError(f"Failed to set {', '.join(failed)}")
@@ -0,0 +1,120 @@
+"""Shared telemetry subscriptions for every flight state"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from mavsdk import System
+
+
+# Cached name: mavsdk telemetry stream
+STREAMS: Dict[str, str] = {
+    "position": "position",
+    "attitude": "attitude_euler",
+    "armed": "armed",
+    "in_air": "in_air",
+    "flight_mode": "flight_mode",
+}
+
+
+class TelemetryHub:
+    """
+    Subscribes once to each telemetry stream & keeps its latest sample.
+
+    States read samples or wait for a condition on them instead of opening
+    their own subscription, so state transitions don't pay for stream setup.
+
+    Attributes:
+        drone (System): The drone whose telemetry is cached.
+    """
+
+    def __init__(self, drone: System) -> None:
+        self.drone: System = drone
+
+        self._latest: Dict[str, Any] = {}
+        self._updated: Dict[str, float] = {}  # Time of the latest sample
+        self._counts: Dict[str, int] = {name: 0 for name in STREAMS}
+        self._condition: asyncio.Condition = asyncio.Condition()
+        self._tasks: List[asyncio.Task] = []
+
+    async def _subscribe(self, name: str, stream: str) -> None:
+        """Caches every sample of a telemetry stream"""
+        try:
+            async for sample in getattr(self.drone.telemetry, stream)():
+                async with self._condition:
+                    self._latest[name] = sample
+                    self._updated[name] = asyncio.get_event_loop().time()
+                    self._counts[name] += 1
+                    self._condition.notify_all()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logging.exception("Telemetry stream %s failed", stream)
+
+    def start(self) -> None:
+        """Starts the subscriptions, if not running"""
+        if not self._tasks:
+            self._tasks = [
+                asyncio.ensure_future(self._subscribe(name, stream))
+                for name, stream in STREAMS.items()
+            ]
+
+    async def stop(self) -> None:
+        """Cancels the subscriptions"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def latest(self, name: str) -> Any:
+        """Latest sample of a stream, None before the first"""
+        return self._latest.get(name)
+
+    def age(self, name: str) -> float:
+        """Seconds since the latest sample of a stream"""
+        return asyncio.get_event_loop().time() - self._updated.get(name, float("-inf"))
+
+    async def wait_for(
+        self,
+        name: str,
+        condition: Callable[[Any], bool] = lambda sample: True,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Waits until the latest sample of a stream meets a condition and returns it.
+
+        Raises asyncio.TimeoutError after timeout seconds.
+        """
+
+        def met() -> bool:
+            return name in self._latest and condition(self._latest[name])
+
+        async def wait() -> Any:
+            async with self._condition:
+                await self._condition.wait_for(met)
+                return self._latest[name]
+
+        return await asyncio.wait_for(wait(), timeout)
+
+    async def samples(self, name: str) -> AsyncIterator[Any]:
+        """
+        Yields new samples of a stream, starting w/ the latest.
+
+        Samples arriving while the consumer is busy are skipped,
+        only the newest is yielded.
+        """
+        seen = 0
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._counts[name] > seen)
+                seen = self._counts[name]
+                sample = self._latest[name]
+            yield sample
+
+
+def get_hub(drone: System) -> TelemetryHub:
+    """Returns the running telemetry hub of a drone, creating it the first time"""
+    hub = getattr(drone, "_telemetry_hub", None)
+    if hub is None:
+        hub = drone._telemetry_hub = TelemetryHub(drone)
+    hub.start()
+    return hub
@@ -0,0 +1,136 @@
+"""Binary telemetry log, fixed-size records written in batches w/o formatting"""
+import math
+import struct
+from datetime import datetime
+from typing import Dict, Optional
+
+
+TELEMETRY_LOG_FILE: str = f"logs/{datetime.now()}.tlm"
+
+MAGIC: bytes = b"IARCTLM1"  # File header, format version 1
+
+# time, east, north, altitude, v_north, v_east, v_down, yaw, state, vision latency
+RECORD: struct.Struct = struct.Struct("<d7fBf")
+FIELDS = [
+    ("time", "<f8"),  # s, event loop clock
+    ("east", "<f4"),  # m in config.local_frame
+    ("north", "<f4"),
+    ("altitude", "<f4"),  # m above home
+    ("v_north", "<f4"),  # m/s setpoint
+    ("v_east", "<f4"),
+    ("v_down", "<f4"),
+    ("yaw", "<f4"),  # deg setpoint
+    ("state", "u1"),  # index in STATES
+    ("vision_latency", "<f4"),  # s since the newest detections were captured
+]
+
+STATES = ("start", "takeoff", "early_laps", "land", "final")
+STATE_CODES: Dict[str, int] = {name: code for code, name in enumerate(STATES)}
+UNKNOWN_STATE: int = 255
+
+BATCH_RECORDS: int = 1024  # Records buffered between writes
+
+
+class TelemetryLog:
+    """
+    Packs records into a preallocated buffer, the file is written once it fills.
+
+    Attributes:
+        filename (str): Log file, appended to.
+        records (int): Records logged so far.
+    """
+
+    def __init__(self, filename: str, batch_records: int = BATCH_RECORDS) -> None:
+        self.filename: str = filename
+        self.records: int = 0
+
+        self._buffer: bytearray = bytearray(RECORD.size * batch_records)
+        self._capacity: int = batch_records
+        self._count: int = 0
+
+        self._file = open(filename, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def write(
+        self,
+        time: float,
+        east: float,
+        north: float,
+        altitude: float,
+        v_north: float = math.nan,
+        v_east: float = math.nan,
+        v_down: float = math.nan,
+        yaw: float = math.nan,
+        state: str = "",
+        vision_latency: float = math.nan,
+    ) -> None:
+        """Adds a record, flushing when the buffer is full"""
+        RECORD.pack_into(
+            self._buffer,
+            self._count * RECORD.size,
+            time,
+            east,
+            north,
+            altitude,
+            v_north,
+            v_east,
+            v_down,
+            yaw,
+            STATE_CODES.get(state, UNKNOWN_STATE),
+            vision_latency,
+        )
+        self._count += 1
+        self.records += 1
+
+        if self._count == self._capacity:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered records"""
+        if self._count:
+            self._file.write(memoryview(self._buffer)[: self._count * RECORD.size])
+            self._file.flush()
+            self._count = 0
+
+    def close(self) -> None:
+        """Flushes & closes the file"""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> "TelemetryLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_telemetry_log(filename: str):
+    """
+    Loads a log as a numpy structured array w/ FIELDS, state codes index STATES.
+
+    A partial record at the end, ie from a crash mid write, is ignored.
+    """
+    import numpy as np  # Only needed for analysis, not on the drone
+
+    dtype = np.dtype(FIELDS)  # Packed like RECORD
+
+    with open(filename, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{filename} is not a telemetry log")
+
+        data = file.read()
+
+    count = len(data) // dtype.itemsize
+    return np.frombuffer(data, dtype=dtype, count=count)
+
+
+def attach_telemetry_log(drone, log: TelemetryLog) -> None:
+    """Makes the control loops flying drone record to log"""
+    drone._telemetry_log = log
+
+
+def get_telemetry_log(drone) -> Optional[TelemetryLog]:
+    """Telemetry log attached to drone, if any"""
+    return getattr(drone, "_telemetry_log", None)
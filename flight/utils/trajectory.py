@@ -0,0 +1,203 @@
+"""Time-indexed lap trajectory around the pylons w/ velocity & acceleration limits"""
+import bisect
+import math
+from typing import List, NamedTuple, Sequence, Tuple
+
+
+Point = Tuple[float, float]  # m east, m north
+
+MIN_SEGMENT: float = 1e-6  # m, shorter segments are dropped as repeated points
+
+
+class Setpoint(NamedTuple):
+    """Reference position & velocity at an instant"""
+
+    east: float
+    north: float
+    v_east: float
+    v_north: float
+
+
+def _distance(a: Point, b: Point) -> float:
+    """m between points"""
+    return math.hypot(b[0] - a[0], b[1] - a[1])
+
+
+def _segment(start: Point, end: Point, spacing: float) -> List[Point]:
+    """Points along a straight line, excluding the end, none if it has no length"""
+    length = _distance(start, end)
+    if length < MIN_SEGMENT:
+        return []
+    n = max(int(math.ceil(length / spacing)), 1)
+    return [
+        (
+            start[0] + (end[0] - start[0]) * i / n,
+            start[1] + (end[1] - start[1]) * i / n,
+        )
+        for i in range(n)
+    ]
+
+
+def _arc(center: Point, radius: float, start: float, sweep: float, spacing: float):
+    """Points along a circular arc from angle start (rad), excluding the end"""
+    n = max(int(math.ceil(abs(sweep) * radius / spacing)), 1)
+    return [
+        (
+            center[0] + radius * math.cos(start + sweep * i / n),
+            center[1] + radius * math.sin(start + sweep * i / n),
+        )
+        for i in range(n)
+    ]
+
+
+def oval(pylon_a: Point, pylon_b: Point, radius: float, spacing: float) -> List[Point]:
+    """
+    One counterclockwise lap of a stadium around both pylons.
+
+    Starts abeam pylon_a on the right of the line to pylon_b, so each pylon is
+    passed on the right & turned around to the left. Ends where it started.
+    """
+    length = math.hypot(pylon_b[0] - pylon_a[0], pylon_b[1] - pylon_a[1])
+    u = ((pylon_b[0] - pylon_a[0]) / length, (pylon_b[1] - pylon_a[1]) / length)
+    right = math.atan2(-u[0], u[1])  # angle of the right normal
+
+    def abeam(pylon: Point, angle: float) -> Point:
+        return (
+            pylon[0] + radius * math.cos(angle),
+            pylon[1] + radius * math.sin(angle),
+        )
+
+    left = right + math.pi
+    return (
+        _segment(abeam(pylon_a, right), abeam(pylon_b, right), spacing)
+        + _arc(pylon_b, radius, right, math.pi, spacing)
+        + _segment(abeam(pylon_b, left), abeam(pylon_a, left), spacing)
+        + _arc(pylon_a, radius, left, math.pi, spacing)
+        + [abeam(pylon_a, right)]
+    )
+
+
+def laps(
+    start: Point,
+    pylon_a: Point,
+    pylon_b: Point,
+    radius: float,
+    count: int,
+    spacing: float,
+) -> List[Point]:
+    """Path from start onto the oval, then around it count times"""
+    lap = oval(pylon_a, pylon_b, radius, spacing)
+    return _segment(start, lap[0], spacing) + lap[:-1] * count + lap[-1:]
+
+
+class Trajectory:
+    """
+    Path sampled w/ the time & velocity the drone should reach each point at.
+
+    Speed is the fastest profile within max_speed, max_accel along the path and
+    max_lateral_accel in turns, starting & ending at rest. Repeated points are
+    dropped, a single point is a trajectory of no duration.
+
+    Attributes:
+        times (List[float]): Seconds from the start to each point.
+        points (List[Point]): Path, m east & north.
+        speeds (List[float]): m/s at each point.
+    """
+
+    def __init__(
+        self,
+        points: Sequence[Point],
+        max_speed: float,
+        max_accel: float,
+        max_lateral_accel: float,
+    ) -> None:
+        self.points: List[Point] = []
+        for point in points:
+            if not self.points or _distance(self.points[-1], point) >= MIN_SEGMENT:
+                self.points.append(point)
+        if not self.points:
+            raise ValueError("Trajectory needs at least one point")
+        n = len(self.points)
+
+        if n == 1:
+            self.speeds: List[float] = [0.0]
+            self.times: List[float] = [0.0]
+            self._velocities: List[Point] = [(0.0, 0.0)]
+            return
+
+        lengths = [_distance(a, b) for a, b in zip(self.points, self.points[1:])]
+        headings = [
+            math.atan2(b[1] - a[1], b[0] - a[0])
+            for a, b in zip(self.points, self.points[1:])
+        ]
+
+        # Turn limit at each interior point, from the curvature of its segments
+        limits = [max_speed] * n
+        limits[0] = limits[-1] = 0.0
+        for i in range(1, n - 1):
+            turn = abs(
+                (headings[i] - headings[i - 1] + math.pi) % (2 * math.pi) - math.pi
+            )
+            curvature = turn / max((lengths[i - 1] + lengths[i]) / 2, 1e-9)
+            if curvature > 0:
+                limits[i] = min(max_speed, math.sqrt(max_lateral_accel / curvature))
+
+        # Acceleration limits, forwards then backwards
+        speeds = limits[:]
+        for i in range(1, n):
+            reachable = math.sqrt(speeds[i - 1] ** 2 + 2 * max_accel * lengths[i - 1])
+            speeds[i] = min(speeds[i], reachable)
+        for i in range(n - 2, -1, -1):
+            stoppable = math.sqrt(speeds[i + 1] ** 2 + 2 * max_accel * lengths[i])
+            speeds[i] = min(speeds[i], stoppable)
+        self.speeds = speeds
+
+        self.times = [0.0]
+        for i, length in enumerate(lengths):
+            mean_speed = max((speeds[i] + speeds[i + 1]) / 2, 1e-9)
+            self.times.append(self.times[-1] + length / mean_speed)
+
+        # Velocity at each point, along the mean direction of its segments
+        directions = (
+            [headings[0]]
+            + [
+                math.atan2(
+                    math.sin(headings[i - 1]) + math.sin(headings[i]),
+                    math.cos(headings[i - 1]) + math.cos(headings[i]),
+                )
+                for i in range(1, n - 1)
+            ]
+            + [headings[-1]]
+        )
+        self._velocities = [
+            (speed * math.cos(direction), speed * math.sin(direction))
+            for speed, direction in zip(speeds, directions)
+        ]
+
+    @property
+    def duration(self) -> float:
+        """Seconds to fly the whole path"""
+        return self.times[-1]
+
+    def setpoint(self, t: float) -> Setpoint:
+        """Reference position & velocity t seconds from the start"""
+        if len(self.points) == 1:
+            return Setpoint(*self.points[0], 0.0, 0.0)
+
+        if t <= 0:
+            i, fraction = 0, 0.0
+        elif t >= self.duration:
+            i, fraction = len(self.points) - 2, 1.0
+        else:
+            i = bisect.bisect_right(self.times, t) - 1
+            fraction = (t - self.times[i]) / (self.times[i + 1] - self.times[i])
+
+        (e0, n0), (e1, n1) = self.points[i], self.points[i + 1]
+        (ve0, vn0), (ve1, vn1) = self._velocities[i], self._velocities[i + 1]
+
+        return Setpoint(
+            e0 + (e1 - e0) * fraction,
+            n0 + (n1 - n0) * fraction,
+            ve0 + (ve1 - ve0) * fraction,
+            vn0 + (vn1 - vn0) * fraction,
+        )
@@ -1,15 +1,26 @@
 """Logging configuration and functions"""
 import logging
+import time
 
 from datetime import datetime
 from logging import Formatter, FileHandler, StreamHandler
 from logging.handlers import QueueHandler, QueueListener
+from multiprocessing import current_process
+from typing import Any, Callable, Dict, Optional
 from colorlog import ColoredFormatter
 
 LOG_FILE: str = f"logs/{datetime.now()}.log"
 COLOR_LOG_FORMAT: str = "%(log_color)s%(levelname)s | %(asctime)s @  %(processName)s:%(funcName)s > %(message)s%(reset)s"
 LOG_FORMAT: str = "%(levelname)s | %(asctime)s @  %(processName)s:%(funcName)s > %(message)s"
 LOG_LEVEL = logging.DEBUG
+# Overrides per process name
+PROCESS_LOG_LEVELS: Dict[str, int] = {}
+
+# Seconds between messages of each rate limited call site, & overrides per process
+RATE_LIMIT_S: float = 1.0
+PROCESS_RATE_LIMITS: Dict[str, float] = {}
+
+_rate_limit_s: float = RATE_LIMIT_S  # Of this process, set by worker_configurer
 
 
 def init_logger(queue):
@@ -32,9 +43,90 @@ def init_logger(queue):
 def worker_configurer(queue):
     """
     When this is run, it configures the logger of this process to submit
-    logs to the logging process (QueueListener)
+    logs to the logging process (QueueListener), at the level & rate limit
+    configured for the process
     """
+    global _rate_limit_s
+
+    name: str = current_process().name
+    _rate_limit_s = PROCESS_RATE_LIMITS.get(name, RATE_LIMIT_S)
+
     queue_handler: QueueHandler = QueueHandler(queue)  # Just the one handler needed
     root = logging.getLogger()
     root.addHandler(queue_handler)
-    root.setLevel(LOG_LEVEL)
+    root.setLevel(PROCESS_LOG_LEVELS.get(name, LOG_LEVEL))
+
+
+class Lazy:
+    """
+    Log argument computed only if the message is emitted, ie
+    logging.debug("Point: %s", Lazy(lambda: point.to_string()))
+    """
+
+    def __init__(self, function: Callable[[], Any]) -> None:
+        self.function = function
+
+    def __str__(self) -> str:
+        return str(self.function())
+
+
+class RateLimited:
+    """
+    Call site that logs at most once per interval, counting what it drops.
+    Create one per call site, ie at module or instance level, & call it
+    like logging.debug. Costs one level check when the level is disabled.
+    """
+
+    def __init__(
+        self,
+        level: int = logging.DEBUG,
+        interval: Optional[float] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.level: int = level
+        self.interval: Optional[float] = interval  # None uses the process setting
+        self.logger: logging.Logger = logger or logging.getLogger()
+        self.suppressed: int = 0
+        self._last: float = float("-inf")
+
+    def __call__(self, msg: str, *args: Any) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+
+        now = time.monotonic()
+        interval = _rate_limit_s if self.interval is None else self.interval
+        if now - self._last < interval:
+            self.suppressed += 1
+            return
+
+        if self.suppressed:
+            msg, args = f"{msg} (%d suppressed)", (*args, self.suppressed)
+        self.logger.log(self.level, msg, *args)
+
+        self._last = now
+        self.suppressed = 0
+
+
+class Sampled:
+    """
+    Call site that logs one in every n calls, see RateLimited.
+    """
+
+    def __init__(
+        self,
+        every: int,
+        level: int = logging.DEBUG,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.every: int = every
+        self.level: int = level
+        self.logger: logging.Logger = logger or logging.getLogger()
+        self._calls: int = 0
+
+    def __call__(self, msg: str, *args: Any) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+
+        if self._calls % self.every == 0:
+            self.logger.log(self.level, msg, *args)
+        self._calls += 1
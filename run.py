@@ -17,16 +17,22 @@ def main() -> None:
     parser.add_argument(
         "-s", "--simulation", help="using the simulator", action="store_true"
     )
+    parser.add_argument(
+        "-o",
+        "--offline",
+        help="fly an in-process fake drone in virtual time",
+        action="store_true",
+    )
     args = parser.parse_args()
     logging.debug("Simulation flag %s", "enabled" if args.simulation else "disabled")
-    run_threads(args.simulation)
+    run_threads(args.simulation, args.offline)
 
 
 def init_flight(flight_args):
     return Process(target=flight, name="flight", args=flight_args)
 
 
-def run_threads(sim: bool) -> None:
+def run_threads(sim: bool, offline: bool = False) -> None:
     # Register Communication object to Base Manager
     BaseManager.register("Communication", Communication)
     # Create manager object
@@ -45,7 +51,11 @@ def run_threads(sim: bool) -> None:
     # Create new processes
     logging.info("Spawning Processes")
 
-    flight_args = (comm_obj, sim, log_queue, worker_configurer)
+    # Obstacle avoidance stays off until a vision process is spawned here to
+    # put detections on this queue
+    vision_queue = None
+
+    flight_args = (comm_obj, sim, log_queue, worker_configurer, vision_queue, offline)
     flight_process: Process = init_flight(flight_args)
     # Start flight function
     flight_process.start()
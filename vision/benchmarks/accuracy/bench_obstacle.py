@@ -41,6 +41,6 @@ class AccuracyObstacle:
         -------
         List[BoundingBox]
         """
-        bounding_boxes = self.obstacle_finder.find(color_image, depth_image)
+        bounding_boxes = self.blob_finder.find(color_image, depth_image)
 
         return bounding_boxes
@@ -1,23 +1,34 @@
 """
-Run time benchmarks.
+Run accuracy benchmarks.
 
-Results: (found, missed, extra)
+    python accuracy/runall.py module
+will only run benchmarks w/ module in name.
+
+    python accuracy/runall.py --jobs 4 --iou .5 --output accuracy.csv
+scores images 4 at a time, counting a box as found when it overlaps an annotation by iou >= .5.
+
+    python accuracy/runall.py --cache /tmp/vision_cache
+keeps decoded images in memory mapped files, so repeated runs skip decoding.
+Annotations are always read from an index next to each Annotations folder, rebuilt when they change.
+
+Results: (found, missed, extra), summarized as precision & recall per detector and per image type.
 
 Process
 -------
-filenames = [filename for filename in 'times/' if 'bench' in filename]
-benchmarks = [class for class in filenames if 'Accuracy' in class_name]
+filenames = [filename for filename in 'accuracy/' if 'bench' in filename]
 
-for benchmark in benchmarks:
-    instance = benchmark()
+for module in filenames:
+    benchmarks = [class for class in module if 'Accuracy' in class_name]
 
-    try: instance.setup()
+    for benchmark in benchmarks:
+        for method in benchmark if 'accuracy' in method_name:
+            for filename, image_type in benchmark.json:  # In parallel processes
+                found, missed, extra = classification(method(instance, *read_image(filename)), annotation)
 
-    for method in benchmark if 'accuracy' in method_name:
-        for title, parameters in benchmark.PARAMETERS.items():
-            accuracy(method(instance, *parameters))
+                log(benchmark, method, image_type, filename, found, missed, extra)
 
-            log(benchmark, method, title, accuracy)
+precision = found / (found + extra)
+recall = found / (found + missed)
 
 Suggested Parameter Defaults
 ----------------------------
@@ -30,9 +41,10 @@ parent_dir = os.path.dirname(os.path.abspath(__file__))
 gparent_dir = os.path.dirname(parent_dir)
 sys.path += [parent_dir, gparent_dir]
 
-import os
-import sys
 import json
+import argparse
+import importlib
+import multiprocessing
 import numpy as np
 import pandas as pd
 
@@ -40,70 +52,57 @@ import common
 from accuracy import modules
 
 
-def accuracy_boundingbox(data, annotation, method, instance):  ## NOT IMPLEMENTED
+IOU_THRESHOLD = .5  # Minimum overlap of a predicted & annotated box to count as found
+
+COLUMNS = ['class', 'method', 'type', 'filename', 'found', 'missed', 'extra']
+
+
+def accuracy_boundingbox(data, annotated, method, instance, threshold=IOU_THRESHOLD, matching='greedy'):
     """
-    Calculate how far off each bounding box was
+    Match predicted bounding boxes to annotated ones by intersection over union.
 
     Parameters
     ----------
     data: color_image, depth_image
 
-    annotation: pascal voc annotation
-
+    annotated: ndarray[n, 4]
+        Annotated boxes, x1, y1, x2, y2.
     method: function(instance, *data)
 
     instance: instance of object
 
+    threshold: float, default=IOU_THRESHOLD
+        Minimum iou for a predicted box to match an annotated one.
+    matching: 'greedy' or 'hungarian', default='greedy'
+        How boxes are assigned, see common.match_boxes.
+
     Returns
     -------
     (int, int, int) boxes_found, boxes_missed, boxes_extra.
     """
-    FOUND_THRESHOLD = 5  # pixels
-
-    ##
     bounding_boxes = method(instance, *data)
 
-    ##
-    boxes_found, boxes_missed, boxes_extra = 0, 0, 0
-
-    for value in annotation.findall('object'):
-        annotation_bounding_box = value.find('bndbox')
-
-        ax1, ay1, ax2, ay2 = [int(annotation_bounding_box.find(param).text) for param in ['xmin', 'ymin', 'xmax', 'ymax']]
-
-        for bounding_box in bounding_boxes:
-            X, Y, Z = [], [], []
-            for x, y in bounding_box.vertices:
-                X.append(x)
-                Y.append(y)
+    predicted = common.box_extents(bounding_boxes)
 
-            X, Y = np.unique(X), np.unique(Y)
-            bx1, by1, bx2, by2 = min(X), min(Y), max(X), max(Y)
+    matches = common.match_boxes(common.iou_matrix(predicted, annotated), threshold, matching)
 
-            ##
-            x1_close = bx1 - FOUND_THRESHOLD <= ax1 <= bx1 + FOUND_THRESHOLD
-            y1_close = by1 - FOUND_THRESHOLD <= ay1 <= by1 + FOUND_THRESHOLD
-            x2_close = bx2 - FOUND_THRESHOLD <= ax2 <= bx2 + FOUND_THRESHOLD
-            y2_close = by2 - FOUND_THRESHOLD <= ay2 <= by2 + FOUND_THRESHOLD
-
-            if all((x1_close, y1_close, x2_close, y2_close)):
-                boxes_found += 1
-
-    boxes_missed = len(annotation.findall('object')) - boxes_found
-    boxes_extra = len(bounding_boxes) - boxes_found
+    boxes_found = len(matches)
+    boxes_missed = len(annotated) - boxes_found
+    boxes_extra = len(predicted) - boxes_found
 
     return boxes_found, boxes_missed, boxes_extra
 
 
-def accuracy_boolean(data, annotation, method, instance):
+def accuracy_boolean(data, annotated, method, instance, *args):
     """
     Determine whether method output is correct.
 
     Parameters
     ----------
     data: color_image, depth_image
-    annotation: Annotation from blob_annotator
-    method: function[instance, data] -> BoundingBox
+    annotated: ndarray[n, 4]
+        Annotated boxes.
+    method: function[instance, data] -> bool or list[BoundingBox]
     instance: instance of benchmark
 
     Returns
@@ -111,12 +110,12 @@ def accuracy_boolean(data, annotation, method, instance):
     found, missed, extra
     """
     ## Prediction
-    bounding_boxes = method(instance, *data)
+    result = method(instance, *data)
 
-    prediction = bool(len(bounding_boxes))
+    prediction = bool(len(result)) if isinstance(result, (list, tuple)) else bool(result)
 
     ## Expected
-    expected = bool(len(annotation.findall('object')))
+    expected = bool(len(annotated))
 
     ## Calculate accuracy
     found = int(prediction == expected)
@@ -131,67 +130,206 @@ classification_map = {
     'in_frame': accuracy_boolean,
 }
 
-if __name__ == '__main__':
-    benchmarks = {}
 
-    ## Command line args
-    keyword = sys.argv[1] if len(sys.argv) > 1 else ''
+def find_benchmarks(module, keyword=''):
+    """
+    Find accuracy benchmark classes in a bench_* module.
 
-    ## Find time benchmarks in modules
-    for module in modules:
-        for key, value in module.__dict__.items():
-            if 'Accuracy' in key and keyword.lower() in key.lower():
-                benchmarks.update({key: value})
+    Parameters
+    ----------
+    module: module
+        Benchmark module.
+    keyword: str, default=''
+        Only benchmarks with keyword in their class name are returned.
+
+    Returns
+    -------
+    list[str] Class names.
+    """
+    return [key for key, value in module.__dict__.items()
+            if 'Accuracy' in key and keyword.lower() in key.lower() and isinstance(value, type)]
+
+
+def load_dataset(module):
+    """
+    Read the benchmark configuration & annotations of a module's image folder.
+
+    Parameters
+    ----------
+    module: module
+        Benchmark module w/ IMG_FOLDER.
+
+    Returns
+    -------
+    dict path, encoding, classification, data & annotations {filename: ndarray[n, 4]}.
+    """
+    path = os.path.join('..', 'vision_images', module.__dict__['IMG_FOLDER'])
+
+    with open(os.path.join(path, 'benchmark.json')) as file:
+        benchmark_config = json.load(file)
+
+    annotations = {key: entry['boxes'] for key, entry in common.annotation_index(path).items()}
+
+    return {
+        'path': path,
+        'encoding': benchmark_config['encoding'],
+        'classification': benchmark_config['classification'],
+        'data': benchmark_config['data'],
+        'annotations': annotations,
+    }
+
+
+_instances = {}  # Benchmark instances of this process, {(module, class): instance}
+
+
+def _get_instance(module_name, class_name):
+    """
+    Create & setup a benchmark once per process.
+    """
+    key = (module_name, class_name)
+
+    if key not in _instances:
+        instance = getattr(importlib.import_module(module_name), class_name)()
+
+        try:
+            instance.setup()
+        except AttributeError:
+            pass
+
+        _instances[key] = instance
+
+    return _instances[key]
+
+
+def evaluate(task):
+    """
+    Score one benchmark method on one image.
+
+    Parameters
+    ----------
+    task: tuple
+        module name, class name, method name, classification, image path, encoding,
+        annotated boxes, image type, iou threshold, matching method and image cache folder.
+
+    Returns
+    -------
+    list Row of COLUMNS, w/ nan scores on error.
+    """
+    (module_name, class_name, m_name, classification, filename, encoding, annotated, p_type, threshold, matching,
+     cache_dir) = task
 
-        ## Read benchmark configuration
-        with open(os.path.join('..', 'vision_images', module.__dict__['IMG_FOLDER'], 'benchmark.json')) as file:
-            benchmark_config = json.load(file)
+    try:
+        instance = _get_instance(module_name, class_name)
+        method = getattr(type(instance), m_name)
 
-        classification = benchmark_config['classification']
-        classification_method = classification_map[classification]
+        if cache_dir:
+            images = common.read_image_cached(filename, encoding, cache_dir)
+        else:
+            images = common.read_image(filename, encoding)
 
-        encoding = benchmark_config['encoding']
-        types = benchmark_config['types']
-        parameters = benchmark_config['data']
+        result = classification_map[classification](images, annotated, method, instance, threshold, matching)
 
-        ## Load annotations
-        path = os.path.join('..', 'vision_images', module.__dict__['IMG_FOLDER'])
+    except Exception as e:
+        print(f"{class_name}.{m_name}: {filename} error: {e}")
 
-        annotations = common.read_annotations(path)
+        return [class_name, m_name, p_type, filename, np.nan, np.nan, np.nan]
 
-        ## Run benchmarks
-        output = pd.DataFrame(columns=['class', 'method', 'type', 'filename', 'found', 'missed', 'extra'])
+    print(f"{class_name}.{m_name}: {filename} {result}")
 
-        for b_name, benchmark in benchmarks.items():
-            b_instance = benchmark()
+    return [class_name, m_name, p_type, filename, *result]
 
-            try:
-                b_instance.setup()
-            except AttributeError as e:
-                print(f"No setup method found for {b_name}.")
+
+def precision_recall(output, by):
+    """
+    Total found, missed & extra w/ precision & recall per group.
+
+    Parameters
+    ----------
+    output: pd.DataFrame
+        Per image results w/ COLUMNS.
+    by: list[str]
+        Columns to group by.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    totals = output.dropna().groupby(by)[['found', 'missed', 'extra']].sum()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        totals['precision'] = totals['found'] / (totals['found'] + totals['extra'])
+        totals['recall'] = totals['found'] / (totals['found'] + totals['missed'])
+
+    return totals
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Run accuracy benchmarks.")
+    parser.add_argument("keyword", nargs='?', default='', help="Only run benchmarks w/ keyword in name")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Images to score in parallel")
+    parser.add_argument("-t", "--iou", type=float, default=IOU_THRESHOLD, help="Minimum iou of a found box")
+    parser.add_argument("-m", "--matching", choices=['greedy', 'hungarian'], default='greedy',
+                        help="How predicted boxes are assigned to annotations")
+    parser.add_argument("-c", "--cache", type=str, default='', help="Folder to cache decoded images in")
+    parser.add_argument("-o", "--output", type=str, default='', help="Save per image results to csv")
+
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    ## Build a task per benchmark method & image
+    tasks = []
+
+    for module in modules:
+        class_names = find_benchmarks(module, args.keyword)
+        if not class_names:
+            continue
+
+        try:
+            dataset = load_dataset(module)
+        except (OSError, KeyError) as e:
+            print(f"{module.__name__}: could not load images, {e}")
+            continue
+
+        for class_name in class_names:
+            benchmark = module.__dict__[class_name]
 
             for m_name, method in benchmark.__dict__.items():
                 if 'accuracy_' not in m_name or not callable(method):
                     continue
 
-                for filename, p_type in parameters.items():
-                    try:
-                        images = common.read_image(os.path.join(path, filename), encoding)
-
-                        annotation = annotations[filename.split('.')[0].split('\\')[-1].split('/')[-1]]
+                for filename, p_type in dataset['data'].items():
+                    annotated = dataset['annotations'].get(filename.split('.')[0].split('\\')[-1].split('/')[-1])
+                    if annotated is None:
+                        print(f"{class_name}.{m_name}: {filename} has no annotation.")
+                        continue
 
-                        result = classification_method(images, annotation, method, b_instance)
+                    tasks.append((module.__name__, class_name, m_name, dataset['classification'],
+                                  os.path.join(dataset['path'], filename), dataset['encoding'], annotated, p_type,
+                                  args.iou, args.matching, args.cache))
 
-                    except Exception as e:
-                        print(f"{b_name}.{m_name}: {filename} error: {e}")
+    ## Run benchmarks
+    if args.jobs > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(args.jobs) as pool:
+            rows = pool.map(evaluate, tasks, chunksize=max(1, len(tasks) // (4 * args.jobs)))
+    else:
+        rows = [evaluate(task) for task in tasks]
 
-                        output.loc[len(output)] = [b_name, m_name, p_type, filename, np.nan]
-                    else:
-                        print(f"{b_name}.{m_name}: {filename} {result}")
+    output = pd.DataFrame(rows, columns=COLUMNS)
 
-                        output.loc[len(output)] = [b_name, m_name, p_type, filename, *result]
-
-    # print(output.head(15))
-    # output.to_csv('', index=False)
+    ##
+    if len(output):
+        print()
+        print(precision_recall(output, ['class', 'method']))
+        print()
+        print(precision_recall(output, ['class', 'method', 'type']))
+
+    if args.output:
+        output.to_csv(args.output, index=False)
 
     print()
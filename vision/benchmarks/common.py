@@ -4,6 +4,9 @@ Common functions for benchmarks to make use of.
 NOTE: Do no edit, only append!
 """
 import os
+import argparse
+import itertools
+import multiprocessing
 import lxml.etree
 import numpy as np
 import cv2
@@ -161,3 +164,496 @@ def noise(amounts=None, dimensions=(1280, 720), generator=np.random.poisson, dty
         output.update({title: (color_image, depth_image)})
 
     return output
+
+
+def box_extents(bounding_boxes):
+    """
+    Corners of bounding boxes as one array.
+
+    Parameters
+    ----------
+    bounding_boxes: list[BoundingBox] or list[list[(x, y)]]
+        Boxes given by their vertices, or flat (x1, y1, x2, y2).
+
+    Returns
+    -------
+    ndarray[n, 4] x1, y1, x2, y2 of each box.
+    """
+    extents = np.zeros((len(bounding_boxes), 4))
+
+    for i, bounding_box in enumerate(bounding_boxes):
+        vertices = np.asarray(getattr(bounding_box, 'vertices', bounding_box), dtype=float)
+
+        if vertices.ndim == 1:
+            vertices = vertices.reshape(-1, 2)
+
+        extents[i, :2] = vertices.min(axis=0)
+        extents[i, 2:] = vertices.max(axis=0)
+
+    return extents
+
+
+def annotation_boxes(annotation):
+    """
+    Bounding boxes & labels of a pascal voc annotation.
+
+    Parameters
+    ----------
+    annotation: lxml.etree.Element
+        Annotation from read_annotations.
+
+    Returns
+    -------
+    ndarray[n, 4], list[str] x1, y1, x2, y2 of each box and its label.
+    """
+    objects = annotation.findall('object')
+
+    boxes = np.array([[float(obj.find('bndbox').find(param).text) for param in ['xmin', 'ymin', 'xmax', 'ymax']]
+                      for obj in objects]).reshape(-1, 4)
+    labels = [obj.findtext('name') for obj in objects]
+
+    return boxes, labels
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Intersection over union of every pair of boxes.
+
+    Parameters
+    ----------
+    boxes_a: ndarray[n, 4]
+        x1, y1, x2, y2 of each box.
+    boxes_b: ndarray[m, 4]
+        x1, y1, x2, y2 of each box.
+
+    Returns
+    -------
+    ndarray[n, m] in [0, 1].
+    """
+    boxes_a, boxes_b = np.asarray(boxes_a, dtype=float), np.asarray(boxes_b, dtype=float)
+
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def match_boxes(iou, threshold=.5, method='greedy'):
+    """
+    Assign predicted boxes to annotated ones, each box used at most once.
+
+    Parameters
+    ----------
+    iou: ndarray[n predicted, m annotated]
+        From iou_matrix.
+    threshold: float, default=.5
+        Minimum iou of a match.
+    method: 'greedy' or 'hungarian', default='greedy'
+        Greedy takes the best remaining pair first, hungarian maximizes total iou & requires scipy.
+
+    Returns
+    -------
+    list[(int, int)] Matched (predicted index, annotated index) pairs.
+    """
+    if not iou.size:
+        return []
+
+    if method == 'hungarian':
+        from scipy.optimize import linear_sum_assignment
+
+        rows, columns = linear_sum_assignment(iou, maximize=True)
+
+        return [(i, j) for i, j in zip(rows, columns) if iou[i, j] >= threshold]
+
+    if method != 'greedy':
+        raise ValueError(f"Unrecognized matching method '{method}', expected greedy or hungarian")
+
+    candidates = np.argwhere(iou >= threshold)
+    candidates = candidates[np.argsort(-iou[candidates[:, 0], candidates[:, 1]], kind='stable')]
+
+    matches, used_predicted, used_annotated = [], set(), set()
+    for i, j in candidates:
+        if i in used_predicted or j in used_annotated:
+            continue
+
+        matches.append((int(i), int(j)))
+        used_predicted.add(i)
+        used_annotated.add(j)
+
+    return matches
+
+
+INDEX_FILENAME = 'annotation_index.npz'
+
+
+def _annotation_mtimes(annotation_folder):
+    """
+    Modification time of each annotation file, {filename: mtime ns}.
+    """
+    return {filename: os.stat(os.path.join(annotation_folder, filename)).st_mtime_ns
+            for filename in sorted(os.listdir(annotation_folder)) if filename.endswith('.xml')}
+
+
+def build_annotation_index(path, index_filename=INDEX_FILENAME):
+    """
+    Parse every annotation once into a compact index file next to the Annotations folder.
+
+    Parameters
+    ----------
+    path: str
+        Folder where Annotations folder is.
+    index_filename: str, default=INDEX_FILENAME
+        Name of the index file.
+
+    Returns
+    -------
+    {filename: {'image': str, 'boxes': ndarray[n, 4], 'labels': list[str]}}
+    """
+    annotation_folder = os.path.join(path, 'Annotations')
+    mtimes = _annotation_mtimes(annotation_folder)
+
+    names, images, offsets, boxes, labels = [], [], [0], [], []
+    for filename in mtimes:
+        annotation = lxml.etree.parse(os.path.join(annotation_folder, filename)).getroot()
+
+        annotation_box, annotation_label = annotation_boxes(annotation)
+
+        names.append(filename.split('.')[0])
+        images.append(annotation.findtext('path/value') or '')
+        offsets.append(offsets[-1] + len(annotation_box))
+        boxes.append(annotation_box)
+        labels += annotation_label
+
+    np.savez(
+        os.path.join(path, index_filename),
+        names=np.array(names, dtype=str),
+        images=np.array(images, dtype=str),
+        offsets=np.array(offsets, dtype=np.int64),
+        boxes=np.concatenate(boxes) if boxes else np.zeros((0, 4)),
+        labels=np.array(labels, dtype=str),
+        mtime_files=np.array(list(mtimes.keys()), dtype=str),
+        mtime_values=np.array(list(mtimes.values()), dtype=np.int64),
+    )
+
+    return {name: {'image': image, 'boxes': boxes[i], 'labels': labels[offsets[i]:offsets[i + 1]]}
+            for i, (name, image) in enumerate(zip(names, images))}
+
+
+def annotation_index(path, index_filename=INDEX_FILENAME):
+    """
+    Read annotations from the index, rebuilding it if any annotation changed.
+
+    Parameters
+    ----------
+    path: str
+        Folder where Annotations folder is.
+    index_filename: str, default=INDEX_FILENAME
+        Name of the index file.
+
+    Returns
+    -------
+    {filename: {'image': str, 'boxes': ndarray[n, 4], 'labels': list[str]}}
+    """
+    annotation_folder = os.path.join(path, 'Annotations')
+    index_path = os.path.join(path, index_filename)
+
+    if not os.path.isfile(index_path):
+        return build_annotation_index(path, index_filename)
+
+    with np.load(index_path) as index:
+        mtimes = dict(zip(index['mtime_files'].tolist(), index['mtime_values'].tolist()))
+
+        if mtimes != _annotation_mtimes(annotation_folder):
+            return build_annotation_index(path, index_filename)
+
+        offsets, boxes, labels = index['offsets'], index['boxes'], index['labels'].tolist()
+
+        return {name: {'image': image, 'boxes': boxes[offsets[i]:offsets[i + 1]],
+                       'labels': labels[offsets[i]:offsets[i + 1]]}
+                for i, (name, image) in enumerate(zip(index['names'].tolist(), index['images'].tolist()))}
+
+
+def _cached_array(path, cache_dir, read):
+    """
+    Decoded image memory mapped from the cache, decoding & storing it on a miss.
+    The cache filename includes the source modification time, so edited images are decoded again.
+    """
+    stat = os.stat(path)
+    name = os.path.basename(path).replace('.', '_')
+    cache_path = os.path.join(cache_dir, f"{name}-{stat.st_mtime_ns}-{stat.st_size}.npy")
+
+    if not os.path.isfile(cache_path):
+        image = read(path)
+        if image is None:
+            return None
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        temporary_path = f"{cache_path}.{os.getpid()}.npy"
+        np.save(temporary_path, image)
+        os.replace(temporary_path, cache_path)
+
+    # Copy on write, so detectors modifying images in place don't touch the cache
+    return np.load(cache_path, mmap_mode='c')
+
+
+def read_image_cached(path, encoding, cache_dir):
+    """
+    Read image according to encoding, via a cache of decoded images.
+
+    Parameters
+    ----------
+    path: str
+        Location of depth or color image.
+    encoding: color, depth or both
+        How is image data stored.
+    cache_dir: str
+        Folder to keep decoded images in.
+
+    Returns
+    -------
+    [color_image, depth_image] Memory mapped arrays.
+    """
+    if encoding == 'color':
+        color_path, depth_path = path, None
+    elif encoding == 'depth':
+        color_path, depth_path = None, path
+    elif 'colorImage' in path:
+        color_path, depth_path = path, path.replace('colorImage', 'depthImage')
+    else:
+        color_path, depth_path = path.replace('depthImage', 'colorImage'), path
+
+    images = []
+    for image_path in (color_path, depth_path):
+        image = None
+        if image_path is not None and os.path.isfile(image_path):
+            image = _cached_array(image_path, cache_dir, cv2.imread)
+
+        if image is None and image_path is not None:
+            raise ValueError(f"Failed to read {image_path}!")
+
+        images.append(image)
+
+    return images
+
+
+def pareto_front(cost, score):
+    """
+    Indices of the results no other is both cheaper & better than.
+
+    Parameters
+    ----------
+    cost: ndarray[float]
+        Lower is better, ie latency.
+    score: ndarray[float]
+        Higher is better, ie recall. nan is worst.
+
+    Returns
+    -------
+    ndarray[int] Indices of the front, cheapest first.
+    """
+    cost, score = np.asarray(cost, dtype=float), np.nan_to_num(np.asarray(score, dtype=float), nan=-np.inf)
+
+    order = np.lexsort((-score, cost))
+
+    # A result is on the front if it beats the best score of everything cheaper
+    best_before = np.maximum.accumulate(np.concatenate([[-np.inf], score[order][:-1]]))
+
+    return order[score[order] > best_before]
+
+
+def grid_product(grid):
+    """
+    Every combination of grid values.
+
+    Parameters
+    ----------
+    grid: {str: list}
+        Values to try per setting.
+
+    Returns
+    -------
+    list[dict] Settings of each combination.
+    """
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+
+def annotated_images(path, encoding='color', cache_dir=None):
+    """
+    Annotated images of a folder w/ an Annotations folder from blob_annotator.
+
+    Parameters
+    ----------
+    path: str
+        Image folder.
+    encoding: str, default='color'
+        See read_image.
+    cache_dir: str, default=None
+        Folder to cache decoded images in, see read_image_cached. Images are decoded every time if not given.
+
+    Returns
+    -------
+    list[(color_image, depth_image, ndarray[n, 4])] Images & annotated boxes.
+    """
+    images = []
+
+    for key, entry in annotation_index(path).items():
+        image_path = os.path.join(path, entry['image'])
+        if not entry['image'] or not os.path.isfile(image_path):
+            print(f"{key}: image {entry['image']} not found.")
+            continue
+
+        if cache_dir:
+            images.append((*read_image_cached(image_path, encoding, cache_dir), entry['boxes']))
+        else:
+            images.append((*read_image(image_path, encoding), entry['boxes']))
+
+    return images
+
+
+def synthetic_images(scene_object, object_type, n_frames, seed=0, **kwargs):
+    """
+    Generated frames of one object w/ their ground truth boxes.
+
+    Parameters
+    ----------
+    scene_object: str
+        Object to generate, one of SyntheticCamera.SCENE_OBJECTS, ie 'obstacle'.
+    object_type: ObjectType
+        Type of the ground truth boxes to keep, ie ObjectType.AVOID.
+    n_frames: int
+        Frames to generate.
+    seed: int, default=0
+        Random seed.
+    kwargs:
+        Settings passed to SyntheticCamera, ie noise.
+
+    Returns
+    -------
+    list[(color_image, depth_image, ndarray[n, 4])]
+    """
+    from vision.camera.synthetic import SyntheticCamera
+
+    camera = SyntheticCamera(scene=[scene_object], n_frames=n_frames, seed=seed, **kwargs)
+
+    images = []
+    for frame in camera:
+        boxes = [box for box in frame.bounding_boxes if box.object_type is object_type]
+
+        images.append((frame.color, frame.depth, box_extents(boxes)))
+
+    return images
+
+
+_pool_function, _pool_images = None, None  # Of the pool worker processes
+
+
+def _init_pool_worker(function, images):
+    """
+    Pool initializer, images are sent to each process once rather than per task.
+    """
+    global _pool_function, _pool_images
+    _pool_function, _pool_images = function, images
+
+
+def _run_pool_task(task):
+    """
+    Pool helper, runs a task on the worker's images.
+    """
+    return _pool_function(task, _pool_images)
+
+
+def map_images(function, tasks, images, jobs=1):
+    """
+    Run function(task, images) for every task, in parallel processes when jobs > 1.
+
+    Parameters
+    ----------
+    function: callable
+        Module level function, so it can be sent to the processes.
+    tasks: list
+        Arguments of each call.
+    images: list
+        Images shared by every call.
+    jobs: int, default=1
+        Processes to run.
+
+    Returns
+    -------
+    list Results in the order of tasks.
+    """
+    if jobs > 1:
+        with multiprocessing.Pool(jobs, initializer=_init_pool_worker, initargs=(function, images)) as pool:
+            return pool.map(_run_pool_task, tasks)
+
+    return [function(task, images) for task in tasks]
+
+
+def sweep_parser(description, img_folder, n_repeats):
+    """
+    Command line arguments shared by parameter sweeps, scripts add their own.
+
+    Parameters
+    ----------
+    description: str
+        What the sweep tunes.
+    img_folder: str
+        Default annotated image folder.
+    n_repeats: int
+        Default timed runs per image.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("-g", "--grid", type=str, default='', help="Json grid of values to try")
+    parser.add_argument("-i", "--images", type=str, default=img_folder, help="Annotated image folder")
+    parser.add_argument("-s", "--synthetic", type=int, default=0, help="Use n generated frames instead of images")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Settings to evaluate in parallel")
+    parser.add_argument("-r", "--repeats", type=int, default=n_repeats, help="Timed runs per image")
+    parser.add_argument("-o", "--output", type=str, default='', help="Save all results to csv")
+    parser.add_argument("-c", "--cache", type=str, default='', help="Folder to cache decoded images in")
+
+    return parser
+
+
+def report_pareto_front(output, cost, score, title, csv_filename=''):
+    """
+    Print the Pareto front of sweep results & optionally save all of them.
+
+    Parameters
+    ----------
+    output: pd.DataFrame
+        One row per setting.
+    cost: str
+        Column where lower is better, ie latency.
+    score: pd.Series or str
+        Column or values where higher is better, ie recall.
+    title: str
+        Printed above the front.
+    csv_filename: str, default=''
+        Save all results to this file, if given.
+    """
+    import pandas as pd
+
+    if isinstance(score, str):
+        score = output[score]
+
+    front = output.iloc[pareto_front(output[cost], score)]
+
+    with pd.option_context('display.max_colwidth', None, 'display.width', None):
+        print(f"\n{title}:")
+        print(front.to_string(index=False))
+
+    if csv_filename:
+        output.to_csv(csv_filename, index=False)
@@ -0,0 +1,329 @@
+"""
+Track time benchmark results across commits and flag performance regressions.
+
+Results are stored as json lines keyed by git commit, machine fingerprint and benchmark id,
+so only results from the same machine are ever compared.
+
+    python3 times/runall.py --repeats 20 --store
+records the current commit's results,
+
+    python3 regression.py compare --baseline <commit>
+compares them against the stored baseline, exiting non-zero on any significant slowdown.
+
+    python3 regression.py record results.json
+stores results previously saved by times/runall.py --output results.json.
+"""
+import os
+import sys
+import json
+import math
+import hashlib
+import argparse
+import datetime
+import platform
+import subprocess
+import numpy as np
+
+
+STORE_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history.jsonl')
+
+THRESHOLD = .05  # Minimum relative slowdown of the median worth reporting
+ALPHA = .01  # Significance level of the slowdown
+
+
+def git_commit():
+    """
+    Current git commit, suffixed with -dirty if there are uncommitted changes.
+
+    Returns
+    -------
+    str
+    """
+    cwd = os.path.dirname(os.path.abspath(__file__))
+
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=cwd).decode().strip()
+        dirty = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+    return commit + ('-dirty' if dirty else '')
+
+
+def machine_fingerprint():
+    """
+    Short hash of the hardware and software the benchmarks ran on.
+
+    Returns
+    -------
+    str
+    """
+    import cv2
+
+    description = [
+        platform.node(), platform.machine(), platform.processor(), str(os.cpu_count()),
+        platform.python_version(), np.__version__, cv2.__version__,
+    ]
+
+    return hashlib.sha1('|'.join(description).encode()).hexdigest()[:12]
+
+
+def benchmark_id(row):
+    """
+    Identifier of a benchmark result row, class.method:test.
+    """
+    return f"{row['class']}.{row['method']}:{row['test']}"
+
+
+def record(rows, store=STORE_FILENAME, commit=None, machine=None):
+    """
+    Append benchmark results to the store.
+
+    Parameters
+    ----------
+    rows: list[dict]
+        Result rows from times/runall.py w/ raw samples.
+    store: str, default=STORE_FILENAME
+        Json lines file to append to.
+    commit: str, default=None
+        Commit results are from, defaults to the current commit.
+    machine: str, default=None
+        Machine results are from, defaults to this machine.
+
+    Returns
+    -------
+    int Number of records written.
+    """
+    commit = git_commit() if commit is None else commit
+    machine = machine_fingerprint() if machine is None else machine
+    time = datetime.datetime.now().isoformat()
+
+    n_records = 0
+    with open(store, 'a') as file:
+        for row in rows:
+            if not row.get('samples'):
+                continue
+
+            record = {
+                'commit': commit,
+                'machine': machine,
+                'benchmark': benchmark_id(row),
+                'time': time,
+                'samples': [float(sample) for sample in row['samples']],
+            }
+
+            file.write(json.dumps(record) + '\n')
+            n_records += 1
+
+    return n_records
+
+
+def load(commit, machine=None, store=STORE_FILENAME):
+    """
+    Load the stored samples of one commit.
+    When a commit was recorded multiple times, samples are pooled.
+
+    A prefix of a clean commit is enough if it is unique. Results of uncommitted changes,
+    stored as <commit>-dirty, are noisy & only loaded when asked for by their full name.
+
+    Parameters
+    ----------
+    commit: str
+        Commit to load, a unique prefix is enough for clean commits.
+    machine: str, default=None
+        Machine to load results of, defaults to this machine.
+    store: str, default=STORE_FILENAME
+        Json lines file to read.
+
+    Returns
+    -------
+    {benchmark id: ndarray[float]}
+
+    Raises
+    ------
+    ValueError if the prefix matches more than one commit.
+    """
+    machine = machine_fingerprint() if machine is None else machine
+
+    samples = {}
+    if not os.path.isfile(store):
+        return samples
+
+    with open(store, 'r') as file:
+        records = [json.loads(line) for line in file if line.strip()]
+
+    records = [record for record in records if record['machine'] == machine]
+
+    if not any(record['commit'] == commit for record in records):
+        matches = {record['commit'] for record in records
+                   if not record['commit'].endswith('-dirty') and record['commit'].startswith(commit)}
+
+        if len(matches) > 1:
+            raise ValueError(f"Commit prefix {commit} is ambiguous, matches {sorted(matches)}")
+
+        commit = matches.pop() if matches else commit
+
+    for record in records:
+        if record['commit'] == commit:
+            samples.setdefault(record['benchmark'], []).extend(record['samples'])
+
+    return {key: np.array(value) for key, value in samples.items()}
+
+
+def mann_whitney_greater(candidate, baseline):
+    """
+    One sided Mann-Whitney U test, whether candidate samples tend to be greater than baseline ones.
+    Uses the normal approximation w/ tie & continuity correction.
+
+    Parameters
+    ----------
+    candidate: ndarray[float]
+        Samples of the new version.
+    baseline: ndarray[float]
+        Samples of the old version.
+
+    Returns
+    -------
+    float p-value.
+    """
+    n1, n2 = len(candidate), len(baseline)
+    if not n1 or not n2:
+        return 1.
+
+    values = np.concatenate([candidate, baseline])
+    n = n1 + n2
+
+    # Ranks w/ ties averaged
+    order = np.argsort(values, kind='mergesort')
+    ranks = np.empty(n)
+    ranks[order] = np.arange(1, n + 1)
+
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    ranks = (np.bincount(inverse, weights=ranks) / counts)[inverse]
+
+    u = np.sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+
+    tie_correction = np.sum(counts ** 3 - counts) / (n * (n - 1))
+    sd = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_correction))
+    if sd == 0:
+        return 1.
+
+    z = (u - n1 * n2 / 2 - .5) / sd
+
+    return .5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(candidate, baseline, threshold=THRESHOLD, alpha=ALPHA):
+    """
+    Compare candidate results against a baseline.
+
+    Parameters
+    ----------
+    candidate: {benchmark id: ndarray[float]}
+        Samples of the new version.
+    baseline: {benchmark id: ndarray[float]}
+        Samples of the old version.
+    threshold: float, default=THRESHOLD
+        Minimum relative slowdown of the median to count as a regression.
+    alpha: float, default=ALPHA
+        Significance level for the slowdown.
+
+    Returns
+    -------
+    list[dict] Comparison of each benchmark in both, w/ a 'regression' flag.
+    """
+    results = []
+
+    for key in sorted(set(candidate) & set(baseline)):
+        candidate_median, baseline_median = np.median(candidate[key]), np.median(baseline[key])
+
+        ratio = candidate_median / baseline_median if baseline_median else np.inf
+        p_value = mann_whitney_greater(candidate[key], baseline[key])
+
+        results.append({
+            'benchmark': key,
+            'baseline(s)': baseline_median,
+            'candidate(s)': candidate_median,
+            'ratio': ratio,
+            'p': p_value,
+            'regression': bool(ratio > 1 + threshold and p_value < alpha),
+        })
+
+    return results
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Track benchmark results and flag regressions.")
+    parser.add_argument("--store", type=str, default=STORE_FILENAME, help="Json lines results store")
+
+    subparsers = parser.add_subparsers(dest='command')
+
+    record_parser = subparsers.add_parser('record', help="Store results saved by times/runall.py --output")
+    record_parser.add_argument("results", type=str, help="Json results file")
+    record_parser.add_argument("--commit", type=str, default=None, help="Defaults to the current commit")
+
+    compare_parser = subparsers.add_parser('compare', help="Compare results against a baseline commit")
+    compare_parser.add_argument("--baseline", type=str, required=True, help="Baseline commit")
+    compare_parser.add_argument("--candidate", type=str, default=None, help="Defaults to the current commit")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Minimum relative slowdown")
+    compare_parser.add_argument("--alpha", type=float, default=ALPHA, help="Significance level")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Returns
+    -------
+    int Exit code, 1 if any regression was found.
+    """
+    args = parse_args(argv)
+
+    if args.command == 'record':
+        with open(args.results, 'r') as file:
+            rows = json.load(file)
+
+        n_records = record(rows, args.store, commit=args.commit)
+        print(f"Stored {n_records} results.")
+
+        return 0
+
+    if args.command == 'compare':
+        candidate_commit = git_commit() if args.candidate is None else args.candidate
+
+        try:
+            baseline = load(args.baseline, store=args.store)
+            candidate = load(candidate_commit, store=args.store)
+        except ValueError as error:
+            print(error)
+            return 2
+
+        if not baseline:
+            print(f"No results stored for baseline {args.baseline} on this machine.")
+            return 2
+        if not candidate:
+            print(f"No results stored for candidate {candidate_commit} on this machine.")
+            return 2
+
+        results = compare(candidate, baseline, args.threshold, args.alpha)
+
+        for result in results:
+            flag = 'REGRESSION' if result['regression'] else ''
+            print(f"{result['benchmark']}: {result['baseline(s)']:.5f}s -> {result['candidate(s)']:.5f}s "
+                  f"x{result['ratio']:.2f} p={result['p']:.4f} {flag}")
+
+        n_regressions = sum(result['regression'] for result in results)
+        print(f"\n{n_regressions} regressions in {len(results)} benchmarks.")
+
+        return int(n_regressions > 0)
+
+    parse_args(['--help'])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
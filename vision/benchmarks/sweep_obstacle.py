@@ -0,0 +1,220 @@
+"""
+Sweep SimpleBlobDetector parameters, measuring the latency & accuracy of each configuration.
+
+    python3 sweep_obstacle.py
+sweeps the default grid over the annotated obstacle images in vision_images/obstacle,
+
+    python3 sweep_obstacle.py --synthetic 50 --grid grid.json --min-recall .9 --best config.json
+sweeps a custom grid over 50 generated frames, saving the fastest config w/ at least 90% recall.
+
+The grid is {"category.attribute": [values]}, ie {"filterByArea.minArea": [10, 100]},
+every combination is applied on top of vision/obstacle/config.json.
+Configurations are evaluated in parallel processes & the speed/accuracy Pareto front is printed.
+"""
+import os
+import sys
+import copy
+import json
+import time
+import numpy as np
+import pandas as pd
+
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import common
+
+from vision.obstacle.obstacle_finder import ObstacleFinder
+from vision.common.import_params import import_params
+from vision.bounding_box import ObjectType
+
+
+CONFIG_FILENAME = os.path.join(gparent_dir, 'obstacle', 'config.json')
+IMG_FOLDER = os.path.join(gparent_dir, 'vision_images', 'obstacle')
+
+DEFAULT_GRID = {
+    'filterByThreshold.minThreshold': [10, 50],
+    'filterByThreshold.thresholdStep': [10, 50, 100],
+    'filterByArea.minArea': [10, 100, 500],
+    'filterByCircularity.enable': [False, True],
+    'filterByCircularity.minCircularity': [.4, .7],
+}
+
+N_REPEATS = 3  # Timed runs per image, the fastest is kept
+
+COLUMNS = ['config', 'latency(s)', 'found', 'missed', 'extra', 'precision', 'recall']
+
+
+def expand_grid(base_config, grid):
+    """
+    Every combination of grid values applied to a base config.
+    Combinations only differing in categories that are disabled are skipped.
+
+    Parameters
+    ----------
+    base_config: dict
+        Config in the format of vision/obstacle/config.json.
+    grid: {str: list}
+        Values to try, {"category.attribute": [values]}.
+
+    Returns
+    -------
+    list[({str: value}, dict)] Settings changed & resulting config.
+    """
+    keys = list(grid)
+    for key in keys:
+        category, _, attribute = key.partition('.')
+
+        if category not in base_config or not attribute:
+            raise ValueError(f"Grid key '{key}' should be category.attribute w/ a category of the base config")
+
+    configs, seen = [], set()
+    for settings in common.grid_product(grid):
+        config = copy.deepcopy(base_config)
+        for key, value in settings.items():
+            category, _, attribute = key.partition('.')
+            config[category][attribute] = value
+
+        canonical = json.dumps({category: (values if values['enable'] else {'enable': False})
+                                for category, values in config.items()}, sort_keys=True)
+        if canonical in seen:
+            continue
+        seen.add(canonical)
+
+        configs.append((settings, config))
+
+    return configs
+
+
+def evaluate_config(config, images, threshold=.5, repeats=N_REPEATS):
+    """
+    Latency & accuracy of one configuration.
+
+    Parameters
+    ----------
+    config: dict
+        Obstacle config.
+    images: list[(color_image, depth_image, ndarray[n, 4])]
+        Images & annotated boxes.
+    threshold: float, default=.5
+        Minimum iou of a found box.
+    repeats: int, default=N_REPEATS
+        Timed runs per image, the fastest is kept.
+
+    Returns
+    -------
+    dict latency(s) per image, found, missed, extra, precision & recall.
+    """
+    obstacle_finder = ObstacleFinder(params=import_params(config))
+
+    latencies, found, missed, extra = [], 0, 0, 0
+    for color_image, depth_image, annotated in images:
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            bounding_boxes = obstacle_finder.find(color_image, depth_image)
+            samples.append(time.perf_counter() - start)
+
+        latencies.append(min(samples))
+
+        predicted = common.box_extents(bounding_boxes)
+        n_matches = len(common.match_boxes(common.iou_matrix(predicted, annotated), threshold))
+
+        found += n_matches
+        missed += len(annotated) - n_matches
+        extra += len(predicted) - n_matches
+
+    return {
+        'latency(s)': float(np.median(latencies)) if latencies else np.nan,
+        'found': found,
+        'missed': missed,
+        'extra': extra,
+        'precision': found / (found + extra) if found + extra else np.nan,
+        'recall': found / (found + missed) if found + missed else np.nan,
+    }
+
+
+def _evaluate(task, images):
+    """
+    Pool helper, evaluates a config on the images.
+    """
+    settings, config, threshold, repeats = task
+
+    return {'config': json.dumps(settings), **evaluate_config(config, images, threshold, repeats)}
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    """
+    parser = common.sweep_parser("Sweep obstacle detector parameters.", IMG_FOLDER, N_REPEATS)
+    parser.add_argument("-c", "--config", type=str, default=CONFIG_FILENAME, help="Base config")
+    parser.add_argument("-t", "--iou", type=float, default=.5, help="Minimum iou of a found box")
+    parser.add_argument("--score", choices=['recall', 'precision'], default='recall', help="Accuracy to trade off")
+    parser.add_argument("--min-recall", type=float, default=None, help="Pick the fastest config w/ this recall")
+    parser.add_argument("--best", type=str, default='', help="Save the picked config to this file")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    args = parse_args(argv)
+
+    with open(args.config, 'r') as config_file:
+        base_config = json.load(config_file)
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid, 'r') as grid_file:
+            grid = json.load(grid_file)
+
+    configs = expand_grid(base_config, grid)
+
+    if args.synthetic:
+        images = common.synthetic_images('obstacle', ObjectType.AVOID, args.synthetic)
+    else:
+        images = common.annotated_images(args.images, cache_dir=args.cache)
+    if not images:
+        print("No annotated images to evaluate on.")
+        return 2
+
+    print(f"Evaluating {len(configs)} configs on {len(images)} images.")
+
+    ## Evaluate configs
+    tasks = [(settings, config, args.iou, args.repeats) for settings, config in configs]
+
+    rows = common.map_images(_evaluate, tasks, images, args.jobs)
+
+    output = pd.DataFrame(rows, columns=COLUMNS)
+
+    ## Report
+    common.report_pareto_front(output, 'latency(s)', args.score, f"Pareto front, latency vs {args.score}", args.output)
+
+    if args.min_recall is not None:
+        passing = output[output['recall'] >= args.min_recall].sort_values('latency(s)')
+
+        if not len(passing):
+            print(f"\nNo config reaches a recall of {args.min_recall}.")
+            return 1
+
+        best = passing.iloc[0]
+        print(f"\nFastest config w/ recall >= {args.min_recall}: {best['config']} "
+              f"{best['latency(s)']:.5f}s recall {best['recall']:.3f}")
+
+        if args.best:
+            settings = json.loads(best['config'])
+            config = next(config for s, config in configs if s == settings)
+
+            with open(args.best, 'w') as config_file:
+                json.dump(config, config_file, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,6 +20,7 @@ import cv2
 import common
 
 from vision.module.in_frame import ModuleInFrame
+from vision.module.location import ModuleLocation
 
 
 class TimeModuleInFrame:
@@ -84,3 +85,23 @@ class TimeModuleInFrame:
         Timing mif.
         """
         ModuleInFrame(color_image, depth_image)
+
+
+class TimeModuleLocation(TimeModuleInFrame):
+    """
+    Timing ModuleLocation on the ModuleInFrame images.
+    """
+    def setup(self):
+        """
+        Load images & create locator.
+        """
+        super().setup()
+
+        self.locator = ModuleLocation()
+
+    def time_ModuleLocation(self, color_image, depth_image):
+        """
+        Timing getCenter.
+        """
+        self.locator.setImg(color_image, depth_image)
+        self.locator.getCenter()
@@ -4,13 +4,23 @@ Run time benchmarks.
     python times/runall.py module
 will only run benchmarks w/ module in name.
 
+    python times/runall.py --repeats 20 --jobs 4 --pin --output times.csv
+takes 20 samples of each benchmark, running 4 benchmark classes at a time,
+each pinned to its own cpu, and saves the results.
+
+    python times/runall.py --store
+adds the results to the history used by regression.py.
+
+    python times/runall.py --memory
+also traces memory, reporting the peak & retained bytes of each call.
+
 
 Process
 -------
 files = [filename for filename in 'times/' if 'bench' in filename]
 benchmarks = [class for class in filenames if 'Time' in class_name]
 
-for benchmark in benchmarks:
+for benchmark in benchmarks:  # Optionally in parallel processes
     instance = benchmark()
 
     try: instance.setup()
@@ -20,9 +30,13 @@ for benchmark in benchmarks:
 
     for method in benchmark if 'time' in method_name:
         for title, parameters in benchmark.PARAMETERS.items():
-            time(method(instance, *parameters))
+            for _ in range(warmup): method(instance, *parameters)
+
+            samples = [time(method(instance, *parameters)) for _ in range(repeats)]
 
-            log(benchmark, method, title, time)
+            if memory: peaks = [tracemalloc(method(instance, *parameters)) for _ in range(repeats)]
+
+            log(benchmark, method, title, min(samples), median(samples), iqr(samples), median(peaks))
 
 Suggested Parameter Defaults
 ----------------------------
@@ -32,59 +46,301 @@ N Objects = 0
 """
 import __init__
 
+import os
 import sys
+import json
 import timeit
+import argparse
+import tracemalloc
+import importlib
+import multiprocessing
 import numpy as np
 import pandas as pd
 
 from times import modules
 
+import regression
 
-N_REPEATS = 1
 
-if __name__ == '__main__':
-    benchmarks = {}
+N_REPEATS = 10  # Samples taken of each benchmark
+N_WARMUP = 1  # Untimed runs before sampling, fills caches & lazy initialization
+N_NUMBER = 1  # Calls per sample
+
+COLUMNS = ['class', 'method', 'test', 'n', 'min(s)', 'median(s)', 'q1(s)', 'q3(s)', 'iqr(s)']
+MEMORY_COLUMNS = ['peak(B)', 'retained(B)', 'blocks']
+
 
-    ## Command line args
-    keyword = sys.argv[1] if len(sys.argv) > 1 else ''
+def find_benchmarks(keyword=''):
+    """
+    Find time benchmark classes in the bench_* modules.
+
+    Parameters
+    ----------
+    keyword: str, default=''
+        Only benchmarks with keyword in their class name are returned.
+
+    Returns
+    -------
+    list[(module name, class name)]
+    """
+    benchmarks = []
 
-    ## Find time benchmarks in modules
     for module in modules:
         for key, value in module.__dict__.items():
-            if key[:4] == 'Time' and keyword.lower() in key.lower():
-                benchmarks.update({key: value})
+            if key[:4] == 'Time' and keyword.lower() in key.lower() and isinstance(value, type):
+                benchmarks.append((module.__name__, key))
 
-    ## Run benchmarks
-    output = pd.DataFrame(columns=['class', 'method', 'test', 'time(s)'])
+    return benchmarks
+
+
+def summarize(samples):
+    """
+    Robust statistics of timing samples.
+
+    Parameters
+    ----------
+    samples: list[float]
+        Seconds per call of each sample.
+
+    Returns
+    -------
+    {str: float} n, min, median, quartiles and interquartile range.
+    """
+    if not len(samples):
+        return {'n': 0, 'min(s)': np.nan, 'median(s)': np.nan, 'q1(s)': np.nan, 'q3(s)': np.nan, 'iqr(s)': np.nan}
+
+    q1, median, q3 = np.percentile(samples, [25, 50, 75])
+
+    return {'n': len(samples), 'min(s)': np.min(samples), 'median(s)': median, 'q1(s)': q1, 'q3(s)': q3,
+            'iqr(s)': q3 - q1}
+
+
+def time_method(function, warmup=N_WARMUP, repeats=N_REPEATS, number=N_NUMBER):
+    """
+    Sample the run time of a function.
+
+    Parameters
+    ----------
+    function: func[]
+        Function to time.
+    warmup: int, default=N_WARMUP
+        Untimed calls before sampling.
+    repeats: int, default=N_REPEATS
+        Number of samples.
+    number: int, default=N_NUMBER
+        Calls per sample.
+
+    Returns
+    -------
+    list[float] Seconds per call of each sample.
+    """
+    for _ in range(warmup):
+        function()
+
+    return [time / number for time in timeit.repeat(function, number=number, repeat=repeats)]
+
+
+def trace_memory(function, warmup=N_WARMUP, repeats=N_REPEATS):
+    """
+    Sample the memory use of a function w/ tracemalloc.
+    Kept apart from timing since tracing slows every allocation.
+
+    Parameters
+    ----------
+    function: func[]
+        Function to trace.
+    warmup: int, default=N_WARMUP
+        Untraced calls before sampling, so lazy initialization isn't counted.
+    repeats: int, default=N_REPEATS
+        Number of samples.
+
+    Returns
+    -------
+    {str: float} Median peak bytes allocated during a call,
+    bytes & blocks still allocated after it returns.
+    """
+    for _ in range(warmup):
+        function()
+
+    peaks, retained, blocks = [], [], []
+
+    was_tracing = tracemalloc.is_tracing()
+
+    try:
+        for _ in range(repeats):
+            # Restarting clears the traces & the peak, tracemalloc.reset_peak needs python 3.9
+            tracemalloc.stop()
+            tracemalloc.start()
+
+            function()
+
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+
+            peaks.append(peak)
+            retained.append(current)
+            blocks.append(len(snapshot.traces))
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()  # Callers already tracing keep tracing, w/o their earlier traces
 
-    for b_name, benchmark in benchmarks.items():
-        b_instance = benchmark()
+    return {'peak(B)': np.median(peaks), 'retained(B)': np.median(retained), 'blocks': np.median(blocks)}
 
-        try:
-            b_instance.setup()
-        except AttributeError as e:
-            print(f"No setup method found for {b_name}.")
 
-        if not hasattr(b_instance, 'PARAMETERS'):
-            b_instance.PARAMETERS = {'': []}
+def run_benchmark(module_name, class_name, warmup=N_WARMUP, repeats=N_REPEATS, number=N_NUMBER, memory=False):
+    """
+    Run every method of a benchmark class w/ each of its parameter sets.
+
+    Parameters
+    ----------
+    module_name: str
+        Module the benchmark is in.
+    class_name: str
+        Name of the benchmark class.
+    warmup, repeats, number: int
+        See time_method.
+    memory: bool, default=False
+        Also trace memory, see trace_memory.
+
+    Returns
+    -------
+    list[dict] One result row per method and parameter set, w/ raw samples.
+    """
+    benchmark = getattr(importlib.import_module(module_name), class_name)
+
+    b_instance = benchmark()
+
+    try:
+        b_instance.setup()
+    except AttributeError:
+        print(f"No setup method found for {class_name}.")
+
+    if not hasattr(b_instance, 'PARAMETERS'):
+        b_instance.PARAMETERS = {'': []}
+
+    rows = []
+    for m_name, method in benchmark.__dict__.items():
+        if 'time_' not in m_name or not callable(method):
+            continue
+
+        for p_name, parameters in b_instance.PARAMETERS.items():
+            try:
+                samples = time_method(lambda: method(b_instance, *parameters), warmup, repeats, number)
+            except Exception as e:
+                print(f"{class_name}.{m_name}: {p_name} error: {e}")
+
+                samples = []
+            else:
+                stats = summarize(samples)
+                print(f"{class_name}.{m_name}: {p_name} {stats['median(s)']:.5f}s "
+                      f"(min {stats['min(s)']:.5f}s, iqr {stats['iqr(s)']:.5f}s)")
+
+            row = {'class': class_name, 'method': m_name, 'test': p_name, **summarize(samples), 'samples': samples}
+
+            if memory and samples:
+                usage = trace_memory(lambda: method(b_instance, *parameters), warmup, repeats)
+                print(f"{class_name}.{m_name}: {p_name} peak {usage['peak(B)'] / 2 ** 10:.1f}KiB "
+                      f"(retained {usage['retained(B)'] / 2 ** 10:.1f}KiB in {usage['blocks']:.0f} blocks)")
+
+                row.update(usage)
+
+            rows.append(row)
+
+    return rows
+
+
+def _run_benchmark(task):
+    """
+    Pool helper, unpacks the arguments of run_benchmark.
+    """
+    return run_benchmark(*task)
+
+
+def pin_cpu(counter, cpus):
+    """
+    Pin the calling process to its own cpu, so parallel benchmarks don't share cores.
+
+    Parameters
+    ----------
+    counter: multiprocessing.Value
+        Shared count of processes pinned so far.
+    cpus: list[int]
+        Cpus to choose from.
+    """
+    with counter.get_lock():
+        cpu = cpus[counter.value % len(cpus)]
+        counter.value += 1
+
+    os.sched_setaffinity(0, {cpu})
+
+
+def write_results(rows, filename, memory=False):
+    """
+    Save results as csv or json, by file extension.
+    Raw samples are only kept in json.
+
+    Parameters
+    ----------
+    rows: list[dict]
+        Rows from run_benchmark.
+    filename: str
+        File to write.
+    memory: bool, default=False
+        Include memory columns in csv.
+    """
+    if filename.endswith('.json'):
+        with open(filename, 'w') as file:
+            json.dump(rows, file, indent=2, default=float)
+    else:
+        pd.DataFrame(rows, columns=COLUMNS + MEMORY_COLUMNS if memory else COLUMNS).to_csv(filename, index=False)
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Run time benchmarks.")
+    parser.add_argument("keyword", nargs='?', default='', help="Only run benchmarks w/ keyword in name")
+    parser.add_argument("-r", "--repeats", type=int, default=N_REPEATS, help="Samples per benchmark")
+    parser.add_argument("-w", "--warmup", type=int, default=N_WARMUP, help="Untimed runs before sampling")
+    parser.add_argument("-n", "--number", type=int, default=N_NUMBER, help="Calls per sample")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Benchmark classes to run in parallel")
+    parser.add_argument("-p", "--pin", action="store_true", help="Pin each benchmark process to one cpu")
+    parser.add_argument("-o", "--output", type=str, default='', help="Save results to .csv or .json file")
+    parser.add_argument("-m", "--memory", action="store_true", help="Also trace peak & retained memory per call")
+    parser.add_argument("-s", "--store", action="store_true", help="Add results to the regression history")
+
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    tasks = [(module_name, class_name, args.warmup, args.repeats, args.number, args.memory)
+             for module_name, class_name in find_benchmarks(args.keyword)]
+
+    ## Run benchmarks
+    cpus = sorted(os.sched_getaffinity(0)) if args.pin else []
+    counter = multiprocessing.Value('i', 0)
+
+    if args.jobs > 1:
+        initializer, initargs = (pin_cpu, (counter, cpus)) if args.pin else (None, ())
 
-        for m_name, method in benchmark.__dict__.items():
-            if 'time_' not in m_name or not callable(method):
-                continue
+        with multiprocessing.Pool(args.jobs, initializer=initializer, initargs=initargs) as pool:
+            results = pool.map(_run_benchmark, tasks)
+    else:
+        if args.pin:
+            pin_cpu(counter, cpus)
 
-            for p_name, parameters in b_instance.PARAMETERS.items():
-                try:
-                    time = timeit.timeit(lambda: method(b_instance, *parameters), number=N_REPEATS) / N_REPEATS
-                except Exception as e:
-                    print(f"{b_name}.{m_name}: {p_name} error: {e}")
+        results = [_run_benchmark(task) for task in tasks]
 
-                    output.loc[len(output)] = [b_name, m_name, p_name, np.nan]
-                else:
-                    print(f"{b_name}.{m_name}: {p_name} {time:.5f}s")
+    rows = [row for result in results for row in result]
 
-                    output.loc[len(output)] = [b_name, m_name, p_name, time]
+    ##
+    if args.output:
+        write_results(rows, args.output, args.memory)
 
-    #print(output.head(15))
-    # output.to_csv('', index=False)
+    if args.store:
+        print(f"Stored {regression.record(rows)} results for regression tracking.")
 
     print()
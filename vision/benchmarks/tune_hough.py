@@ -0,0 +1,322 @@
+"""
+Tune the HoughCircles parameters used by ModuleInFrame & ModuleLocation.
+
+    python3 tune_hough.py
+searches the default grid over the annotated module images in vision_images/module,
+
+    python3 tune_hough.py --synthetic 30 --write
+searches over 30 generated frames, & half as many w/o a module, then writes the best parameters
+of both stages to module/hough_config.json.
+
+For each parameter set, ModuleLocation is run on every image measuring the number of circles found,
+the error of the located center to the center of the annotated module and the time per frame.
+ModuleInFrame is run on the same images measuring how often it is right about the module being in frame
+& the time per frame. Each stage gets its own best parameters, written to its own section of the config.
+Parameter sets are evaluated in parallel processes & the Pareto front of each stage is printed.
+Fewer spurious circles means less work in the slope stage, which grows w/ circles squared.
+"""
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import common
+
+from vision.module.hough import CONFIG_FILENAME
+from vision.module.in_frame import ModuleInFrame
+from vision.module.location import ModuleLocation
+from vision.bounding_box import ObjectType
+
+
+IMG_FOLDER = os.path.join(gparent_dir, 'vision_images', 'module')
+
+DEFAULT_GRID = {
+    'blur_size': [5, 7, 9],
+    'minDist': [8, 14, 20],
+    'param1': [63, 75, 90],
+    'param2': [24, 30, 36],
+    'minRadius': [0],
+    'maxRadius': [50],
+}
+
+N_REPEATS = 3  # Timed runs per image, the fastest is kept
+
+COLUMNS = ['params', 'time(s)', 'circles', 'located', 'center error(px)', 'in_frame time(s)', 'in_frame accuracy']
+
+
+def module_images(path, cache_dir=None):
+    """
+    Annotated module images, the module is the first annotated box.
+
+    Parameters
+    ----------
+    path: str
+        Image folder w/ an Annotations folder from blob_annotator & benchmark.json.
+    cache_dir: str, default=None
+        Folder to cache decoded images in.
+
+    Returns
+    -------
+    list[(color_image, depth_image, ndarray[4] or None)] Images & module box.
+    """
+    encoding = 'color'
+    if os.path.isfile(os.path.join(path, 'benchmark.json')):
+        with open(os.path.join(path, 'benchmark.json')) as file:
+            encoding = json.load(file)['encoding']
+
+    return [(color_image, depth_image, boxes[0] if len(boxes) else None)
+            for color_image, depth_image, boxes in common.annotated_images(path, encoding, cache_dir)]
+
+
+def evaluate_params(params, images, repeats=N_REPEATS):
+    """
+    Circle count, center error & time per frame of one parameter set for ModuleLocation.
+
+    Parameters
+    ----------
+    params: dict
+        blur_size & HoughCircles parameters.
+    images: list[(color_image, depth_image, ndarray[4] or None)]
+        Images & module box.
+    repeats: int, default=N_REPEATS
+        Timed runs per image, the fastest is kept.
+
+    Returns
+    -------
+    dict time(s) per frame, mean circles, fraction of modules located & median center error.
+    """
+    times, circles, errors, n_located, n_modules = [], [], [], 0, 0
+
+    for color_image, depth_image, module_box in images:
+        locator = ModuleLocation(hough_params=params)
+        locator.setImg(color_image, depth_image)
+
+        samples = []
+        for _ in range(repeats):
+            locator.center = np.array([-1, -1])
+
+            start = time.perf_counter()
+            try:
+                center = locator.getCenter()
+            except (ValueError, IndexError, ZeroDivisionError):
+                center = (-1, -1)
+            samples.append(time.perf_counter() - start)
+
+        times.append(min(samples))
+        circles.append(len(locator.circles))
+
+        if module_box is None:
+            continue
+
+        n_modules += 1
+        if tuple(center) == (-1, -1):
+            continue
+
+        n_located += 1
+        errors.append(np.hypot(center[0] - (module_box[0] + module_box[2]) / 2,
+                               center[1] - (module_box[1] + module_box[3]) / 2))
+
+    return {
+        'time(s)': float(np.median(times)) if times else np.nan,
+        'circles': float(np.mean(circles)) if circles else np.nan,
+        'located': n_located / n_modules if n_modules else np.nan,
+        'center error(px)': float(np.median(errors)) if errors else np.nan,
+    }
+
+
+def evaluate_in_frame(params, images, repeats=N_REPEATS):
+    """
+    Accuracy & time per frame of one parameter set for ModuleInFrame.
+
+    Parameters
+    ----------
+    params: dict
+        blur_size & HoughCircles parameters.
+    images: list[(color_image, depth_image, ndarray[4] or None)]
+        Images & module box, None when there is no module.
+    repeats: int, default=N_REPEATS
+        Timed runs per image, the fastest is kept.
+
+    Returns
+    -------
+    dict in_frame time(s) per frame & fraction of images it is right about.
+    """
+    times, n_correct = [], 0
+
+    for color_image, depth_image, module_box in images:
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            try:
+                in_frame = ModuleInFrame(color_image, depth_image, hough_params=params)
+            except ValueError:  # Too many circles
+                in_frame = False
+            samples.append(time.perf_counter() - start)
+
+        times.append(min(samples))
+        n_correct += in_frame == (module_box is not None)
+
+    return {
+        'in_frame time(s)': float(np.median(times)) if times else np.nan,
+        'in_frame accuracy': n_correct / len(images) if images else np.nan,
+    }
+
+
+def _evaluate(task, images):
+    """
+    Pool helper, evaluates a parameter set on the images for both stages.
+    """
+    params, repeats = task
+
+    return {'params': json.dumps(params), **evaluate_params(params, images, repeats),
+            **evaluate_in_frame(params, images, repeats)}
+
+
+def best_params(output, min_located=None):
+    """
+    Most accurate parameter set locating enough modules, the fastest on ties.
+
+    Parameters
+    ----------
+    output: pd.DataFrame
+        Results w/ COLUMNS.
+    min_located: float, default=None
+        Minimum fraction of modules located, defaults to the best fraction reached.
+
+    Returns
+    -------
+    dict or None if no parameter set qualifies.
+    """
+    if min_located is None:
+        min_located = output['located'].max()
+
+    passing = output[(output['located'] >= min_located) & output['center error(px)'].notna()]
+    passing = passing.sort_values(['center error(px)', 'time(s)'])
+
+    if not len(passing):
+        return None
+
+    return json.loads(passing.iloc[0]['params'])
+
+
+def best_in_frame_params(output):
+    """
+    Most accurate parameter set for ModuleInFrame, the fastest on ties.
+
+    Parameters
+    ----------
+    output: pd.DataFrame
+        Results w/ COLUMNS.
+
+    Returns
+    -------
+    dict or None if nothing was evaluated.
+    """
+    passing = output[output['in_frame accuracy'].notna()]
+    passing = passing.sort_values(['in_frame accuracy', 'in_frame time(s)'], ascending=[False, True])
+
+    if not len(passing):
+        return None
+
+    return json.loads(passing.iloc[0]['params'])
+
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    """
+    parser = common.sweep_parser("Tune module circle detection parameters.", IMG_FOLDER, N_REPEATS)
+    parser.add_argument("--min-located", type=float, default=None, help="Minimum fraction of modules located")
+    parser.add_argument("-w", "--write", nargs='?', const=CONFIG_FILENAME, default='',
+                        help="Write the best parameters of both stages, defaults to module/hough_config.json")
+
+    return parser.parse_args(argv)
+
+
+def write_params(filename, stages):
+    """
+    Save parameters to their stages of a hough config, other stages are kept as they are.
+
+    Parameters
+    ----------
+    filename: str
+        Config to update, created from module/hough_config.json if missing.
+    stages: {str: dict}
+        blur_size & HoughCircles parameters of each stage, ie 'location' & 'in_frame'.
+    """
+    with open(filename if os.path.isfile(filename) else CONFIG_FILENAME, 'r') as config_file:
+        config = json.load(config_file)
+
+    config.update(stages)
+
+    with open(filename, 'w') as config_file:
+        json.dump(config, config_file, indent=2)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    args = parse_args(argv)
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid, 'r') as grid_file:
+            grid = {**DEFAULT_GRID, **json.load(grid_file)}
+
+    param_sets = common.grid_product(grid)
+
+    if args.synthetic:
+        ## Frames w/o a module so ModuleInFrame can be wrong both ways
+        images = [(color_image, depth_image, boxes[0] if len(boxes) else None)
+                  for scene_object, n_frames in [('module', args.synthetic), ('obstacle', args.synthetic // 2)]
+                  for color_image, depth_image, boxes in common.synthetic_images(scene_object, ObjectType.MODULE,
+                                                                                 n_frames)]
+    else:
+        images = module_images(args.images, args.cache)
+    if not images:
+        print("No annotated images to tune on.")
+        return 2
+
+    print(f"Evaluating {len(param_sets)} parameter sets on {len(images)} images.")
+
+    ## Evaluate parameters
+    tasks = [(params, args.repeats) for params in param_sets]
+
+    rows = common.map_images(_evaluate, tasks, images, args.jobs)
+
+    output = pd.DataFrame(rows, columns=COLUMNS)
+
+    ## Report
+    common.report_pareto_front(output, 'time(s)', -output['center error(px)'],
+                               "ModuleLocation Pareto front, time vs center error")
+    common.report_pareto_front(output, 'in_frame time(s)', 'in_frame accuracy',
+                               "ModuleInFrame Pareto front, time vs accuracy", args.output)
+
+    best = best_params(output, args.min_located)
+    if best is None:
+        print(f"\nNo parameters locate {args.min_located or 'any'} of the modules.")
+        return 1
+
+    best_in_frame = best_in_frame_params(output)
+
+    print(f"\nBest ModuleLocation parameters: {json.dumps(best)}")
+    print(f"Best ModuleInFrame parameters: {json.dumps(best_in_frame)}")
+
+    if args.write:
+        write_params(args.write, {'location': best, 'in_frame': best_in_frame})
+
+        print(f"Wrote {args.write}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,3 +12,7 @@ try:
 
 except ImportError as e:
     print(f"camera/__init__.py failed: {e}")
+
+# Only need opencv, keep usable without camera drivers
+from synthetic import SyntheticCamera
+from multi_camera import MultiCamera
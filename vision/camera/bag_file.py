@@ -8,6 +8,14 @@ try:
     from vision.camera.template import Camera
 except ImportError:
     from template import Camera
+try:
+    from vision.camera.frame import Frame, Intrinsics, match_depth_resolution
+except ImportError:
+    from frame import Frame, Intrinsics, match_depth_resolution
+try:
+    from vision.camera.depth_filters import build_filter_chain, apply_filters, decimation_factor
+except ImportError:
+    from depth_filters import build_filter_chain, apply_filters, decimation_factor
 try:
     from vision.common.take_picture import save_camera_frame
 except ImportError:
@@ -29,12 +37,18 @@ class BagFile(Camera):
     filename: str
         Name of .bag file to read.
         Driver should find this by parsing arguments
+    depth_filters: dict, default=None
+        Librealsense post-processing filters to apply to depth, see camera/depth_filters.json.
+        Defaults to None, which returns the raw aligned depth.
     """
-    def __init__(self, screen_width, screen_height, frame_rate, filename, **kwargs):
+    def __init__(self, screen_width, screen_height, frame_rate, filename, depth_filters=None, **kwargs):
         super().__init__(screen_width, screen_height, frame_rate)
 
         self.filename = filename
 
+        self.depth_filters = build_filter_chain(depth_filters)
+        self.depth_decimation = decimation_factor(depth_filters)  # Depth is this many times coarser than color
+
         self.pipeline = rs.pipeline()
 
         # Create a config object
@@ -50,12 +64,21 @@ class BagFile(Camera):
 
         Returns
         -------
-        depth image[1 channel]: numpy array
-        color image[3 channel]: numpy array
-            in RGB format
+        Frame
+            depth image[1 channel]: numpy array
+            color image[3 channel]: numpy array
+                in RGB format
+            w/ capture timestamp, frame number, intrinsics, depth scale and exposure
         """
         # Start streaming from file
-        self.pipeline.start(self.config)
+        profile = self.pipeline.start(self.config)
+
+        # Getting the depth sensor's depth scale (see rs-align example for explanation)
+        depth_scale = profile.get_device().first_depth_sensor().get_depth_scale()
+
+        color_intrinsics = profile.get_stream(rs.stream.color).as_video_stream_profile().get_intrinsics()
+        intrinsics = Intrinsics(color_intrinsics.width, color_intrinsics.height, color_intrinsics.fx,
+                                color_intrinsics.fy, color_intrinsics.ppx, color_intrinsics.ppy)
 
         align_to = rs.stream.color
         align = rs.align(align_to)
@@ -72,11 +95,22 @@ class BagFile(Camera):
             aligned_depth_frame = aligned_frames.get_depth_frame()
             color_frame = aligned_frames.get_color_frame()
 
+            # Clean up depth before it is handed to numpy
+            aligned_depth_frame = apply_filters(self.depth_filters, aligned_depth_frame)
+
             depth_image = np.asanyarray(aligned_depth_frame.get_data())
             color_image = np.asanyarray(color_frame.get_data())
+            if self.depth_decimation > 1:
+                depth_image = match_depth_resolution(depth_image, color_image)  # Decimation shrinks depth
             color_image = color_image[:, :, ::-1]  # shifts colors back to normal
 
-            yield depth_image, color_image
+            exposure = None
+            if color_frame.supports_frame_metadata(rs.frame_metadata_value.actual_exposure):
+                exposure = color_frame.get_frame_metadata(rs.frame_metadata_value.actual_exposure)
+
+            yield Frame(depth_image, color_image, timestamp=frames.get_timestamp() / 1000,
+                        sequence=frames.get_frame_number(), intrinsics=intrinsics, depth_scale=depth_scale,
+                        exposure=exposure, decimation=self.depth_decimation)
 
     def display_in_window(self, clipping=False):
         """
@@ -89,6 +123,10 @@ class BagFile(Camera):
             beyond a given distance from the camera
         """
         for depth_image, color_image in self:
+            if depth_image.shape[:2] != color_image.shape[:2]:
+                # Decimated depth is scaled back up for display
+                depth_image = cv2.resize(depth_image, color_image.shape[1::-1], interpolation=cv2.INTER_NEAREST)
+
             # Remove background - Set pixels further than clipping_distance to grey
             grey_color = 153
             depth_image_3d = np.dstack((depth_image, depth_image, depth_image))
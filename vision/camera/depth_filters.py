@@ -0,0 +1,128 @@
+"""
+Helper functions to build a chain of librealsense depth post-processing filters,
+used by the realsense based cameras.
+"""
+import pyrealsense2 as rs
+
+
+# Filters in the order librealsense recommends applying them
+FILTER_ORDER = ['threshold', 'decimation', 'spatial', 'temporal', 'hole_filling']
+
+FILTER_TYPES = {
+    'threshold': 'threshold_filter',
+    'decimation': 'decimation_filter',
+    'spatial': 'spatial_filter',
+    'temporal': 'temporal_filter',
+    'hole_filling': 'hole_filling_filter',
+}
+
+# Spatial & temporal filters work better on disparity than depth
+DISPARITY_FILTERS = ['spatial', 'temporal']
+
+
+def enabled_filters(config):
+    """
+    Names of the enabled filters in a configuration, in application order.
+
+    Parameters
+    ----------
+    config: dict
+        Filter configuration, {filter name: {'enable': bool, option name: value}}.
+
+    Returns
+    -------
+    list[str]
+    """
+    if config is None:
+        return []
+
+    if not isinstance(config, dict):
+        raise ValueError(f"When building depth filters, config should be a dictionary, got {type(config)} instead")
+
+    for name, settings in config.items():
+        if name not in FILTER_TYPES:
+            raise ValueError(f"Unrecognized depth filter '{name}', expected one of {FILTER_ORDER}")
+        if 'enable' not in settings:
+            raise ValueError(f"Depth filter '{name}' is missing an 'enable' attribute")
+
+    return [name for name in FILTER_ORDER if name in config and config[name]['enable']]
+
+
+def build_filter_chain(config):
+    """
+    Create the librealsense filters for a configuration.
+
+    Parameters
+    ----------
+    config: dict
+        Filter configuration, {filter name: {'enable': bool, option name: value}}.
+        Option names are those of pyrealsense2.option, ie filter_magnitude.
+
+    Returns
+    -------
+    list[pyrealsense2.filter] Filters to apply to each depth frame, in order.
+    """
+    names = enabled_filters(config)
+
+    disparity = [name for name in names if name in DISPARITY_FILTERS]
+
+    chain = []
+    for name in names:
+        if disparity and name == disparity[0]:
+            chain.append(rs.disparity_transform(True))
+
+        depth_filter = getattr(rs, FILTER_TYPES[name])()
+
+        for option, value in config[name].items():
+            if option == 'enable':
+                continue
+
+            depth_filter.set_option(getattr(rs.option, option), value)
+
+        chain.append(depth_filter)
+
+        if disparity and name == disparity[-1]:
+            chain.append(rs.disparity_transform(False))
+
+    return chain
+
+
+def decimation_factor(config):
+    """
+    How many times decimation shrinks depth images. The cameras upsample depth back
+    to the color resolution, so this is how much coarser depth is than color.
+
+    Parameters
+    ----------
+    config: dict
+        Filter configuration.
+
+    Returns
+    -------
+    int
+    """
+    if 'decimation' not in enabled_filters(config):
+        return 1
+
+    return int(config['decimation'].get('filter_magnitude', 2))
+
+
+def apply_filters(chain, depth_frame):
+    """
+    Run a depth frame through a filter chain.
+
+    Parameters
+    ----------
+    chain: list[pyrealsense2.filter]
+        Filters from build_filter_chain.
+    depth_frame: pyrealsense2.depth_frame
+        Frame to filter.
+
+    Returns
+    -------
+    pyrealsense2.frame Filtered depth frame.
+    """
+    for depth_filter in chain:
+        depth_frame = depth_filter.process(depth_frame)
+
+    return depth_frame
@@ -0,0 +1,94 @@
+"""
+Frames produced by the cameras, carrying capture metadata along with the images.
+"""
+import time
+from collections import namedtuple
+
+import cv2
+
+
+# Pinhole camera model of the color stream, in pixels
+Intrinsics = namedtuple('Intrinsics', ['width', 'height', 'fx', 'fy', 'ppx', 'ppy'])
+
+
+class Frame:
+    """
+    A depth/color image pair and its capture metadata.
+
+    Unpacks like the (depth, color) tuples cameras used to yield,
+    ie `depth_image, color_image = frame`.
+
+    Parameters
+    ----------
+    depth: ndarray
+        Depth image.
+    color: ndarray
+        Color image.
+    timestamp: float, default=None
+        Capture time in seconds since the epoch, defaults to now.
+    sequence: int, default=0
+        Frame number from the camera, gaps mean dropped frames.
+    intrinsics: Intrinsics, default=None
+        Color stream intrinsics, if known.
+    depth_scale: float, default=None
+        Meters per depth unit, if known.
+    exposure: float, default=None
+        Color sensor exposure in microseconds, if known.
+    decimation: int, default=1
+        How many times depth was decimated, it is then upsampled back to the color resolution
+        so pixel coordinates are shared but depth is this many times coarser.
+    bounding_boxes: list[BoundingBox], default=None
+        Ground truth boxes, only known for generated frames.
+    others: list[Frame], default=None
+        Frames of other cameras captured at the same time, set by MultiCamera.
+    """
+    __slots__ = ['depth', 'color', 'timestamp', 'sequence', 'intrinsics', 'depth_scale', 'exposure',
+                 'decimation', 'bounding_boxes', 'others']
+
+    def __init__(self, depth, color, timestamp=None, sequence=0, intrinsics=None, depth_scale=None,
+                 exposure=None, decimation=1, bounding_boxes=None, others=None):
+        self.depth = depth
+        self.color = color
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.sequence = sequence
+        self.intrinsics = intrinsics
+        self.depth_scale = depth_scale
+        self.exposure = exposure
+        self.decimation = decimation
+        self.bounding_boxes = bounding_boxes
+        self.others = [] if others is None else others
+
+    def __iter__(self):
+        """
+        Iterate as (depth, color).
+        """
+        yield self.depth
+        yield self.color
+
+    def __repr__(self):
+        return f"Frame[{self.sequence}, {self.timestamp:.3f}]"
+
+
+def match_depth_resolution(depth_image, color_image):
+    """
+    Upsample a decimated depth image back to the resolution of the color image.
+
+    Nearest neighbor, so no depth values are invented between near & far pixels.
+
+    Parameters
+    ----------
+    depth_image: ndarray
+        Depth image, possibly smaller than color.
+    color_image: ndarray
+        Color image whose pixel coordinates depth should share.
+
+    Returns
+    -------
+    ndarray Depth image the height & width of color, unchanged if it already is.
+    """
+    height, width = color_image.shape[:2]
+
+    if depth_image is None or depth_image.shape[:2] == (height, width):
+        return depth_image
+
+    return cv2.resize(depth_image, (width, height), interpolation=cv2.INTER_NEAREST)
@@ -0,0 +1,213 @@
+"""
+The MultiCamera class is a child class of the camera, fanning in frames from several cameras
+captured in parallel and grouping them by timestamp.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import cv2
+import numpy as np
+try:
+    from vision.camera.template import Camera
+    from vision.camera.frame import Frame
+except ImportError:
+    from template import Camera
+    from frame import Frame
+
+
+class MultiCamera(Camera):
+    """
+    Creates a camera object yielding synchronized frames from multiple cameras.
+
+    Each camera is read in its own capture thread so a slow camera does not hold up the others,
+    frames are then matched by their capture timestamp. Frames without a timestamp
+    are matched on arrival time.
+
+    Parameters
+    ----------
+    cameras: list[Camera]
+        Cameras to read from, ie several Realsense objects with different serial_no.
+    tolerance: float, default=.015
+        Maximum difference between timestamps in a synchronized set, in seconds.
+    buffer_size: int, default=2
+        Frames buffered per camera, the oldest is dropped when the consumer falls behind.
+    timeout: float, default=1
+        Time to wait on a new frame before checking if capture has stopped, in seconds.
+    primary: int, default=0
+        Index of the camera whose frames are yielded, w/ the other cameras' frames attached.
+
+    Settings
+    --------
+    timestamp: float
+        Mean timestamp of the latest synchronized set.
+    dropped_frames: list[int]
+        Number of frames per camera that could not be matched or were overwritten.
+    """
+    def __init__(self, cameras, tolerance=.015, buffer_size=2, timeout=1, primary=0, **kwargs):
+        if not cameras:
+            raise ValueError("MultiCamera requires at least one camera.")
+        if not 0 <= primary < len(cameras):
+            raise ValueError(f"Primary camera {primary} out of range.")
+
+        super().__init__(cameras[0].width, cameras[0].height, cameras[0].framerate)
+
+        self.cameras = cameras
+        self.tolerance = tolerance
+        self.buffer_size = buffer_size
+        self.timeout = timeout
+        self.primary = primary
+
+        self.timestamp = None
+        self.dropped_frames = [0] * len(cameras)
+
+        self._buffers = []
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._running = []
+        self._threads = []
+
+    def _capture(self, index, camera):
+        """
+        Capture thread, pushes timestamped frames of one camera into its buffer.
+        """
+        iterator = iter(camera)
+
+        try:
+            for frame in iterator:
+                if self._stop.is_set():
+                    break
+
+                if not isinstance(frame, Frame):
+                    frame = Frame(*frame)  # Camera yielding bare (depth, color) pairs, stamped now
+
+                timestamp = frame.timestamp
+
+                with self._condition:
+                    buffer = self._buffers[index]
+
+                    if len(buffer) == buffer.maxlen:
+                        self.dropped_frames[index] += 1
+
+                    buffer.append((timestamp, frame))
+                    self._condition.notify()
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+            with self._condition:
+                self._running[index] = False
+                self._condition.notify()
+
+    def _pop_synchronized(self):
+        """
+        Pop a set of frames, one per camera, whose timestamps are within tolerance.
+        Must be called holding self._condition.
+
+        Returns
+        -------
+        list[(timestamp, frame)] or None if no set is available yet.
+        """
+        while all(self._buffers):
+            newest = max(buffer[0][0] for buffer in self._buffers)
+
+            # Frames older than the newest head can never be matched, drop them
+            for i, buffer in enumerate(self._buffers):
+                while buffer and buffer[0][0] < newest - self.tolerance:
+                    buffer.popleft()
+                    self.dropped_frames[i] += 1
+
+            if not all(self._buffers):
+                return None
+
+            if all(buffer[0][0] <= newest + self.tolerance for buffer in self._buffers):
+                return [buffer.popleft() for buffer in self._buffers]
+
+        return None
+
+    def __iter__(self):
+        """
+        Iterate through synchronized frame sets.
+        Capture threads are started on iteration and stopped when it ends.
+
+        Returns
+        -------
+        Frame
+            Matched frame of the primary camera, its others are the matched frames
+            of the remaining cameras in the order cameras were given.
+        """
+        self.close()  # Previous iteration, if any
+
+        self._stop.clear()
+        self._buffers = [deque(maxlen=self.buffer_size) for _ in self.cameras]
+        self._running = [True] * len(self.cameras)
+
+        self._threads = [threading.Thread(target=self._capture, args=(i, camera), name=f"MultiCamera-{i}",
+                                          daemon=True)
+                         for i, camera in enumerate(self.cameras)]
+        for thread in self._threads:
+            thread.start()
+
+        try:
+            while True:
+                with self._condition:
+                    synchronized = self._pop_synchronized()
+
+                    while synchronized is None:
+                        if any(not running and not buffer for running, buffer in zip(self._running, self._buffers)):
+                            return  # A camera has stopped & its frames are used up
+
+                        self._condition.wait(self.timeout)
+                        synchronized = self._pop_synchronized()
+
+                timestamps, frames = zip(*synchronized)
+                self.timestamp = sum(timestamps) / len(timestamps)
+
+                frame = frames[self.primary]
+                frame.others = [other for i, other in enumerate(frames) if i != self.primary]
+
+                yield frame
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Stops the capture threads & waits for them to finish.
+        Each finishes once its camera yields its next frame, or at most timeout later.
+        """
+        self._stop.set()
+
+        for thread in self._threads:
+            thread.join(self.timeout)
+
+        self._threads = []
+
+    def display_in_window(self):
+        """
+        Displays the color streams of every camera side by side in one window
+        """
+        for frame in self:
+            images = np.hstack([cv2.resize(other.color, (self.width, self.height)) for other in [frame, *frame.others]])
+
+            cv2.namedWindow('Color Streams', cv2.WINDOW_AUTOSIZE)
+            cv2.imshow('Color Streams', images)
+
+            key = cv2.waitKey(1)
+
+            # Press esc or 'q' to close the image window
+            if key == ord('q') or key == 27 or cv2.getWindowProperty('Color Streams', 0) == -1:
+                cv2.destroyAllWindows()
+                break
+
+
+if __name__ == '__main__':
+    from realsense import Realsense
+
+    MultiCamera([Realsense(640, 480, 30, serial_no=serial_no) for serial_no in sys.argv[1:]]).display_in_window()
@@ -14,6 +14,14 @@ try:
     from vision.camera.template import Camera
 except ImportError:
     from template import Camera
+try:
+    from vision.camera.frame import Frame, Intrinsics, match_depth_resolution
+except ImportError:
+    from frame import Frame, Intrinsics, match_depth_resolution
+try:
+    from vision.camera.depth_filters import build_filter_chain, apply_filters, decimation_factor
+except ImportError:
+    from depth_filters import build_filter_chain, apply_filters, decimation_factor
 try:
     from vision.common.take_picture import save_camera_frame
 except ImportError:
@@ -35,12 +43,18 @@ class Realsense(Camera):
     serial_no: str
         Serial number of the realsense camera to stream from
         Defaults to empty, which reads if only one realsense is plugged in
+    depth_filters: dict, default=None
+        Librealsense post-processing filters to apply to depth, see camera/depth_filters.json.
+        Defaults to None, which returns the raw aligned depth.
     """
-    def __init__(self, screen_width, screen_height, frame_rate, serial_no="", **kwargs):
+    def __init__(self, screen_width, screen_height, frame_rate, serial_no="", depth_filters=None, **kwargs):
         super().__init__(screen_width, screen_height, frame_rate)
 
         self.serialNumber = serial_no
 
+        self.depth_filters = build_filter_chain(depth_filters)
+        self.depth_decimation = decimation_factor(depth_filters)  # Depth is this many times coarser than color
+
         self.pipeline = rs.pipeline()
 
         # Create a config object
@@ -59,15 +73,20 @@ class Realsense(Camera):
 
         Returns
         -----------
-        depth image: np array, 1 channel
-        color image: np array, 3 channels (in RGB format)
+        Frame
+            depth image: np array, 1 channel
+            color image: np array, 3 channels (in RGB format)
+            w/ capture timestamp, frame number, intrinsics, depth scale and exposure
         """
         # Start streaming from file
         profile = self.pipeline.start(self.config)
 
         # Getting the depth sensor's depth scale (see rs-align example for explanation)
-        #depth_sensor = profile.get_device().first_depth_sensor()
-        #depth_scale = depth_sensor.get_depth_scale()
+        depth_scale = profile.get_device().first_depth_sensor().get_depth_scale()
+
+        color_intrinsics = profile.get_stream(rs.stream.color).as_video_stream_profile().get_intrinsics()
+        intrinsics = Intrinsics(color_intrinsics.width, color_intrinsics.height, color_intrinsics.fx,
+                                color_intrinsics.fy, color_intrinsics.ppx, color_intrinsics.ppy)
 
         align_to = rs.stream.color
         align = rs.align(align_to)
@@ -84,10 +103,21 @@ class Realsense(Camera):
             aligned_depth_frame = aligned_frames.get_depth_frame()
             color_frame = aligned_frames.get_color_frame()
 
+            # Clean up depth before it is handed to numpy
+            aligned_depth_frame = apply_filters(self.depth_filters, aligned_depth_frame)
+
             depth_image = np.asanyarray(aligned_depth_frame.get_data())
             color_image = np.asanyarray(color_frame.get_data())
+            if self.depth_decimation > 1:
+                depth_image = match_depth_resolution(depth_image, color_image)  # Decimation shrinks depth
 
-            yield depth_image, color_image
+            exposure = None
+            if color_frame.supports_frame_metadata(rs.frame_metadata_value.actual_exposure):
+                exposure = color_frame.get_frame_metadata(rs.frame_metadata_value.actual_exposure)
+
+            yield Frame(depth_image, color_image, timestamp=frames.get_timestamp() / 1000,
+                        sequence=frames.get_frame_number(), intrinsics=intrinsics, depth_scale=depth_scale,
+                        exposure=exposure, decimation=self.depth_decimation)
 
     def display_in_window(self, clipping=False):
         """
@@ -100,6 +130,10 @@ class Realsense(Camera):
             beyond a given distance from the camera
         """
         for depth_image, color_image in self:
+            if depth_image.shape[:2] != color_image.shape[:2]:
+                # Decimated depth is scaled back up for display
+                depth_image = cv2.resize(depth_image, color_image.shape[1::-1], interpolation=cv2.INTER_NEAREST)
+
             grey_color = 153
             depth_image_3d = np.dstack((depth_image, depth_image, depth_image))
 
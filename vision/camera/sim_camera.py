@@ -16,6 +16,10 @@ try:
     from vision.camera.template import Camera
 except ImportError:
     from template import Camera
+try:
+    from vision.camera.frame import Frame
+except ImportError:
+    from frame import Frame
 
 
 class SimCamera(Camera):
@@ -33,10 +37,13 @@ class SimCamera(Camera):
 
         Returns
         -------
-        depth image[1 channel]: numpy array
-        color image[3 channel]: numpy array
-            in RGB format
+        Frame
+            depth image[1 channel]: numpy array
+            color image[3 channel]: numpy array
+                in RGB format
+            w/ capture timestamp & frame number
         """
+        sequence = 0
         while True:
             depth_responses = self.client.simGetImages([airsim.ImageRequest("0", airsim.ImageType.DepthVis, False, False)])
             depth_response = depth_responses[0]
@@ -50,7 +57,9 @@ class SimCamera(Camera):
             depth_np = depth_np_1d.reshape(depth_response.height, depth_response.width, 3)
             color_np = color_np_1d.reshape(scene_response.height, scene_response.width, 3)
 
-            yield depth_np, color_np
+            yield Frame(depth_np, color_np, timestamp=scene_response.time_stamp / 1e9, sequence=sequence)
+
+            sequence += 1
 
     def display_in_window(self):
         """
@@ -0,0 +1,398 @@
+"""
+SyntheticCamera is a child class of camera, rendering procedurally generated scenes so the
+vision pipeline can be load tested and profiled without a realsense or the simulator.
+"""
+import os
+import sys
+import time
+
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import cv2
+import numpy as np
+try:
+    from vision.camera.template import Camera
+except ImportError:
+    from template import Camera
+try:
+    from vision.camera.frame import Frame, Intrinsics
+except ImportError:
+    from frame import Frame, Intrinsics
+from vision.bounding_box import BoundingBox, ObjectType
+
+
+BACKGROUND_DEPTH = 8000  # mm, depth of the far wall
+HORIZONTAL_FOV = 86  # degrees, same as the realsense
+N_NOISE_FRAMES = 4  # Noise patterns are pregenerated and cycled so noise is cheap to render
+
+MIN_VISIBLE = .5  # Fraction of an object left unoccluded for it to have a ground truth box
+
+TEXT = 'модули иртибот'
+
+# Hershey fonts are ascii only, so the text is drawn from these bitmaps instead.
+# Each glyph is 5 pixels wide, rows 2-6 are the x-height, 0-1 ascenders & 7-8 descenders
+GLYPHS = {
+    'б': ('..###', '.#...', '#....', '####.', '#...#', '#...#', '.###.', '.....', '.....'),
+    'д': ('.....', '.....', '..##.', '.#.#.', '.#.#.', '.#.#.', '#####', '#...#', '.....'),
+    'и': ('.....', '.....', '#...#', '#..##', '#.#.#', '##..#', '#...#', '.....', '.....'),
+    'л': ('.....', '.....', '..###', '.#..#', '.#..#', '.#..#', '#...#', '.....', '.....'),
+    'м': ('.....', '.....', '#...#', '##.##', '#.#.#', '#...#', '#...#', '.....', '.....'),
+    'о': ('.....', '.....', '.###.', '#...#', '#...#', '#...#', '.###.', '.....', '.....'),
+    'р': ('.....', '.....', '####.', '#...#', '#...#', '#...#', '####.', '#....', '#....'),
+    'т': ('.....', '.....', '#####', '..#..', '..#..', '..#..', '..#..', '.....', '.....'),
+    'у': ('.....', '.....', '#...#', '#...#', '.#.#.', '.#.#.', '..#..', '.#...', '#....'),
+    ' ': ('.....',) * 9,
+}
+
+
+def render_text(text, pixel_size):
+    """
+    Render text from GLYPHS as a white on black bitmap.
+
+    Parameters
+    ----------
+    text: str
+        Characters of GLYPHS.
+    pixel_size: int
+        Side of each glyph pixel.
+
+    Returns
+    -------
+    ndarray[uint8] 255 where the text is, w/ a pixel_size margin around it.
+    """
+    columns = [np.zeros((9, 1), dtype='uint8')]
+    for character in text:
+        glyph = np.array([[pixel == '#' for pixel in row] for row in GLYPHS[character]], dtype='uint8')
+        columns += [glyph * 255, np.zeros((9, 1), dtype='uint8')]
+
+    bitmap = np.pad(np.hstack(columns), ((1, 1), (0, 0)))
+
+    return np.kron(bitmap, np.ones((pixel_size, pixel_size), dtype='uint8'))
+
+
+class _SceneObject:
+    """
+    A moving object in the synthetic scene.
+
+    Parameters
+    ----------
+    object_type: ObjectType
+        What the object represents, also the label of its ground truth box.
+    x, y: float
+        Center of the object in pixels.
+    width, height: int
+        Size of the object in pixels.
+    depth: int
+        Distance of the object from the camera in mm.
+    dx, dy: float
+        Velocity of the object in pixels per frame.
+    """
+    def __init__(self, object_type, x, y, width, height, depth, dx=0., dy=0.):
+        self.object_type = object_type
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+        self.depth = depth
+        self.dx, self.dy = dx, dy
+
+    @property
+    def corners(self):
+        """
+        Integer top left and bottom right corners of the object.
+        """
+        x1, y1 = int(self.x - self.width / 2), int(self.y - self.height / 2)
+
+        return (x1, y1), (x1 + self.width, y1 + self.height)
+
+    def step(self, screen_width, screen_height):
+        """
+        Move the object one frame, bouncing off the edges of the screen.
+        """
+        self.x += self.dx
+        self.y += self.dy
+
+        if not self.width / 2 <= self.x <= screen_width - self.width / 2:
+            self.dx = -self.dx
+            self.x = np.clip(self.x, self.width / 2, screen_width - self.width / 2)
+
+        if not self.height / 2 <= self.y <= screen_height - self.height / 2:
+            self.dy = -self.dy
+            self.y = np.clip(self.y, self.height / 2, screen_height - self.height / 2)
+
+
+class SyntheticCamera(Camera):
+    """
+    Creates a camera object generating color/depth frames procedurally.
+
+    Parameters
+    ----------
+    screen_width: number, default=1280
+        Resolution width of the generated frames.
+    screen_height: number, default=720
+        Resolution height of the generated frames.
+    frame_rate: number, default=30
+        Framerate of the generated stream, only enforced when realtime is set.
+    scene: list[str], default=None
+        Objects to render, any of 'pylon', 'module', 'text' and 'obstacle'.
+        Defaults to all of them.
+    n_obstacles: int, default=3
+        Number of obstacles rendered when obstacles are in the scene.
+    noise: number, default=0
+        Standard deviation of the gaussian noise added to each frame.
+    motion: number, default=2
+        Maximum speed of objects, in pixels per frame.
+    realtime: bool, default=False
+        Sleep between frames to match frame_rate, otherwise frames are generated
+        as fast as possible.
+    n_frames: int, default=None
+        Number of frames to generate before stopping, None loops forever.
+    seed: int, default=None
+        Random seed, scenes are reproducible when set.
+
+    Settings
+    --------
+    bounding_boxes: list[BoundingBox]
+        Ground truth boxes for the most recently generated frame. Objects are drawn back to front,
+        boxes fit the part of each object left visible & objects less than MIN_VISIBLE visible have none.
+    """
+    SCENE_OBJECTS = ['pylon', 'module', 'text', 'obstacle']
+
+    def __init__(self, screen_width=1280, screen_height=720, frame_rate=30, scene=None, n_obstacles=3,
+                 noise=0, motion=2, realtime=False, n_frames=None, seed=None, **kwargs):
+        super().__init__(screen_width, screen_height, frame_rate)
+
+        self.scene = self.SCENE_OBJECTS if scene is None else scene
+        for name in self.scene:
+            if name not in self.SCENE_OBJECTS:
+                raise ValueError(f"Unrecognized scene object '{name}', expected one of {self.SCENE_OBJECTS}")
+
+        self.n_obstacles = n_obstacles
+        self.noise = noise
+        self.motion = motion
+        self.realtime = realtime
+        self.n_frames = n_frames
+
+        self.random = np.random.RandomState(seed)
+
+        self.bounding_boxes = []
+
+        self._background_color, self._background_depth = self._render_background()
+        self._noise = [self.random.normal(0, noise, (self.height, self.width, 3)).astype('int16')
+                       for _ in range(N_NOISE_FRAMES)] if noise else []
+
+    def _render_background(self):
+        """
+        Render the static backdrop, a vertical gradient with a ground plane.
+
+        Returns
+        -------
+        color image[3 channel]: numpy array
+        depth image[1 channel]: numpy array
+        """
+        rows = np.linspace(0, 1, self.height).reshape(-1, 1, 1)
+
+        color_image = (60 + 80 * rows * np.ones((1, self.width, 3))).astype('uint8')
+        depth_image = np.full((self.height, self.width), BACKGROUND_DEPTH, dtype='uint16')
+
+        # Ground gets closer towards the bottom of the frame
+        horizon = self.height // 2
+        depth_image[horizon:] = np.linspace(BACKGROUND_DEPTH, 500, self.height - horizon).reshape(-1, 1)
+
+        return color_image, depth_image
+
+    def _velocity(self):
+        """
+        Random velocity for a new object.
+        """
+        return self.random.uniform(-self.motion, self.motion, size=2)
+
+    def _create_objects(self):
+        """
+        Place every object of the scene at a random location.
+
+        Returns
+        -------
+        list[_SceneObject]
+        """
+        objects = []
+
+        def place(object_type, width, height, depth):
+            x = self.random.uniform(width / 2, max(width / 2, self.width - width / 2))
+            y = self.random.uniform(height / 2, max(height / 2, self.height - height / 2))
+            objects.append(_SceneObject(object_type, x, y, width, height, depth, *self._velocity()))
+
+        unit = max(min(self.width, self.height) // 10, 4)
+
+        if 'pylon' in self.scene:
+            place(ObjectType.PYLON, unit, self.height, 3000)
+        if 'obstacle' in self.scene:
+            for _ in range(self.n_obstacles):
+                radius = self.random.randint(unit // 2, unit * 3 // 2 + 1)
+                place(ObjectType.AVOID, 2 * radius, 2 * radius, self.random.randint(1500, 6000))
+        if 'text' in self.scene:
+            self._text = render_text(TEXT, max(unit // 12, 1))[:, :self.width]
+            place(ObjectType.TEXT, self._text.shape[1], self._text.shape[0], 2500)
+        if 'module' in self.scene:
+            place(ObjectType.MODULE, unit * 2, unit * 3, 1000)
+
+        return objects
+
+    def _render(self, objects):
+        """
+        Draw the scene objects over the background.
+
+        Parameters
+        ----------
+        objects: list[_SceneObject]
+            Objects to draw, back to front.
+
+        Returns
+        -------
+        color image[3 channel]: numpy array
+        depth image[1 channel]: numpy array
+        bounding boxes: list[BoundingBox]
+            Ground truth of the objects visible enough, in the order of objects.
+        """
+        color_image = np.copy(self._background_color)
+        depth_image = np.copy(self._background_depth)
+        labels = np.full((self.height, self.width), -1, dtype='int16')  # Index of the object seen at each pixel
+
+        footprints = {}  # Pixels each object covered when drawn, before anything in front of it
+        for i, obj in sorted(enumerate(objects), key=lambda item: -item[1].depth):
+            top_left, bottom_right = obj.corners
+
+            if obj.object_type is ObjectType.PYLON:
+                cv2.rectangle(color_image, top_left, bottom_right, (0, 0, 200), -1)
+                cv2.rectangle(depth_image, top_left, bottom_right, obj.depth, -1)
+
+            elif obj.object_type is ObjectType.AVOID:
+                center, radius = (int(obj.x), int(obj.y)), obj.width // 2
+                cv2.circle(color_image, center, radius, (230, 230, 230), -1)
+                cv2.circle(depth_image, center, radius, obj.depth, -1)
+
+            elif obj.object_type is ObjectType.TEXT:
+                cv2.rectangle(color_image, top_left, bottom_right, (0, 0, 0), -1)
+                cv2.rectangle(depth_image, top_left, bottom_right, obj.depth, -1)
+
+                ## Text clipped to the image, the object may be placed partly outside it
+                x1, y1 = max(top_left[0], 0), max(top_left[1], 0)
+                x2 = min(top_left[0] + self._text.shape[1], self.width)
+                y2 = min(top_left[1] + self._text.shape[0], self.height)
+                if x1 < x2 and y1 < y2:
+                    text = self._text[y1 - top_left[1]:y2 - top_left[1], x1 - top_left[0]:x2 - top_left[0]]
+                    color_image[y1:y2, x1:x2][text > 0] = 255
+
+            elif obj.object_type is ObjectType.MODULE:
+                cv2.rectangle(color_image, top_left, bottom_right, (200, 200, 200), -1)
+                cv2.rectangle(depth_image, top_left, bottom_right, obj.depth, -1)
+
+                # Four holes on the front face, in a square around the center
+                radius = max(obj.width // 8, 2)
+                for hx in (-1, 1):
+                    for hy in (-1, 1):
+                        hole = (int(obj.x + hx * obj.width / 4), int(obj.y + hy * obj.width / 4))
+                        cv2.circle(color_image, hole, radius, (20, 20, 20), -1)
+                        cv2.circle(depth_image, hole, radius, obj.depth + 150, -1)
+
+            if obj.object_type is ObjectType.AVOID:
+                cv2.circle(labels, (int(obj.x), int(obj.y)), obj.width // 2, i, -1)
+            else:
+                cv2.rectangle(labels, top_left, bottom_right, i, -1)
+            footprints[i] = np.count_nonzero(labels[self._window(obj)] == i)
+
+        bounding_boxes = []
+        for i, obj in enumerate(objects):
+            window = self._window(obj)
+            visible = labels[window] == i
+            if not footprints[i] or np.count_nonzero(visible) < MIN_VISIBLE * footprints[i]:
+                continue
+
+            x, y, width, height = cv2.boundingRect(visible.astype('uint8'))
+            x1, y1 = x + window[1].start, y + window[0].start
+            x2, y2 = x1 + width, y1 + height
+            bounding_boxes.append(BoundingBox([(x1, y1), (x2, y1), (x2, y2), (x1, y2)], obj.object_type))
+
+        if self._noise:
+            noise = self._noise[self.random.randint(len(self._noise))]
+            color_image = np.clip(color_image + noise, 0, 255).astype('uint8')
+
+        return color_image, depth_image, bounding_boxes
+
+    def _window(self, obj):
+        """
+        Slices of the image an object can cover.
+        """
+        (x1, y1), (x2, y2) = obj.corners
+
+        return slice(max(y1, 0), min(y2 + 1, self.height)), slice(max(x1, 0), min(x2 + 1, self.width))
+
+    def __iter__(self):
+        """
+        Iterate through generated frames, objects move between frames.
+
+        Returns
+        -------
+        Frame
+            depth image[1 channel]: numpy array
+                uint16 distances in mm
+            color image[3 channel]: numpy array
+                in BGR format, like the realsense
+            w/ ground truth bounding_boxes
+        """
+        objects = self._create_objects()
+
+        focal_length = self.width / 2 / np.tan(np.radians(HORIZONTAL_FOV / 2))
+        intrinsics = Intrinsics(self.width, self.height, focal_length, focal_length, self.width / 2, self.height / 2)
+
+        frame_time = 1 / self.framerate if self.framerate > 0 else 0
+        deadline = time.perf_counter()
+
+        i = 0
+        while self.n_frames is None or i < self.n_frames:
+            if self.realtime and frame_time:
+                deadline += frame_time
+                time.sleep(max(0, deadline - time.perf_counter()))
+
+            timestamp = time.time()
+
+            color_image, depth_image, self.bounding_boxes = self._render(objects)
+
+            yield Frame(depth_image, color_image, timestamp=timestamp, sequence=i, intrinsics=intrinsics,
+                        depth_scale=.001, bounding_boxes=self.bounding_boxes)
+
+            for obj in objects:
+                obj.step(self.width, self.height)
+
+            i += 1
+
+    def display_in_window(self):
+        """
+        Displays the depth/color image streams with ground truth boxes, separately, in one window
+        """
+        for depth_image, color_image in self:
+            color_image = np.copy(color_image)
+
+            for box in self.bounding_boxes:
+                cv2.rectangle(color_image, box.vertices[0], box.vertices[2], (0, 255, 0), 2)
+
+            depth_colormap = cv2.applyColorMap(
+                cv2.convertScaleAbs(depth_image, alpha=0.03),
+                cv2.COLORMAP_JET)
+
+            images = np.hstack((color_image, depth_colormap))
+
+            cv2.namedWindow('Depth/Color Stream', cv2.WINDOW_AUTOSIZE)
+            cv2.imshow('Depth/Color Stream', images)
+
+            key = cv2.waitKey(1)
+
+            # Press esc or 'q' to close the image window
+            if key == ord('q') or key == 27 or cv2.getWindowProperty('Depth/Color Stream', 0) == -1:
+                cv2.destroyAllWindows()
+                break
+
+
+if __name__ == '__main__':
+    SyntheticCamera(1280, 720, 30, noise=10, realtime=True).display_in_window()
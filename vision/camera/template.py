@@ -30,10 +30,12 @@ class Camera:
 
         Returns
         -------------
-        depth frame: numpy array
-            as implemented in child classes
-        color frame: numpy array
-            as implemented in child classes
+        Frame
+            depth frame: numpy array
+                as implemented in child classes
+            color frame: numpy array
+                as implemented in child classes
+            w/ capture metadata, unpacks as (depth, color)
         """
         raise NotImplementedError(f"__iter__ is not implemented for {type(self)}")
 
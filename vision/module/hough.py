@@ -0,0 +1,93 @@
+"""
+This file contains the circle detection shared by ModuleInFrame and ModuleLocation,
+configured by hough_config.json.
+"""
+import os
+import json
+import functools
+
+import cv2
+import numpy as np
+
+CONFIG_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hough_config.json")
+
+PARAM_NAMES = ["blur_size", "minDist", "param1", "param2", "minRadius", "maxRadius"]
+
+
+@functools.lru_cache(maxsize=None)
+def _read_config(filename):
+    """
+    Reads a config file once.
+    """
+    with open(filename, "r") as config_file:
+        return json.load(config_file)
+
+
+def load_hough_params(stage, filename=CONFIG_FILENAME):
+    """
+    Loads the circle detection parameters of a stage.
+
+    Parameters
+    ----------
+    stage: str
+        Which code path the parameters are for, 'location' or 'in_frame'.
+    filename: str, default=CONFIG_FILENAME
+        Config file, as written by benchmarks/tune_hough.py.
+
+    Returns
+    -------
+    dict - blur_size and HoughCircles parameters.
+    """
+    config = _read_config(filename)
+
+    if stage not in config:
+        raise ValueError(f"Hough config {filename} has no '{stage}' parameters")
+
+    params = config[stage]
+    for name in PARAM_NAMES:
+        if name not in params:
+            raise ValueError(f"Hough config '{stage}' is missing '{name}'")
+
+    return dict(params)
+
+
+def detect_circles(color_image, params):
+    """
+    Detects circles in the color image.
+
+    Parameters
+    ----------
+    color_image: ndarray
+        The color image, 3 or 4 channels.
+    params: dict
+        blur_size and HoughCircles parameters from load_hough_params.
+
+    Returns
+    -------
+    ndarray - (x, y, r) of each circle as uint16, or None if no circles are found.
+    """
+    # Grayscale
+    gray = cv2.cvtColor(src=color_image[:, :, :3], code=cv2.COLOR_RGB2GRAY)
+
+    # Guassian Blur
+    blur = cv2.GaussianBlur(src=gray, ksize=(params["blur_size"], params["blur_size"]), sigmaX=0)
+
+    # Laplacian Transform
+    laplacian = cv2.Laplacian(src=blur, ddepth=cv2.CV_8U, ksize=3)
+
+    # Hough Circle Detection
+    circles = cv2.HoughCircles(
+        image=laplacian,
+        method=cv2.HOUGH_GRADIENT,
+        dp=1,
+        minDist=params["minDist"],
+        param1=params["param1"],
+        param2=params["param2"],
+        minRadius=params["minRadius"],
+        maxRadius=params["maxRadius"],
+    )
+    if circles is None:
+        return None
+
+    # Resize circles into 2d array
+    return np.uint16(circles).reshape((-1, 3))
@@ -1,20 +1,112 @@
 """
 This file contains the ModuleInFrame function to detect if the module is in an image or not.
 
+Before circle detection, a cascade of cheap checks on a downscaled frame rejects frames
+that cannot contain the module. The pass rate of each stage is kept in CASCADE_STATS.
+
 The commented-out lines are used to visualize the algorithm and are unnecessary for processing.
 """
 import cv2
 import numpy as np
 import argparse
 
+try:
+    from vision.module.hough import load_hough_params, detect_circles
+except ImportError:
+    from hough import load_hough_params, detect_circles
+
 # Constants
-BLUR_SIZE = 5  # Blur kernel size
 BUCKET_MODIFIER = 1  # Changes how many buckets are in the range
 MIN_SLOPES_IN_BUCKET = 15  # Minimum number of slopes in a single bucket to identify the module
 MAX_CIRCLES = 100  # Maximum number of cirlces that can be detected in an image before ModuleInFrame fails
 
+# Rejection cascade
+CASCADE_WIDTH = 320  # Width frames are downscaled to for the cascade
+MIN_EDGE_DENSITY = 0.002  # Minimum fraction of edge pixels, the holes & face outline are edges
+MIN_DEPTH = 100  # Closest the module can be, mm
+MAX_DEPTH = 5000  # Farthest the module is detectable, mm
+MIN_DEPTH_FRACTION = 0.01  # Minimum fraction of pixels in depth range
+MAX_HISTOGRAM_PEAK = 0.995  # Maximum fraction of pixels in one brightness bucket, the holes contrast w/ the face
+HISTOGRAM_BUCKETS = 32
+
+CASCADE_STAGES = ["edges", "depth", "histogram", "hough"]
+CASCADE_STATS = {stage: {"evaluated": 0, "passed": 0} for stage in CASCADE_STAGES}
+
+
+def cascade_pass_rates() -> dict:
+    """
+    Fraction of evaluated frames that passed each stage of the cascade.
+
+    Returns
+    -------
+    dict: {stage: pass rate}, None for stages never evaluated
+    """
+    return {
+        stage: stats["passed"] / stats["evaluated"] if stats["evaluated"] else None
+        for stage, stats in CASCADE_STATS.items()
+    }
+
 
-def ModuleInFrame(color_image: np.ndarray) -> bool:
+def reset_cascade_stats():
+    """
+    Resets the cascade pass counts.
+    """
+    for stats in CASCADE_STATS.values():
+        stats["evaluated"] = stats["passed"] = 0
+
+
+def _record(stage: str, passed: bool) -> bool:
+    """
+    Counts a frame evaluated by a stage.
+    """
+    CASCADE_STATS[stage]["evaluated"] += 1
+    CASCADE_STATS[stage]["passed"] += int(passed)
+
+    return passed
+
+
+def _cascade(color_image: np.ndarray, depth_image: np.ndarray) -> bool:
+    """
+    Cheap checks for whether the module could be in frame.
+
+    Parameters
+    ----------
+    color_image: ndarray
+        The color image.
+    depth_image: ndarray
+        The depth image in mm, or None to skip the depth check.
+
+    Returns
+    -------
+    bool: false if the module can't be in frame
+    """
+    # Downscale
+    scale = min(CASCADE_WIDTH / color_image.shape[1], 1)
+    small = cv2.resize(color_image[:, :, :3], None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+    gray = cv2.cvtColor(src=small, code=cv2.COLOR_RGB2GRAY)
+
+    # Edge density
+    edges = cv2.Canny(gray, 50, 150)
+    if not _record("edges", np.count_nonzero(edges) >= MIN_EDGE_DENSITY * edges.size):
+        return False
+
+    # Depth range, only on single channel depth
+    if depth_image is not None and depth_image.ndim == 2:
+        small_depth = depth_image[:: max(int(1 / scale), 1), :: max(int(1 / scale), 1)]
+        in_range = np.count_nonzero((small_depth >= MIN_DEPTH) & (small_depth <= MAX_DEPTH))
+
+        if not _record("depth", in_range >= MIN_DEPTH_FRACTION * small_depth.size):
+            return False
+
+    # Brightness histogram
+    histogram = cv2.calcHist([gray], [0], None, [HISTOGRAM_BUCKETS], [0, 256])
+    if not _record("histogram", histogram.max() <= MAX_HISTOGRAM_PEAK * gray.size):
+        return False
+
+    return True
+
+
+def ModuleInFrame(color_image: np.ndarray, depth_image: np.ndarray = None, *, hough_params: dict = None) -> bool:
     """
     Determines if the Module is in frame
 
@@ -22,6 +114,10 @@ def ModuleInFrame(color_image: np.ndarray) -> bool:
     ----------
     color_image: ndarray
         The color image.
+    depth_image: ndarray, default=None
+        The depth image in mm, used to reject frames w/ nothing in range of the module.
+    hough_params: dict, default=None
+        Circle detection parameters, defaults to the 'in_frame' section of hough_config.json.
 
     Returns
     -------
@@ -30,36 +126,25 @@ def ModuleInFrame(color_image: np.ndarray) -> bool:
     if color_image is None:
         raise ValueError(f"Image cannot be None.")
 
+    if hough_params is None:
+        hough_params = load_hough_params("in_frame")
+
     # Ignore numpy warnings
     np.seterr(all="ignore")
 
-    # Remove depth channel
-    color_image = color_image[:, :, :3]
-
     # Create output image
     # output = img.copy()
 
-    # Grayscale
-    gray = cv2.cvtColor(src=color_image, code=cv2.COLOR_RGB2GRAY)
-
-    # Guassian Blur
-    blur = cv2.GaussianBlur(src=gray, ksize=(BLUR_SIZE, BLUR_SIZE), sigmaX=0)
-
-    # Laplacian Transform
-    laplacian = cv2.Laplacian(src=blur, ddepth=cv2.CV_8U, ksize=3)
-    laplacian = np.uint8(laplacian)
-
-    # Hough Circle Detection
-    circles = cv2.HoughCircles(image=laplacian, method=cv2.HOUGH_GRADIENT, dp=1, minDist=8, param1=75, param2=24, minRadius=0, maxRadius=50)
-    if circles is None:  # no circles found
+    # Reject frames w/ cheap checks first
+    if not _cascade(color_image, depth_image):
         return False
-    elif circles.shape[1] > MAX_CIRCLES:  # too many circles found
-        raise ValueError("Too many circles found (" + str(circles.shape[1]) + ")")
 
-    circles = np.uint16(circles)
-
-    # Resize circles into 2d array
-    circles = np.reshape(circles, (np.shape(circles)[1], 3))
+    # Hough Circle Detection, w/o depth channel
+    circles = detect_circles(color_image, hough_params)
+    if not _record("hough", circles is not None):  # no circles found
+        return False
+    elif circles.shape[0] > MAX_CIRCLES:  # too many circles found
+        raise ValueError("Too many circles found (" + str(circles.shape[0]) + ")")
 
     # Finding slopes between the circles
     slopes = np.array([])
@@ -5,17 +5,34 @@ This file contains the ModuleLocation class to find the location of the center o
 import cv2
 import numpy as np
 
+try:
+    from vision.module.hough import load_hough_params, detect_circles
+except ImportError:
+    from hough import load_hough_params, detect_circles
+
 
 class ModuleLocation:
     """
     Finds the coordinates of the center of the front face of the module.
+
+    Parameters
+    ----------
+    hough_params: dict, default=None
+        Circle detection parameters, defaults to the 'location' section of hough_config.json.
+    max_holes: int, default=4
+        Maximum number of holes used to find the center, those on the most parallels are kept.
     """
 
     ## Initialization
 
-    def __init__(self):
+    def __init__(self, hough_params=None, max_holes=4):
         np.seterr(all="ignore")  # Ignore numpy warnings
 
+        self.hough_params = (
+            load_hough_params("location") if hough_params is None else hough_params
+        )
+        self.max_holes = max_holes
+
         self.img = np.array(0)  # Color image input
         self.depth = np.array(0)  # Depth image input
 
@@ -27,6 +44,7 @@ class ModuleLocation:
         )  # Set of (x, y, r) coordinates, location of the holes
 
         self.slopes = np.array(0)  # Slopes between detected circles
+        self.pairs = np.zeros((0, 2), dtype=np.intp)  # Indices of the circles of each slope
         self.slope_heights = np.array(0)  # Histogram of slopes
         self.slope_bounds = np.array(0)  # Bounds of slope histogram
 
@@ -67,31 +85,19 @@ class ModuleLocation:
         # self._filterCircleDepth()
 
         # Only perform more calculations if there are few circles
-        if (
-            np.shape(self.circles)[0] <= MAX_CIRCLES
-            and np.shape(self.circles)[0] > MIN_CIRCLES
-        ):
+        if MIN_CIRCLES <= np.shape(self.circles)[0] <= MAX_CIRCLES:
             # Get Slopes and Parallels
             self._getSlopes()
-            self._groupSlopes()
-
-            # Find the Holes
-            self._getHoleLocations()
 
-            # Coordinates of the center of the front face of the module
-            self.center = np.arange(0, 2)
+            if self.slopes.size:
+                self._groupSlopes()
 
-            # Average hole coordinates to find center coordinates
-            x_total = 0
-            y_total = 0
-            num_holes = 0
-            for x, y, _ in self.holes:
-                x_total += x
-                y_total += y
-                num_holes += 1
+                # Find the Holes
+                self._getHoleLocations()
 
-            self.center[0] = x_total // num_holes
-            self.center[1] = y_total // num_holes
+                # Average hole coordinates to find center coordinates
+                if self.holes.size:
+                    self.center = np.mean(self.holes[:, :2], axis=0).astype(int)
 
         # Returns either the center in the current image
         # or the previous center if no slope calculations were performed
@@ -107,25 +113,21 @@ class ModuleLocation:
         """
         DEPTH_THRESH = 1000
 
-        nCir = np.array([0, 0, 0])  # new array of circles within DEPTH_THRESH
-        count = 0
+        x, y = self.circles[:, 0], self.circles[:, 1]
 
-        for x, y, r in self.circles:
-            if (
-                x < np.shape(self.img)[0] and y < np.shape(self.img)[1]
-            ):  # eliminate circles outside of the image
-                if (
-                    self.depth[x, y] < DEPTH_THRESH and self.depth[x, y] != 0
-                ):  # remove far-away circles
-                    if count == 0:
-                        nCir = np.array([x, y, r])
-                    else:
-                        nCir = np.append(nCir, [x, y, r])
-                    count += 1
-
-        if np.shape(nCir)[0] != 0:
-            nCir = nCir.reshape((-1, 3))
-            self.circles = nCir
+        # eliminate circles outside of the image
+        inside = (x < np.shape(self.depth)[1]) & (y < np.shape(self.depth)[0])
+
+        # remove far-away circles
+        depth = np.zeros(len(self.circles))
+        depth[inside] = self.depth[y[inside], x[inside]]
+
+        near = inside & (depth < DEPTH_THRESH) & (depth != 0)
+
+        if np.any(near):
+            self.circles = self.circles[near]
+
+        return self.circles
 
     def _getHoleLocations(self):
         """
@@ -133,40 +135,31 @@ class ModuleLocation:
 
         Returns
         -------
-        ndarray - locations of the 4 holes
+        ndarray - locations of the holes, at most max_holes.
         """
-        NUM_CIRCLES = np.shape(self.circles)[0]  # The number of circles
-
         sep = (self.upper_bound - self.lower_bound) / (
             self.num_buckets
         )  # seperation from main parallel, width of a bucket
 
         # Find Slope with Most Parallels
         bucket_ind = np.argmax(self.slope_heights)  # highest segment of histogram
-        parallel = self.slope_bounds[bucket_ind] - (
+        parallel = self.slope_bounds[bucket_ind] + (
             sep / 2
-        )  # slope at highest segment minus half bucket width is main parallel
-
-        # Find Holes Associated with parallels
-        idx = 0
-        hole_idx = 0
-        for slope in self.slopes:
-            if np.abs(slope - parallel) <= sep:
-                # x and y are the indexes of 2 circles corresponding to a slope
-                x = idx // (NUM_CIRCLES - 1)
-                y = idx % (NUM_CIRCLES - 1)
-                y += int(y >= x)
-
-                if hole_idx == 0:
-                    self.holes = np.array(self.circles[x])
-                else:
-                    self.holes = np.append(self.holes, self.circles[x])
-
-                self.holes = np.append(self.holes, self.circles[y])
-                hole_idx += 1
-            idx += 1
-
-        self.holes = self.holes.reshape((-1, 3))
+        )  # center of the highest segment is main parallel
+
+        # Circles at either end of a parallel are holes, each counted once
+        parallel_pairs = self.pairs[np.abs(self.slopes - parallel) <= sep]
+
+        votes = np.bincount(parallel_pairs.ravel(), minlength=len(self.circles))
+        hole_idx = np.flatnonzero(votes)
+
+        # Keep the holes on the most parallels
+        if len(hole_idx) > self.max_holes:
+            hole_idx = np.sort(
+                hole_idx[np.argsort(-votes[hole_idx], kind="stable")[: self.max_holes]]
+            )
+
+        self.holes = self.circles[hole_idx].reshape((-1, 3))
         return self.holes
 
     def _groupSlopes(self):
@@ -182,8 +175,8 @@ class ModuleLocation:
         # Get parameters for bucket sorting
         self.upper_bound = np.amax(self.slopes)
         self.lower_bound = np.amin(self.slopes)
-        self.num_buckets = np.int32(
-            (self.upper_bound - self.lower_bound) * BUCKET_MODIFIER
+        self.num_buckets = max(
+            np.int32((self.upper_bound - self.lower_bound) * BUCKET_MODIFIER), 1
         )
 
         # Bucket sort
@@ -199,16 +192,20 @@ class ModuleLocation:
         -------
         None
         """
-        self.slopes = np.array([])
-        for x, y, _ in self.circles:
-            for iX, iY, _ in self.circles:
-                m = (iY - y) / (iX - x)
-                # slope must be non-infinite and can't be between the same circle
-                if (not np.isnan(m)) and (not np.isinf(m)) and (x != iX and y != iY):
-                    self.slopes = np.append(self.slopes, m)
+        x = self.circles[:, 0].astype(float)
+        y = self.circles[:, 1].astype(float)
+
+        # Differences between every pair of circles, [i, j] is from circle i to j
+        dx = x[np.newaxis, :] - x[:, np.newaxis]
+        dy = y[np.newaxis, :] - y[:, np.newaxis]
+
+        # slope must be non-infinite and can't be between the same circle
+        valid = (dx != 0) & (dy != 0)
+
+        self.pairs = np.argwhere(valid)
 
         # Convert slopes to degrees
-        self.slopes = np.degrees(np.arctan(self.slopes))
+        self.slopes = np.degrees(np.arctan(dy[valid] / dx[valid]))
 
     def _circleDetection(self):
         """
@@ -218,34 +215,10 @@ class ModuleLocation:
         -------
         ndarray - circles detected in image.
         """
-        # Size of the blur kernel
-        BLUR_SIZE = 9
-
-        # Grayscale
-        gray = cv2.cvtColor(src=self.img, code=cv2.COLOR_RGB2GRAY)
-
-        # Guassian Blur
-        blur = cv2.GaussianBlur(src=gray, ksize=(BLUR_SIZE, BLUR_SIZE), sigmaX=0)
-
-        # Laplacian Transform
-        laplacian = cv2.Laplacian(src=blur, ddepth=cv2.CV_8U, ksize=3)
-        laplacian = np.uint8(laplacian)
-
-        # Hough Circle Detection
-        self.circles = cv2.HoughCircles(
-            image=laplacian,
-            method=cv2.HOUGH_GRADIENT,
-            dp=1,
-            minDist=14,
-            param1=63,
-            param2=30,
-            minRadius=0,
-            maxRadius=50,
-        )
-        self.circles = np.uint16(self.circles)
+        self.circles = detect_circles(self.img, self.hough_params)
 
-        # Resize circles into 2d array
-        self.circles = np.reshape(self.circles, (np.shape(self.circles)[1], 3))
+        if self.circles is None:  # no circles found
+            self.circles = np.zeros((0, 3), dtype=np.uint16)
 
         return self.circles
 
@@ -48,6 +48,25 @@ class ObstacleFinder:
         self._params = value
         self.blob_detector = cv2.SimpleBlobDetector_create(self.params)
 
+    @staticmethod
+    def _box_depth(depth_image, x1, y1, x2, y2):
+        """
+        Median depth of a box, ignoring missing (0) depth values.
+
+        Returns
+        -------
+        float in mm or None w/o depth.
+        """
+        if not isinstance(depth_image, np.ndarray) or depth_image.ndim != 2:
+            return None
+
+        height, width = depth_image.shape
+        region = depth_image[max(int(y1), 0):min(int(np.ceil(y2)), height),
+                             max(int(x1), 0):min(int(np.ceil(x2)), width)]
+        region = region[region > 0]
+
+        return float(np.median(region)) if region.size else None
+
     def find(self, color_image, depth_image):
         """
         Detects obstacles in the image provided in the constructor
@@ -62,7 +81,8 @@ class ObstacleFinder:
         Returns
         -------
         list[BoundingBox]
-            a list of bounding boxes represented as Rectangles, each with 8 (x, y, z) coordinates
+            a list of bounding boxes represented as Rectangles, each with 8 (x, y, z) coordinates,
+            w/ depth as the median depth in mm of the box when a depth image is given
         """
 
         if not isinstance(color_image, np.ndarray):
@@ -94,6 +114,9 @@ class ObstacleFinder:
 
             # create Rectangle and add to list of bounding boxes
             bbox = BoundingBox(vertices, ObjectType.AVOID)
+            depth = self._box_depth(depth_image, neg_dx, neg_dy, pos_dx, pos_dy)
+            if depth is not None:
+                bbox.depth = depth
             bounding_boxes.append(bbox)
 
         return bounding_boxes
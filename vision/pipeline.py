@@ -12,15 +12,21 @@ sys.path += [parent_dir, gparent_dir, ggparent_dir]
 
 from vision.bounding_box import BoundingBox, ObjectType
 
+import cv2
 import datetime
 import json
+import time
 from multiprocessing import Queue
 from queue import Empty
 
+from vision.camera.frame import Frame, match_depth_resolution
+from vision.tracker import Tracker
+from vision.rate_controller import RateController
 from vision.obstacle.obstacle_finder import ObstacleFinder
 from vision.common.import_params import import_params
 
 from vision.module.location import ModuleLocation
+from vision.module.hough import load_hough_params
 from vision.module.get_module_depth import get_module_depth
 #from vision.module.region_of_interest import region_of_interest
 #from vision.module.module_orientation import get_module_orientation
@@ -39,6 +45,18 @@ class Pipeline:
         Interface to recieve flight state information from flight.
     camera: Camera
         Camera to pull image from.
+
+    Settings
+    --------
+    latency: float
+        Seconds from capture to publish of the latest frame.
+    dropped_frames: int
+        Number of frames skipped by the camera sequence numbers.
+    tracker: Tracker
+        Smooths detections across frames, published boxes carry a track_id.
+    rate_controller: RateController
+        Runs expensive detectors less often or on smaller images when frames take too long,
+        obstacle detection always runs on every frame. Frames w/o detection publish predicted tracks.
     """
     PUT_TIMEOUT = 1  # Expected time for results to be irrelevant.
 
@@ -62,41 +80,135 @@ class Pipeline:
 
         self.module_location = ModuleLocation()
 
+        self._module_locations = {1.: self.module_location}  # Per image scale
+
+        self.tracker = Tracker()
+        self.rate_controller = RateController(frame_rate=getattr(camera, 'framerate', 30))
+
+        self.latency = None
+        self.dropped_frames = 0
+        self.last_sequence = None
+
     @property
     def picture(self):
         return next(self.camera)
 
+    @property
+    def telemetry(self):
+        """
+        Pipeline health, latency & dropped frames w/ the current rate of each detector.
+        """
+        return {
+            'latency': self.latency,
+            'dropped_frames': self.dropped_frames,
+            'detectors': self.rate_controller.telemetry(),
+        }
+
+    def _find_module(self, color_image, depth_image, scale=1.):
+        """
+        Locate the module, optionally on downscaled images.
+
+        Parameters
+        ----------
+        color_image: ndarray
+            Color image.
+        depth_image: ndarray
+            Depth image.
+        scale: float, default=1
+            Scale to run circle detection at.
+
+        Returns
+        -------
+        BoundingBox
+        """
+        if scale not in self._module_locations:
+            params = load_hough_params("location")
+            for name in ["minDist", "minRadius", "maxRadius"]:
+                params[name] = params[name] * scale
+            params["blur_size"] = max(int(params["blur_size"] * scale) // 2 * 2 + 1, 1)  # Odd kernel
+
+            self._module_locations[scale] = ModuleLocation(hough_params=params)
+
+        module_location = self._module_locations[scale]
+
+        if scale == 1:
+            module_location.setImg(color_image, depth_image)
+        else:
+            module_location.setImg(
+                cv2.resize(color_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA),
+                cv2.resize(depth_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST))
+
+        center = tuple(int(value / scale) for value in module_location.getCenter())
+
+        depth = get_module_depth(depth_image, center)
+        #orientation = get_module_orientation(region_of_interest(depth_image, depth, center), center)
+        box = BoundingBox(getModuleBounds(color_image.shape, center, depth), ObjectType.MODULE)
+        box.module_depth = depth # float
+        #box.orientation = orientation # tuple
+
+        return box
+
     def run(self, prev_state):
         """
         Process current camera frame.
         """
         ##
-        depth_image, color_image = self.picture
+        frame = self.picture
+        if not isinstance(frame, Frame):
+            frame = Frame(*frame)  # Camera yielding bare (depth, color) pairs
+
+        depth_image, color_image = frame
+        if frame.decimation > 1:
+            depth_image = match_depth_resolution(depth_image, color_image)  # Detectors index depth w/ color pixels
+
+        if self.last_sequence is not None and frame.sequence > self.last_sequence + 1:
+            self.dropped_frames += frame.sequence - self.last_sequence - 1
+        self.last_sequence = frame.sequence
 
         try:
             state = self.flight_communication.get_nowait()
         except Empty:
             state = prev_state
 
-        ##
+        ## Run the detectors scheduled for this frame
+        frame_start = time.perf_counter()
+
         bboxes = []
+        searched = set()  # Object types looked for in this frame
 
         if state == 'early_laps':
             bboxes = self.obstacle_finder.find(color_image, depth_image)
+            searched = {ObjectType.AVOID}
+
+            self.rate_controller.record('obstacle', time.perf_counter() - frame_start)
         elif state == 'module_detection':
-            self.module_location.setImg(color_image, depth_image)
-            center = self.module_location.getCenter()
-            depth = get_module_depth(depth_image, center)
-            #orientation = get_module_orientation(region_of_interest(depth_image, depth, center), center)
-            box = BoundingBox(getModuleBounds(color_image, center, depth), ObjectType.MODULE)
-            box.module_depth = depth # float
-            #box.orientation = orientation # tuple
-            bboxes.append(box)
+            if self.rate_controller.should_run('module'):
+                scale = self.rate_controller.scale('module')
+
+                bboxes.append(self._find_module(color_image, depth_image, scale))
+                searched = {ObjectType.MODULE}
+
+                self.rate_controller.record('module', time.perf_counter() - frame_start, scale)
         else:
             pass # raise AttributeError(f"Unrecognized state: {state}")
 
-        ##
-        self.vision_communication.put((datetime.datetime.now(), bboxes), self.PUT_TIMEOUT)
+        detector_time = time.perf_counter() - frame_start
+
+        ## Smoothed & identified across frames, predicted when no detector ran
+        if searched:
+            bboxes = self.tracker.update(bboxes, frame.timestamp, searched)
+        else:
+            bboxes = self.tracker.predict(frame.timestamp)
+
+        self.rate_controller.end_frame(time.perf_counter() - frame_start, detector_time)
+
+        ## Flight needs the width to turn box positions into bearings
+        for bbox in bboxes:
+            bbox.image_width = color_image.shape[1]
+
+        ## Stamped w/ capture time, not publish time
+        self.latency = time.time() - frame.timestamp
+        self.vision_communication.put((datetime.datetime.fromtimestamp(frame.timestamp), bboxes), self.PUT_TIMEOUT)
 
         # from vision.common.blob_plotter import plot_blobs
         # plot_blobs(self.obstacle_finder.keypoints, color_image)
@@ -0,0 +1,169 @@
+"""
+Decides how often & at what resolution each detector runs, so processing keeps up with the camera.
+"""
+import math
+
+
+class RateController:
+    """
+    Adapts detector rates to the time left in each frame.
+
+    The cost of every detector is measured as it runs. Critical detectors, ie obstacle avoidance,
+    run every frame at full resolution, the rest share the remaining budget by running every
+    n-th frame & on downscaled images when decimation alone is not enough. A critical detector
+    that didn't run on this frame or the last one is no longer taking budget.
+
+    Parameters
+    ----------
+    frame_rate: float, default=30
+        Camera frame rate, the budget is one frame period.
+    utilization: float, default=.8
+        Fraction of the frame period detectors may use, the rest is headroom.
+    critical: collection[str], default=('obstacle',)
+        Detectors run on every frame at full resolution.
+    scales: list[float], default=[1, .75, .5]
+        Image scales expensive detectors may run at, largest first.
+    max_interval: int, default=10
+        Most frames between runs of a detector before its images are downscaled.
+    smoothing: float, default=.2
+        Weight of the newest measurement in the cost averages.
+
+    Settings
+    --------
+    frame_budget: float
+        Seconds available for detectors per frame.
+    """
+    def __init__(self, frame_rate=30, utilization=.8, critical=('obstacle',), scales=None, max_interval=10,
+                 smoothing=.2):
+        self.frame_budget = utilization / frame_rate
+        self.critical = set(critical)
+        self.scales = [1., .75, .5] if scales is None else sorted(scales, reverse=True)
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+
+        self.frame = 0
+        self.overhead = 0.  # Average seconds per frame spent outside of detectors
+
+        self._costs = {}  # Average seconds per run at full resolution, {detector: cost}
+        self._last_run = {}  # Frame each detector last ran on
+        self._runs = {}  # Number of runs of each detector
+        self._intervals = {}
+        self._scales = {}
+
+    def _average(self, previous, value):
+        """
+        Exponential moving average.
+        """
+        return value if previous is None else self.smoothing * value + (1 - self.smoothing) * previous
+
+    def _plan(self, name):
+        """
+        Interval & scale a detector fits the budget at.
+        """
+        if name in self.critical or name not in self._costs:
+            return 1, 1.
+
+        ## Only critical detectors still running take budget, not ones the state stopped
+        available = self.frame_budget - self.overhead - sum(
+            self._costs[critical] for critical in self.critical
+            if critical in self._costs and self._last_run[critical] >= self.frame - 1)
+        available = max(available, self.frame_budget * .05)
+
+        for scale in self.scales:
+            interval = max(math.ceil(self._costs[name] * scale ** 2 / available), 1)
+
+            if interval <= self.max_interval:
+                return interval, scale
+
+        return interval, self.scales[-1]
+
+    def should_run(self, name):
+        """
+        Whether a detector should run on the current frame.
+
+        Parameters
+        ----------
+        name: str
+            Detector name.
+
+        Returns
+        -------
+        bool
+        """
+        interval, self._scales[name] = self._plan(name)
+        self._intervals[name] = interval
+
+        return name not in self._last_run or self.frame - self._last_run[name] >= interval
+
+    def scale(self, name):
+        """
+        Image scale a detector should run at.
+
+        Parameters
+        ----------
+        name: str
+            Detector name.
+
+        Returns
+        -------
+        float in (0, 1].
+        """
+        if name not in self._scales:
+            self._scales[name] = self._plan(name)[1]
+
+        return self._scales[name]
+
+    def record(self, name, seconds, scale=1.):
+        """
+        Measure a detector run on the current frame.
+
+        Parameters
+        ----------
+        name: str
+            Detector name.
+        seconds: float
+            Time the detector took.
+        scale: float, default=1
+            Scale of the images it ran on, cost is assumed to grow w/ pixel count.
+        """
+        self._costs[name] = self._average(self._costs.get(name), seconds / scale ** 2)
+        self._last_run[name] = self.frame
+        self._runs[name] = self._runs.get(name, 0) + 1
+
+    def end_frame(self, seconds, detector_seconds=0.):
+        """
+        Finish the current frame.
+
+        Parameters
+        ----------
+        seconds: float
+            Total time spent processing the frame.
+        detector_seconds: float, default=0
+            Part of that spent in detectors.
+        """
+        self.overhead = self._average(self.overhead if self.frame else None, max(seconds - detector_seconds, 0.))
+        self.frame += 1
+
+    def telemetry(self):
+        """
+        Current cost & rate of each detector.
+
+        Returns
+        -------
+        {detector: {'cost(s)': float, 'interval': int, 'scale': float, 'rate': float, 'runs': int}}
+            Cost at full resolution & fraction of frames the detector runs on.
+        """
+        output = {}
+
+        for name, cost in self._costs.items():
+            interval, scale = self._plan(name)
+
+            output[name] = {
+                'cost(s)': cost,
+                'interval': interval,
+                'scale': scale,
+                'rate': 1 / interval,
+                'runs': self._runs.get(name, 0),
+            }
+
+        return output
@@ -0,0 +1,330 @@
+"""
+Tracks bounding boxes across frames, smoothing their positions & giving each object an identity.
+"""
+import os
+import sys
+
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+sys.path += [parent_dir, gparent_dir]
+
+import itertools
+import numpy as np
+
+from vision.bounding_box import BoundingBox, ObjectType
+
+
+# Constant velocity model, state is (x, y, width, height, vx, vy) of the box center
+N_STATE = 6
+N_MEASUREMENT = 4
+
+H = np.eye(N_MEASUREMENT, N_STATE)  # Measurement is (x, y, width, height)
+
+GATE_99 = 13.28  # Chi-squared 99th percentile w/ 4 degrees of freedom
+
+
+def box_measurement(bounding_box):
+    """
+    Center & size of a bounding box.
+
+    Parameters
+    ----------
+    bounding_box: BoundingBox
+        Box w/ vertices as (x, y) corners.
+
+    Returns
+    -------
+    ndarray[4] x, y, width, height.
+    """
+    vertices = np.asarray(bounding_box.vertices, dtype=float).reshape(-1, 2)
+
+    (x1, y1), (x2, y2) = vertices.min(axis=0), vertices.max(axis=0)
+
+    return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1])
+
+
+class Tracker:
+    """
+    Multi-target tracker, one constant velocity Kalman filter per track.
+
+    Detections are assigned to tracks of the same object type by Mahalanobis distance,
+    gated & computed for every track & detection pair at once.
+
+    Parameters
+    ----------
+    process_noise: float, default=2000
+        Acceleration noise of box centers, pixels^2 / s^3.
+    size_noise: float, default=500
+        Rate boxes change size, pixels^2 / s.
+    measurement_noise: float, default=25
+        Variance of detected box positions & sizes, pixels^2.
+    gate: float, default=GATE_99
+        Maximum squared Mahalanobis distance of a detection to its track.
+    max_misses: int, default=5
+        Frames a track is kept, predicted, without a detection.
+    min_hits: int, default=1
+        Detections before a track is published.
+    depth_smoothing: float, default=.5
+        Weight of the newest depth when detections carry one, as depth or module_depth.
+
+    Settings
+    --------
+    n_tracks: int
+        Number of live tracks.
+    """
+    def __init__(self, process_noise=2000., size_noise=500., measurement_noise=25., gate=GATE_99, max_misses=5,
+                 min_hits=1, depth_smoothing=.5):
+        self.process_noise = process_noise
+        self.size_noise = size_noise
+        self.measurement_noise = measurement_noise
+        self.gate = gate
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.depth_smoothing = depth_smoothing
+
+        self.timestamp = None
+
+        self._ids = itertools.count()
+
+        # Track n is row n of each
+        self._x = np.zeros((0, N_STATE))
+        self._p = np.zeros((0, N_STATE, N_STATE))
+        self._track_ids = np.zeros(0, dtype=int)
+        self._types = []
+        self._hits = np.zeros(0, dtype=int)
+        self._misses = np.zeros(0, dtype=int)
+        self._depths = np.zeros(0)
+        self._detected = np.zeros(0, dtype=bool)  # Whether detected in the latest frame
+
+    @property
+    def n_tracks(self):
+        return len(self._x)
+
+    def _transition(self, dt):
+        """
+        State transition & process noise over dt seconds.
+        """
+        f = np.eye(N_STATE)
+        f[0, 4] = f[1, 5] = dt
+
+        q = np.zeros((N_STATE, N_STATE))
+        for position, velocity in [(0, 4), (1, 5)]:
+            q[position, position] = self.process_noise * dt ** 3 / 3
+            q[position, velocity] = q[velocity, position] = self.process_noise * dt ** 2 / 2
+            q[velocity, velocity] = self.process_noise * dt
+        q[2, 2] = q[3, 3] = self.size_noise * dt
+
+        return f, q
+
+    def _predict(self, timestamp):
+        """
+        Advance every track to timestamp.
+        """
+        dt = 0. if self.timestamp is None or timestamp is None else max(timestamp - self.timestamp, 0.)
+        if timestamp is not None:
+            self.timestamp = timestamp
+
+        if not dt or not self.n_tracks:
+            return
+
+        f, q = self._transition(dt)
+
+        self._x = self._x @ f.T
+        self._p = f @ self._p @ f.T + q
+
+    def _create(self, measurements, object_types, depths):
+        """
+        Start tracks from unassigned detections.
+        """
+        n = len(measurements)
+        if not n:
+            return
+
+        x = np.zeros((n, N_STATE))
+        x[:, :N_MEASUREMENT] = measurements
+
+        p = np.zeros((n, N_STATE, N_STATE))
+        p[:, :N_MEASUREMENT, :N_MEASUREMENT] = np.eye(N_MEASUREMENT) * self.measurement_noise
+        p[:, 4, 4] = p[:, 5, 5] = 100. ** 2  # Unknown velocity, ~100 pixels / s
+
+        self._x = np.concatenate([self._x, x])
+        self._p = np.concatenate([self._p, p])
+        self._track_ids = np.concatenate([self._track_ids, [next(self._ids) for _ in range(n)]])
+        self._types += list(object_types)
+        self._hits = np.concatenate([self._hits, np.ones(n, dtype=int)])
+        self._misses = np.concatenate([self._misses, np.zeros(n, dtype=int)])
+        self._depths = np.concatenate([self._depths, depths])
+        self._detected = np.concatenate([self._detected, np.ones(n, dtype=bool)])
+
+    def _keep(self, mask):
+        """
+        Drop the tracks not in mask.
+        """
+        self._x, self._p = self._x[mask], self._p[mask]
+        self._track_ids, self._hits, self._misses = self._track_ids[mask], self._hits[mask], self._misses[mask]
+        self._depths, self._detected = self._depths[mask], self._detected[mask]
+        self._types = [object_type for object_type, keep in zip(self._types, mask) if keep]
+
+    def distances(self, measurements, object_types):
+        """
+        Squared Mahalanobis distance of every detection to every track.
+
+        Parameters
+        ----------
+        measurements: ndarray[m, 4]
+            x, y, width, height of each detection.
+        object_types: list[ObjectType]
+            Type of each detection.
+
+        Returns
+        -------
+        ndarray[n tracks, m detections] inf between different object types.
+        """
+        s = H @ self._p @ H.T + np.eye(N_MEASUREMENT) * self.measurement_noise
+        innovation = measurements[np.newaxis, :, :] - (self._x @ H.T)[:, np.newaxis, :]
+
+        d2 = np.einsum('nmi,nij,nmj->nm', innovation, np.linalg.inv(s), innovation)
+
+        same_type = np.array([[track_type == object_type for object_type in object_types]
+                              for track_type in self._types], dtype=bool).reshape(d2.shape)
+
+        return np.where(same_type, d2, np.inf)
+
+    def _assign(self, d2):
+        """
+        Greedily pair tracks & detections, closest first, within the gate.
+
+        Returns
+        -------
+        ndarray[k], ndarray[k] Track & detection indices of each pair.
+        """
+        candidates = np.argwhere(d2 <= self.gate)
+        candidates = candidates[np.argsort(d2[candidates[:, 0], candidates[:, 1]], kind='stable')]
+
+        tracks, detections, used_tracks, used_detections = [], [], set(), set()
+        for i, j in candidates:
+            if i in used_tracks or j in used_detections:
+                continue
+
+            tracks.append(i)
+            detections.append(j)
+            used_tracks.add(i)
+            used_detections.add(j)
+
+        return np.array(tracks, dtype=int), np.array(detections, dtype=int)
+
+    def update(self, bounding_boxes, timestamp=None, object_types=None):
+        """
+        Add a frame of detections.
+
+        Parameters
+        ----------
+        bounding_boxes: list[BoundingBox]
+            Detections in the frame.
+        timestamp: float, default=None
+            Capture time of the frame in seconds, None keeps tracks where they are.
+        object_types: collection[ObjectType], default=None
+            Types the detectors that ran looked for, only tracks of these types count a miss
+            when not detected. Defaults to all types.
+
+        Returns
+        -------
+        list[BoundingBox] Smoothed tracks, see tracks.
+        """
+        self._predict(timestamp)
+
+        measurements = np.array([box_measurement(box) for box in bounding_boxes]).reshape(-1, N_MEASUREMENT)
+        types = [box.object_type for box in bounding_boxes]
+        depths = np.array([getattr(box, 'depth', getattr(box, 'module_depth', np.nan)) for box in bounding_boxes],
+                          dtype=float)
+
+        ## Assign
+        if self.n_tracks and len(measurements):
+            tracks, detections = self._assign(self.distances(measurements, types))
+        else:
+            tracks, detections = np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+        ## Correct assigned tracks
+        if len(tracks):
+            p = self._p[tracks]
+            s = H @ p @ H.T + np.eye(N_MEASUREMENT) * self.measurement_noise
+            k = p @ H.T @ np.linalg.inv(s)
+
+            innovation = measurements[detections] - self._x[tracks] @ H.T
+
+            self._x[tracks] += np.einsum('nij,nj->ni', k, innovation)
+            self._p[tracks] = (np.eye(N_STATE) - k @ H) @ p
+
+            new_depths = depths[detections]
+            old_depths = self._depths[tracks]
+            self._depths[tracks] = np.where(
+                np.isnan(old_depths), new_depths,
+                np.where(np.isnan(new_depths), old_depths,
+                         self.depth_smoothing * new_depths + (1 - self.depth_smoothing) * old_depths))
+
+        ## Unassigned tracks miss, if their detector ran
+        detected = np.zeros(self.n_tracks, dtype=bool)
+        detected[tracks] = True
+
+        searched = np.array([object_types is None or object_type in object_types for object_type in self._types],
+                            dtype=bool).reshape(-1)
+
+        self._detected = detected
+        self._hits[detected] += 1
+        self._misses[detected] = 0
+        self._misses[~detected & searched] += 1
+
+        self._keep(self._misses <= self.max_misses)
+
+        ## New tracks from unassigned detections
+        unassigned = np.setdiff1d(np.arange(len(measurements)), detections)
+        self._create(measurements[unassigned], [types[j] for j in unassigned], depths[unassigned])
+
+        return self.tracks()
+
+    def predict(self, timestamp):
+        """
+        Advance tracks to a frame no detector ran on.
+
+        Parameters
+        ----------
+        timestamp: float
+            Capture time of the frame in seconds.
+
+        Returns
+        -------
+        list[BoundingBox] Predicted tracks, see tracks.
+        """
+        self._predict(timestamp)
+        self._detected[:] = False
+
+        return self.tracks()
+
+    def tracks(self):
+        """
+        Published tracks as bounding boxes.
+
+        Returns
+        -------
+        list[BoundingBox]
+            Smoothed boxes w/ track_id, velocity (pixels / s), predicted (not detected in the latest frame)
+            & depth when known, also as module_depth for modules.
+        """
+        boxes = []
+
+        for i in np.flatnonzero(self._hits >= self.min_hits):
+            x, y, width, height, vx, vy = self._x[i]
+
+            box = BoundingBox([(x - width / 2, y - height / 2), (x + width / 2, y - height / 2),
+                               (x + width / 2, y + height / 2), (x - width / 2, y + height / 2)], self._types[i])
+            box.track_id = int(self._track_ids[i])
+            box.velocity = (vx, vy)
+            box.predicted = not self._detected[i]
+            if not np.isnan(self._depths[i]):
+                box.depth = self._depths[i]
+                if self._types[i] is ObjectType.MODULE:
+                    box.module_depth = self._depths[i]
+
+            boxes.append(box)
+
+        return boxes
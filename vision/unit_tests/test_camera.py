@@ -7,8 +7,10 @@ gparent_dir = os.path.dirname(parent_dir)
 ggparent_dir = os.path.dirname(gparent_dir)
 sys.path += [parent_dir, gparent_dir, ggparent_dir]
 
+import threading
+import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, Mock
 
 import numpy as np
 import airsim
@@ -16,6 +18,11 @@ import airsim
 from vision.camera import bag_file
 from vision.camera import realsense
 from vision.camera import sim_camera
+from vision.camera import synthetic
+from vision.camera import multi_camera
+from vision.camera import depth_filters
+from vision.camera.frame import Frame, match_depth_resolution
+from vision.bounding_box import BoundingBox, ObjectType
 
 
 COLOR_IMAGE = np.arange(0, 10).reshape(-1, 1, 1) + np.arange(0, 10).reshape(1, -1, 1) + np.arange(0, 3).reshape(1, 1, -1)
@@ -30,8 +37,17 @@ class FakeRSFrame:
     def get_data(self):
         return self.data
 
+    def supports_frame_metadata(self, *args, **kwargs):
+        return False
+
 
 class FakeRSFrameContainer:
+    def get_timestamp(self, *args, **kwargs):
+        return 0.
+
+    def get_frame_number(self, *args, **kwargs):
+        return 0
+
     def get_color_frame(self, *args, **kwargs):
         return FakeRSFrame(np.copy(COLOR_IMAGE))
 
@@ -52,7 +68,7 @@ class FakeRSPipeline:
     Mocking pyrealsense2 pipeline.
     """
     def start(self, *args, **kwargs):
-        pass
+        return Mock()  # Profile
 
     def wait_for_frames(self, *args, **kwargs):
         return FakeRSFrameContainer()
@@ -75,6 +91,10 @@ class FakeAirsimResponse:
     def depth(self):
         return 1 if len(self.data.shape) == 2 else self.data.shape[2]
 
+    @property
+    def time_stamp(self):
+        return 0
+
     @property
     def image_data_uint8(self):
         if self.depth == 1:
@@ -183,6 +203,346 @@ class TestCamera(unittest.TestCase):
             if i > 3:
                 break
 
+    @patch_camera
+    @run_all_types
+    def test_frame(self):
+        """
+        Testing metadata of frames from each camera.
+
+        Returns
+        -------
+        Frame w/ sequence number & capture timestamp.
+        """
+        camera = self._get_camera()
+
+        frame = next(iter(camera))
+
+        self.assertIsInstance(frame, Frame)
+        self.assertIsInstance(frame.sequence, int)
+        self.assertIsInstance(frame.timestamp, float)
+
+    @patch_camera
+    def test_decimation(self, *mocks):
+        """
+        Testing realsense cameras w/ the decimation filter enabled.
+
+        Settings
+        --------
+        depth_filters: dict
+            Decimation by 4, depth 20x20 -> 5x5 w/ 10x10 color.
+
+        Returns
+        -------
+        Depth at the color resolution, each decimated pixel repeated, w/ the decimation recorded.
+        """
+        class FakeDecimation:
+            def process(self, frame):
+                return FakeRSFrame(frame.get_data()[::4, ::4])
+
+        config = {'decimation': {'enable': True, 'filter_magnitude': 4}}
+
+        for module, obj in [(bag_file, bag_file.BagFile), (realsense, realsense.Realsense)]:
+            with self.subTest(i=obj.__name__), \
+                    patch.object(module, 'build_filter_chain', return_value=[FakeDecimation()]):
+                camera = self._set_obj(obj)(depth_filters=config)
+
+                frame = next(iter(camera))
+
+                self.assertEqual(frame.decimation, 4)
+                self.assertEqual(frame.depth.shape, COLOR_IMAGE.shape[:2])
+                np.testing.assert_array_equal(frame.depth, DEPTH_IMAGE[::4, ::4].repeat(2, 0).repeat(2, 1))
+
+
+class TestFrame(unittest.TestCase):
+    """
+    Testing the frame type.
+    """
+    def test_frame(self):
+        """
+        Testing Frame.
+
+        Parameters
+        ----------
+        depth, color: ndarray
+            Images of the frame.
+        timestamp: float
+            Capture time.
+
+        Returns
+        -------
+        Unpacks as (depth, color).
+        """
+        frame = Frame(DEPTH_IMAGE, COLOR_IMAGE, timestamp=4., sequence=2)
+
+        depth, color = frame
+        self.assertIs(depth, DEPTH_IMAGE)
+        self.assertIs(color, COLOR_IMAGE)
+
+        self.assertEqual(frame.timestamp, 4.)
+        self.assertEqual(frame.sequence, 2)
+        self.assertEqual(frame.decimation, 1)
+
+        ## Ensure decimated depth is upsampled to the color resolution, nearest neighbor
+        small = np.array([[1, 2], [3, 4]], dtype='uint16')
+        np.testing.assert_array_equal(match_depth_resolution(small, np.zeros((4, 4, 3))),
+                                      [[1, 1, 2, 2], [1, 1, 2, 2], [3, 3, 4, 4], [3, 3, 4, 4]])
+        self.assertIs(match_depth_resolution(DEPTH_IMAGE, np.zeros((20, 20, 3))), DEPTH_IMAGE)
+
+        ## Ensure defaults to now & no per frame dict
+        before = time.time()
+        self.assertGreaterEqual(Frame(DEPTH_IMAGE, COLOR_IMAGE).timestamp, before)
+
+        with self.assertRaises(AttributeError):
+            frame.label = 'extra'
+
+
+class TestSyntheticCamera(unittest.TestCase):
+    """
+    Testing the synthetic camera.
+    """
+    def test_iter(self):
+        """
+        Testing SyntheticCamera.__iter__.
+
+        Settings
+        --------
+        scene: list[str]
+            Objects to render.
+        n_frames: int
+            Number of frames to generate.
+
+        Returns
+        -------
+        depth image[1 channel], color image[3 channel]
+
+        Effects
+        -------
+        bounding_boxes holds the ground truth of the latest frame.
+        """
+        ## Ensure correct shapes and ground truth within image
+        for width, height in [(640, 480), (1280, 720), (100, 50)]:
+            camera = synthetic.SyntheticCamera(width, height, 30, noise=5, n_frames=5, seed=0)
+
+            n_frames = 0
+            for frame in camera:
+                depth, color = frame
+                n_frames += 1
+
+                self.assertEqual(frame.sequence, n_frames - 1)
+                self.assertIs(frame.bounding_boxes, camera.bounding_boxes)
+
+                self.assertEqual(color.shape, (height, width, 3))
+                self.assertEqual(depth.shape, (height, width))
+                self.assertEqual(color.dtype, np.uint8)
+
+                self.assertLessEqual(len(camera.bounding_boxes), 3 + 3)  # Hidden objects have no box
+                for box in camera.bounding_boxes:
+                    self.assertIsInstance(box, BoundingBox)
+                    self.assertIsInstance(box.object_type, ObjectType)
+
+                    for x, y in box.vertices:
+                        self.assertTrue(-1 <= x <= width + 1, msg=f"{box}")
+                        self.assertTrue(-1 <= y <= height + 1, msg=f"{box}")
+
+            self.assertEqual(n_frames, 5)
+
+        ## Ensure scene selection & reproducibility
+        cameras = [synthetic.SyntheticCamera(320, 240, 30, scene=['module'], n_frames=3, seed=4) for _ in range(2)]
+        first, second = [[np.copy(color) for _, color in camera] for camera in cameras]
+
+        self.assertListEqual([box.object_type for box in cameras[0].bounding_boxes], [ObjectType.MODULE])
+        for first_color, second_color in zip(first, second):
+            np.testing.assert_array_equal(first_color, second_color)
+
+        with self.assertRaises(ValueError):
+            synthetic.SyntheticCamera(scene=['boat'])
+
+    def test_occlusion(self):
+        """
+        Testing ground truth of objects hidden behind others.
+
+        Settings
+        --------
+        objects: list[_SceneObject]
+            A module behind an obstacle, a pylon partly hidden behind a module as tall as the image.
+
+        Returns
+        -------
+        No box for the module while the obstacle hides it, boxes clipped to the visible part otherwise.
+        """
+        camera = synthetic.SyntheticCamera(200, 100, 30, scene=['module'], seed=0)
+
+        module = synthetic._SceneObject(ObjectType.MODULE, 100, 50, 20, 30, 1000)
+        obstacle = synthetic._SceneObject(ObjectType.AVOID, 100, 50, 80, 80, 500)
+        pylon = synthetic._SceneObject(ObjectType.PYLON, 85, 50, 20, 100, 3000)
+
+        _, _, boxes = camera._render([module, obstacle])
+        self.assertListEqual([box.object_type for box in boxes], [ObjectType.AVOID])
+
+        module.height = 100
+        _, _, boxes = camera._render([module, pylon])
+        self.assertListEqual([box.object_type for box in boxes], [ObjectType.MODULE, ObjectType.PYLON])
+        self.assertListEqual(boxes[1].vertices, [(75, 0), (90, 0), (90, 100), (75, 100)])
+
+    def test_text(self):
+        """
+        Testing the text is drawn in Cyrillic.
+
+        Returns
+        -------
+        A glyph for every character & white text inside the ground truth box.
+        """
+        self.assertTrue(all(character in synthetic.GLYPHS for character in synthetic.TEXT))
+        self.assertIn('иртибот', synthetic.TEXT)
+
+        camera = synthetic.SyntheticCamera(640, 480, 30, scene=['text'], n_frames=1, seed=0)
+        frame = next(iter(camera))
+
+        (x1, y1), _, (x2, y2), _ = frame.bounding_boxes[0].vertices
+        text = frame.color[y1:y2, x1:x2]
+        self.assertTrue(np.any(text == 255))
+        self.assertTrue(np.all(np.isin(text, [0, 255])))
+
+
+class TestDepthFilters(unittest.TestCase):
+    """
+    Testing the depth post-processing chain.
+    """
+    def test_build_filter_chain(self):
+        """
+        Testing depth_filters.build_filter_chain.
+
+        Parameters
+        ----------
+        config: dict
+            Filter configuration.
+
+        Returns
+        -------
+        list[pyrealsense2.filter]
+        """
+        config = {
+            'hole_filling': {'enable': True, 'holes_fill': 1},
+            'temporal': {'enable': True, 'filter_smooth_alpha': .4},
+            'spatial': {'enable': False},
+            'decimation': {'enable': True, 'filter_magnitude': 4},
+        }
+
+        ## Ensure filters in librealsense order, w/ disparity around temporal
+        with patch.object(depth_filters, 'rs', Mock()) as fake_rs:
+            chain = depth_filters.build_filter_chain(config)
+
+            self.assertListEqual(chain, [
+                fake_rs.decimation_filter(),
+                fake_rs.disparity_transform(True),
+                fake_rs.temporal_filter(),
+                fake_rs.disparity_transform(False),
+                fake_rs.hole_filling_filter(),
+            ])
+
+            self.assertListEqual([args for args, _ in fake_rs.disparity_transform.call_args_list[:2]], [(True,), (False,)])
+            fake_rs.decimation_filter().set_option.assert_called_with(fake_rs.option.filter_magnitude, 4)
+
+        self.assertEqual(depth_filters.decimation_factor(config), 4)
+        self.assertEqual(depth_filters.decimation_factor(None), 1)
+        self.assertListEqual(depth_filters.build_filter_chain(None), [])
+
+        ## Ensure bad configurations are caught
+        for config in [{'median': {'enable': True}}, {'spatial': {}}, ['spatial']]:
+            with self.subTest(i=str(config)):
+                with self.assertRaises(ValueError):
+                    depth_filters.enabled_filters(config)
+
+    def test_apply_filters(self):
+        """
+        Testing depth_filters.apply_filters.
+
+        Returns
+        -------
+        Depth frame after every filter has processed it, in order.
+        """
+        chain = [Mock() for _ in range(3)]
+        for i, depth_filter in enumerate(chain):
+            depth_filter.process = lambda frame, i=i: frame + [i]
+
+        self.assertListEqual(depth_filters.apply_filters(chain, []), [0, 1, 2])
+
+
+## multi_camera
+class FakeTimedCamera:
+    """
+    Camera producing numbered frames at a set period & timestamp offset.
+    """
+    def __init__(self, period, offset, n_frames=20):
+        self.period, self.offset, self.n_frames = period, offset, n_frames
+        self.width, self.height, self.framerate = 0, 0, 1 / period
+
+    def __iter__(self):
+        for i in range(self.n_frames):
+            time.sleep(.001)
+
+            yield Frame(np.full((2, 2), i), np.full((2, 2, 3), i), timestamp=i * self.period + self.offset, sequence=i)
+
+
+class TestMultiCamera(unittest.TestCase):
+    """
+    Testing the multi camera fan-in.
+    """
+    def test_iter(self):
+        """
+        Testing MultiCamera.__iter__.
+
+        Settings
+        --------
+        cameras: list[Camera]
+            Cameras to synchronize.
+        tolerance: float
+            Maximum timestamp difference within a set.
+
+        Returns
+        -------
+        Frame of the primary camera w/ one frame per other camera attached.
+        """
+        ## Ensure sets are within tolerance, including cameras at different rates
+        for periods, offsets in [([.1, .1], [0, .004]), ([.05, .1, .1], [0, .002, .003])]:
+            cameras = [FakeTimedCamera(period, offset) for period, offset in zip(periods, offsets)]
+
+            camera = multi_camera.MultiCamera(cameras, tolerance=.01, buffer_size=100)
+
+            n_sets = 0
+            for frame in camera:
+                n_sets += 1
+
+                self.assertIsInstance(frame, Frame)
+                frames = [frame, *frame.others]
+                self.assertEqual(len(frames), len(cameras))
+
+                timestamps = [cam.period * depth[0, 0] + cam.offset for cam, (depth, color) in zip(cameras, frames)]
+                self.assertLessEqual(max(timestamps) - min(timestamps), .01)
+
+            self.assertGreater(n_sets, 5)
+            self.assertFalse(any(thread.is_alive() for thread in threading.enumerate()
+                                 if thread.name.startswith('MultiCamera')))
+
+        ## Ensure the primary camera's frame is yielded
+        cameras = [FakeTimedCamera(.1, 0), FakeTimedCamera(.1, .002)]
+        for frame in multi_camera.MultiCamera(cameras, tolerance=.01, buffer_size=100, primary=1):
+            self.assertAlmostEqual(frame.timestamp % .1, .002, places=6)
+            self.assertEqual(len(frame.others), 1)
+            break
+
+        with self.assertRaises(ValueError):
+            multi_camera.MultiCamera(cameras, primary=2)
+
+        ## Ensure frames too far apart are never matched
+        camera = multi_camera.MultiCamera([FakeTimedCamera(.1, 0), FakeTimedCamera(.1, .05)], tolerance=.01)
+
+        self.assertListEqual(list(camera), [])
+        self.assertGreater(sum(camera.dropped_frames), 0)
+
+        with self.assertRaises(ValueError):
+            multi_camera.MultiCamera([])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -12,6 +12,7 @@ import numpy as np
 import cv2
 
 from vision.module.in_frame import ModuleInFrame as mif
+from vision.module import in_frame
 from vision.module.location import ModuleLocation
 
 
@@ -89,6 +90,58 @@ class TestModuleInFrame(unittest.TestCase):
 
         np.testing.assert_array_equal(color_image, color_parameter)
 
+    def test_cascade(self):
+        """
+        Verify frames are rejected before circle detection when the module can't be in frame.
+
+        Settings
+        --------
+        CASCADE_STATS: dict
+            Pass counts of each stage.
+
+        Returns
+        -------
+        bool
+        """
+        color_image = 255 * np.ones((480, 640, 3), dtype='uint8')
+        color_image = cv2.rectangle(color_image, (220, 140), (420, 340), (128, 128, 128), -1)
+        for x, y in [(270, 190), (370, 190), (270, 290), (370, 290)]:
+            color_image = cv2.circle(color_image, (x, y), 20, (0, 0, 0), 4)
+
+        near_depth = 1000 * np.ones(color_image.shape[:-1], dtype='uint16')
+        far_depth = 10000 * np.ones(color_image.shape[:-1], dtype='uint16')
+
+        ## Blank image fails edge density
+        with self.subTest(i="Blank Image"):
+            in_frame.reset_cascade_stats()
+
+            self.assertFalse(mif(np.zeros_like(color_image), near_depth))
+            self.assertEqual(in_frame.cascade_pass_rates()['edges'], 0)
+            self.assertIsNone(in_frame.cascade_pass_rates()['hough'])
+
+        ## Nothing in depth range
+        with self.subTest(i="Far Depth"):
+            in_frame.reset_cascade_stats()
+
+            self.assertFalse(mif(color_image, far_depth))
+            self.assertEqual(in_frame.cascade_pass_rates()['edges'], 1)
+            self.assertEqual(in_frame.cascade_pass_rates()['depth'], 0)
+            self.assertIsNone(in_frame.cascade_pass_rates()['hough'])
+
+        ## Passes through to circle detection
+        with self.subTest(i="Near Depth"):
+            in_frame.reset_cascade_stats()
+
+            self.assertIn(mif(color_image, near_depth), [True, False])
+            self.assertEqual(in_frame.CASCADE_STATS['hough']['evaluated'], 1)
+
+        ## No depth skips depth check
+        with self.subTest(i="No Depth"):
+            in_frame.reset_cascade_stats()
+
+            mif(color_image, None)
+            self.assertIsNone(in_frame.cascade_pass_rates()['depth'])
+
 
 class TestModuleLocation(unittest.TestCase):
     """
@@ -172,6 +225,62 @@ class TestModuleLocation(unittest.TestCase):
         np.testing.assert_array_equal(color_image, color_parameter)
         np.testing.assert_array_equal(depth_image, depth_parameter)
 
+    def test_center(self):
+        """
+        Verify center of a square of holes is found.
+
+        Settings
+        --------
+        max_holes: int
+            Maximum number of holes used.
+
+        Returns
+        -------
+        tuple
+        """
+        color_image = 255 * np.ones((300, 500, 3), dtype='uint8')
+        depth_image = 500 * np.ones(shape=color_image.shape[:-1], dtype='uint16')
+        for x, y in [(200, 100), (300, 100), (200, 200), (300, 200)]:
+            color_image = cv2.circle(color_image, (x, y), 20, (0, 0, 0), 4)
+
+        ##
+        for max_holes in [2, 4]:
+            with self.subTest(max_holes=max_holes):
+                locator = ModuleLocation(max_holes=max_holes)
+                locator.setImg(color_image, depth_image)
+                x, y = locator.getCenter()
+
+                self.assertLessEqual(len(locator.holes), max_holes)
+                self.assertLessEqual(abs(x - 250), 3)
+                self.assertLessEqual(abs(y - 150), 3)
+
+        ## No circles keeps previous center
+        locator = ModuleLocation()
+        locator.setImg(255 * np.ones_like(color_image), depth_image)
+        locator.center = np.array([10, 20])
+
+        self.assertEqual(locator.getCenter(), (10, 20))
+
+    def test_filter_circle_depth(self):
+        """
+        Verify far away & out of image circles are removed.
+
+        Effects
+        -------
+        circles: ndarray
+            Only circles within depth threshold remain.
+        """
+        depth_image = 500 * np.ones((100, 200), dtype='uint16')
+        depth_image[:, 150:] = 5000
+
+        locator = ModuleLocation()
+        locator.depth = depth_image
+        locator.circles = np.array([[20, 50, 5], [180, 50, 5], [120, 90, 5], [50, 150, 5]], dtype='uint16')
+
+        locator._filterCircleDepth()
+
+        np.testing.assert_array_equal(locator.circles, [[20, 50, 5], [120, 90, 5]])
+
 
 if __name__ == '__main__':
     unittest.main()
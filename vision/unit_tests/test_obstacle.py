@@ -106,6 +106,16 @@ class TestObstacleDetection(unittest.TestCase):
                 self.assertIsInstance(box.object_type, ObjectType)
                 self.assertEqual(box.object_type, ObjectType.AVOID)
 
+                self.assertFalse(hasattr(box, 'depth'))
+
+        ### Ensure depth of box is median of valid depth
+        with self.subTest(i="Depth"):
+            depth_image = np.full((1000, 1000), 3000, dtype='uint16')
+            depth_image[::2] = 0  # Missing depth
+
+            for box in detector.find(color_image, depth_image):
+                self.assertEqual(box.depth, 3000)
+
         ## Ensure does not modify original image
         detector = ObstacleFinder(params=self._get_params())
 
@@ -7,6 +7,7 @@ gparent_dir = os.path.dirname(parent_dir)
 ggparent_dir = os.path.dirname(gparent_dir)
 sys.path += [parent_dir, gparent_dir, ggparent_dir]
 
+import datetime
 import unittest
 from unittest.mock import patch, Mock
 import numpy as np
@@ -14,6 +15,9 @@ import numpy as np
 from multiprocessing import Queue
 
 from vision import pipeline as PIPELINE
+from vision.camera.frame import Frame
+from vision.camera.multi_camera import MultiCamera
+from vision.bounding_box import BoundingBox, ObjectType
 
 
 class FakeObstacleFinder:
@@ -21,7 +25,8 @@ class FakeObstacleFinder:
         self.keypoints = []
 
     def find(*args, **kwargs):
-        return list(range(12))
+        return [BoundingBox([(i * 10, 0), (i * 10 + 5, 0), (i * 10 + 5, 5), (i * 10, 5)], ObjectType.AVOID)
+                for i in range(12)]
 
 
 class TestPipeline(unittest.TestCase):
@@ -81,6 +86,144 @@ class TestPipeline(unittest.TestCase):
         pipeline = self._get_pipeline(flight_communication=flight_communication, camera=camera)
         pipeline.run('start')
 
+    @patch_pipeline
+    def test_frame_metadata(self, Obstacle__init__):
+        """
+        Testing frame metadata handling in Pipeline.run.
+
+        Settings
+        --------
+        camera: Camera
+            Yields frames w/ capture timestamps & sequence numbers.
+
+        Effects
+        -------
+        Results are published w/ the capture timestamp, gaps in sequence numbers are counted as dropped.
+        """
+        sequences = [0, 1, 4, 5, 9]
+        frames = [Frame(np.ones((3, 3), dtype='uint8'), np.ones((3, 3, 3), dtype='uint8'), timestamp=1e9 + i, sequence=i)
+                  for i in sequences]
+
+        camera = type('Camera', (object,), {'__iter__': lambda: iter(frames)})
+
+        pipeline = self._get_pipeline(camera=camera)
+
+        for frame in frames:
+            pipeline.run('start')
+
+            timestamp, bboxes = pipeline.vision_communication.get(timeout=1)
+
+            self.assertEqual(timestamp, datetime.datetime.fromtimestamp(frame.timestamp))
+            self.assertGreater(pipeline.latency, 0)
+
+        self.assertEqual(pipeline.dropped_frames, 2 + 3)
+
+    @patch_pipeline
+    def test_tracking(self, Obstacle__init__):
+        """
+        Testing detections are tracked across frames in Pipeline.run.
+
+        Settings
+        --------
+        prev_state: str
+            early_laps, so obstacles are detected.
+
+        Effects
+        -------
+        Published boxes keep the same track ids from frame to frame.
+        """
+        frames = [Frame(np.ones((3, 3), dtype='uint8'), np.ones((3, 3, 3), dtype='uint8'), timestamp=1e9 + i / 30,
+                        sequence=i) for i in range(3)]
+
+        camera = type('Camera', (object,), {'__iter__': lambda: iter(frames)})
+
+        pipeline = self._get_pipeline(camera=camera)
+
+        track_ids = []
+        state = 'early_laps'
+        for _ in frames:
+            state = pipeline.run(state)
+
+            _, bboxes = pipeline.vision_communication.get(timeout=1)
+
+            self.assertEqual(len(bboxes), 12)
+            track_ids.append(sorted(box.track_id for box in bboxes))
+
+        self.assertEqual(state, 'early_laps')
+        self.assertEqual(track_ids[0], track_ids[-1])
+
+    @patch_pipeline
+    def test_multi_camera(self, Obstacle__init__):
+        """
+        Testing Pipeline.run w/ frames from a MultiCamera.
+
+        Settings
+        --------
+        camera: MultiCamera
+            Two cameras w/ matching timestamps.
+
+        Effects
+        -------
+        Frames of the primary camera are processed & published w/ their capture timestamp.
+        """
+        def make_camera(offset):
+            frames = [Frame(np.ones((3, 3), dtype='uint8'), np.ones((3, 3, 3), dtype='uint8'),
+                            timestamp=1e9 + i / 30 + offset, sequence=i) for i in range(5)]
+
+            return type('Camera', (object,), {'width': 3, 'height': 3, 'framerate': 30,
+                                              '__iter__': lambda self: iter(frames)})()
+
+        camera = MultiCamera([make_camera(0), make_camera(.001)], tolerance=.01, buffer_size=10)
+
+        pipeline = self._get_pipeline(camera=camera)
+
+        state = 'early_laps'
+        for i in range(3):
+            state = pipeline.run(state)
+
+            timestamp, bboxes = pipeline.vision_communication.get(timeout=1)
+
+            self.assertEqual(timestamp, datetime.datetime.fromtimestamp(1e9 + i / 30))
+            self.assertEqual(len(bboxes), 12)
+
+    def test_decimation(self):
+        """
+        Testing frames w/ decimated depth in Pipeline.run.
+
+        Settings
+        --------
+        camera: Camera
+            Yields depth 2 times smaller than color, w/ an obstacle's depth at its pixels.
+
+        Effects
+        -------
+        Depth reaches the detectors at the color resolution, so boxes get the depth at their pixels.
+        """
+        color_image = np.zeros((200, 200, 3), dtype='uint8')
+        depth_image = np.full((100, 100), 9000, dtype='uint16')
+        depth_image[60:80, 60:80] = 2000  # Obstacle at color pixels (120..160, 120..160)
+
+        frames = [Frame(depth_image, color_image, sequence=0, decimation=2)]
+        camera = type('Camera', (object,), {'__iter__': lambda: iter(frames)})
+
+        box = BoundingBox([(125, 125), (155, 125), (155, 155), (125, 155)], ObjectType.AVOID)
+        depth_shapes = []
+
+        def find(color, depth):
+            depth_shapes.append(depth.shape)
+            box.depth = PIPELINE.ObstacleFinder._box_depth(depth, 125, 125, 155, 155)
+            return [box]
+
+        with patch.object(PIPELINE.ObstacleFinder, '__new__', return_value=Mock(find=find)):
+            pipeline = self._get_pipeline(camera=camera)
+            pipeline.run('early_laps')
+
+        _, bboxes = pipeline.vision_communication.get(timeout=1)
+
+        self.assertEqual(depth_shapes, [color_image.shape[:2]])
+        self.assertEqual(len(bboxes), 1)
+        self.assertEqual(bboxes[0].depth, 2000)
+
 
 if __name__ == '__main__':
     unittest.main()
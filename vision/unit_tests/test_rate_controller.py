@@ -0,0 +1,133 @@
+"""
+Testing the detector rate controller.
+"""
+import os, sys
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import unittest
+
+from vision.rate_controller import RateController
+
+
+def run_frames(controller, costs, n_frames):
+    """
+    Simulate frames, detectors cost seconds at full resolution.
+
+    Returns
+    -------
+    {detector: runs}
+    """
+    runs = {name: 0 for name in costs}
+
+    for _ in range(n_frames):
+        for name, cost in costs.items():
+            if controller.should_run(name):
+                scale = controller.scale(name)
+                controller.record(name, cost * scale ** 2, scale)
+                runs[name] += 1
+
+        controller.end_frame(.001)  # Overhead outside of detectors
+
+    return runs
+
+
+class TestRateController(unittest.TestCase):
+    """
+    Testing RateController functionality.
+    """
+    def test_cheap(self):
+        """
+        Verify detectors fitting the budget run every frame at full resolution.
+
+        Settings
+        --------
+        frame_rate: float
+            30 fps, budget ~27ms.
+
+        Returns
+        -------
+        Every detector runs on every frame.
+        """
+        controller = RateController(frame_rate=30)
+
+        runs = run_frames(controller, {'obstacle': .005, 'module': .005}, 20)
+
+        self.assertEqual(runs, {'obstacle': 20, 'module': 20})
+        self.assertEqual(controller.telemetry()['module']['scale'], 1.)
+
+    def test_decimate(self):
+        """
+        Verify expensive detectors are decimated & critical ones are not.
+
+        Returns
+        -------
+        The module detector runs on fewer frames, obstacle on all of them.
+        """
+        controller = RateController(frame_rate=30)
+
+        runs = run_frames(controller, {'obstacle': .01, 'module': .05}, 60)
+
+        self.assertEqual(runs['obstacle'], 60)
+        self.assertLess(runs['module'], 30)
+        self.assertGreater(runs['module'], 0)
+
+        telemetry = controller.telemetry()
+        self.assertEqual(telemetry['obstacle']['rate'], 1.)
+        self.assertLess(telemetry['module']['rate'], 1.)
+        self.assertAlmostEqual(telemetry['module']['cost(s)'], .05)
+
+    def test_downscale(self):
+        """
+        Verify detectors too expensive to decimate run on smaller images.
+
+        Settings
+        --------
+        max_interval: int
+            Most frames between runs.
+
+        Returns
+        -------
+        The module detector runs at a scale below 1 & at least every max_interval frames.
+        """
+        controller = RateController(frame_rate=30, max_interval=4)
+
+        run_frames(controller, {'obstacle': .01, 'module': .2}, 40)
+
+        telemetry = controller.telemetry()['module']
+        self.assertLess(telemetry['scale'], 1.)
+        self.assertLessEqual(telemetry['interval'], 4)
+
+    def test_critical_stops(self):
+        """
+        Verify the budget of a critical detector is freed once it stops running.
+
+        Settings
+        --------
+        costs: {detector: float}
+            Obstacle detection leaves too little budget for the module detector to run
+            every frame, then the state changes & only the module detector runs.
+
+        Returns
+        -------
+        The module detector decimated while obstacle detection runs,
+        back to every frame at full resolution once it stops.
+        """
+        controller = RateController(frame_rate=30)
+
+        run_frames(controller, {'obstacle': .02, 'module': .015}, 30)
+        self.assertGreater(controller.telemetry()['module']['interval'], 1)
+
+        run_frames(controller, {'module': .015}, 5)
+        runs = run_frames(controller, {'module': .015}, 10)
+
+        self.assertEqual(runs['module'], 10)
+        telemetry = controller.telemetry()['module']
+        self.assertEqual(telemetry['interval'], 1)
+        self.assertEqual(telemetry['scale'], 1.)
+
+
+if __name__ == '__main__':
+    unittest.main()
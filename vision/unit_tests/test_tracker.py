@@ -0,0 +1,148 @@
+"""
+Testing the bounding box tracker.
+"""
+import os, sys
+parent_dir = os.path.dirname(os.path.abspath(__file__))
+gparent_dir = os.path.dirname(parent_dir)
+ggparent_dir = os.path.dirname(gparent_dir)
+sys.path += [parent_dir, gparent_dir, ggparent_dir]
+
+import unittest
+
+import numpy as np
+
+from vision.tracker import Tracker, box_measurement
+from vision.bounding_box import BoundingBox, ObjectType
+
+
+def square(x, y, size=20, object_type=ObjectType.AVOID):
+    """
+    Square bounding box centered on x, y.
+    """
+    half = size / 2
+
+    return BoundingBox([(x - half, y - half), (x + half, y - half), (x + half, y + half), (x - half, y + half)],
+                       object_type)
+
+
+class TestTracker(unittest.TestCase):
+    """
+    Testing Tracker functionality.
+    """
+    def test_identity(self):
+        """
+        Verify moving objects keep their track ids.
+
+        Settings
+        --------
+        bounding_boxes: list[BoundingBox]
+            Two obstacles moving in opposite directions w/ noise.
+
+        Returns
+        -------
+        list[BoundingBox] w/ the same two track ids every frame.
+        """
+        tracker = Tracker()
+        random = np.random.RandomState(0)
+
+        track_ids = set()
+        for i in range(30):
+            t = i / 30
+            boxes = [square(100 + 300 * t + random.normal(0, 2), 200), square(400 - 300 * t, 300)]
+
+            tracks = tracker.update(boxes, t)
+
+            self.assertEqual(len(tracks), 2)
+            track_ids.update(box.track_id for box in tracks)
+
+        self.assertEqual(len(track_ids), 2)
+
+        ## Velocity is estimated
+        velocities = sorted(box.velocity[0] for box in tracks)
+        self.assertAlmostEqual(velocities[0], -300, delta=30)
+        self.assertAlmostEqual(velocities[1], 300, delta=30)
+
+    def test_prediction(self):
+        """
+        Verify tracks are predicted between detections & dropped after max_misses.
+
+        Settings
+        --------
+        max_misses: int
+            Frames a track survives without a detection.
+
+        Effects
+        -------
+        predict moves boxes along their velocity & marks them predicted.
+        """
+        tracker = Tracker(max_misses=2)
+
+        for i in range(10):
+            tracker.update([square(100 + 10 * i, 100)], i)
+
+        ## Frame no detector ran on
+        tracks = tracker.predict(10)
+
+        self.assertEqual(len(tracks), 1)
+        self.assertTrue(tracks[0].predicted)
+        self.assertAlmostEqual(box_measurement(tracks[0])[0], 200, delta=5)
+
+        ## Detector ran for other types, no miss
+        for i in range(5):
+            tracks = tracker.update([], 11 + i, object_types={ObjectType.MODULE})
+
+        self.assertEqual(len(tracks), 1)
+
+        ## Missed detections
+        for i in range(3):
+            tracks = tracker.update([], 16 + i)
+
+        self.assertEqual(len(tracks), 0)
+
+    def test_object_types(self):
+        """
+        Verify detections only match tracks of the same object type.
+
+        Returns
+        -------
+        list[BoundingBox] w/ separate tracks per type, module_depth smoothed.
+        """
+        tracker = Tracker(depth_smoothing=.5)
+
+        obstacle = square(100, 100)
+        module = square(100, 100, object_type=ObjectType.MODULE)
+        module.module_depth = 2.
+
+        tracker.update([obstacle, module], 0)
+
+        module = square(101, 100, object_type=ObjectType.MODULE)
+        module.module_depth = 1.
+
+        tracks = tracker.update([module], .1, object_types={ObjectType.MODULE})
+
+        self.assertEqual(len(tracks), 2)
+        self.assertEqual(len({box.track_id for box in tracks}), 2)
+
+        module_track = [box for box in tracks if box.object_type is ObjectType.MODULE][0]
+        self.assertAlmostEqual(module_track.module_depth, 1.5)
+        self.assertFalse(module_track.predicted)
+
+    def test_gate(self):
+        """
+        Verify a far away detection starts a new track.
+
+        Returns
+        -------
+        list[BoundingBox] w/ the old track predicted & a new one.
+        """
+        tracker = Tracker()
+
+        tracker.update([square(100, 100)], 0)
+        tracks = tracker.update([square(600, 400)], 1 / 30)
+
+        self.assertEqual(len(tracks), 2)
+        self.assertEqual(sum(box.predicted for box in tracks), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()